@@ -0,0 +1,280 @@
+"""
+Materialized group-by aggregates for repeated data explorer questions
+Results are cached as partial aggregates (sum, count, min, max and row count per group), keyed
+by dataset content hash, dimensions, time grain, measures and filters. A later question can be
+served from any cached entry it rolls up from: fewer dimensions, a coarser time grain (monthly
+sums give quarters and years), or an extra equality filter on a cached dimension. Entries are
+evicted least-recently-used by memory size. Parsed date columns are cached the same way, since
+parsing date strings is most of the cost of a new time-grain question.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+PARTIALS = ('sum', 'count', 'min', 'max')
+_ROWS = '__rows'
+_PERIODS = {'day': 'D', 'week': 'W', 'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+# Grains each grain can be rolled up into
+_ROLLUPS = {'day': {'day', 'week', 'month', 'quarter', 'year'}, 'week': {'week'},
+            'month': {'month', 'quarter', 'year'}, 'quarter': {'quarter', 'year'}, 'year': {'year'}}
+# Quarterly and yearly questions are materialized monthly so neighbouring grains reuse them
+_MATERIALIZE_AT = {'quarter': 'month', 'year': 'month'}
+
+
+class AggregateRequest:
+    """A single-dataset group-by, in the cache's canonical form"""
+    __slots__ = ('dataset', 'dims', 'time_column', 'grain', 'measures', 'aggregate', 'filters')
+
+    def __init__(self, dataset: str, dims: Tuple[str, ...], time_column: Optional[str], grain: Optional[str],
+                 measures: Tuple[str, ...], aggregate: str, filters: FrozenSet[tuple]):
+        self.dataset = dataset
+        self.dims = dims
+        self.time_column = time_column if grain else None
+        self.grain = grain if time_column else None
+        self.measures = measures
+        self.aggregate = aggregate
+        self.filters = filters
+
+    @classmethod
+    def from_plan(cls, plan, dataset_key: str) -> Optional['AggregateRequest']:
+        """None when the plan needs a join or has nothing to group by"""
+        if len(plan.datasets()) > 1:
+            return None
+        filters = frozenset((ref.column, op, tuple(value) if op == 'between' else value)
+                            for ref, op, value in plan.filters)
+        time_column = plan.time_column.column if plan.time_column is not None else None
+        request = cls(dataset_key, tuple(ref.column for ref in plan.dimensions), time_column,
+                      plan.time_grain, tuple(ref.column for ref in plan.measures), plan.aggregate, filters)
+        return request if request.dims or request.grain else None
+
+    def key(self) -> tuple:
+        return (self.dataset, frozenset(self.dims), self.time_column, self.grain,
+                frozenset(self.measures), self.aggregate == 'COUNT_DISTINCT', self.filters)
+
+
+class _Entry:
+    """Cached partials for a request, or a parsed date column when request is None"""
+    __slots__ = ('key', 'request', 'frame', 'size')
+
+    def __init__(self, key: tuple, request: Optional[AggregateRequest], frame):
+        self.key = key
+        self.request = request
+        self.frame = frame
+        usage = frame.memory_usage(deep=True)
+        self.size = int(usage.sum() if isinstance(usage, pd.Series) else usage)
+
+
+def _bucket(stamps: pd.Series, grain: str) -> pd.Series:
+    return stamps.dt.to_period(_PERIODS[grain]).dt.start_time
+
+
+def _filter_mask(df: pd.DataFrame, filters, timestamps: Callable[[str], pd.Series]) -> pd.Series:
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        if op == 'between':
+            stamps = timestamps(column)
+            mask &= (stamps >= pd.Timestamp(value[0])) & (stamps < pd.Timestamp(value[1]))
+        else:
+            mask &= df[column].astype(str) == value
+    return mask
+
+
+# ====== CACHE ======
+class AggregateCache:
+    """Byte-bounded LRU of partial aggregates with roll-up lookups"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'rollups': 0, 'misses': 0, 'evictions': 0}
+
+    def _remember(self, entry: _Entry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        key = entry.key
+        if key in self._entries:
+            self._bytes -= self._entries[key].size
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self._counters['evictions'] += 1
+
+    def _find_rollup(self, request: AggregateRequest) -> Optional[_Entry]:
+        """Smallest cached entry the request can be derived from"""
+        if request.aggregate == 'COUNT_DISTINCT':
+            return None
+        best = None
+        for entry in self._entries.values():
+            cached = entry.request
+            if cached is None or cached.dataset != request.dataset or cached.aggregate == 'COUNT_DISTINCT':
+                continue
+            if not set(request.measures) <= set(cached.measures) or not set(request.dims) <= set(cached.dims):
+                continue
+            if request.grain and (cached.time_column != request.time_column
+                                  or request.grain not in _ROLLUPS.get(cached.grain, ())):
+                continue
+            # Filters the entry lacks must be equality filters on dimensions it still has
+            extra = request.filters - cached.filters
+            if not cached.filters <= request.filters or any(op != '=' or column not in cached.dims
+                                                            for column, op, _ in extra):
+                continue
+            if best is None or entry.size < best.size:
+                best = entry
+        return best
+
+    def answer(self, request: AggregateRequest, frame: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """Final aggregate table for the request plus {'source': 'hit'|'rollup'|'computed'}"""
+        key = request.key()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return _finalize(entry.frame, request), {'source': 'hit'}
+            entry = self._find_rollup(request)
+            if entry is not None:
+                self._entries.move_to_end(entry.key)
+                self._counters['rollups'] += 1
+                partial = _roll_up(entry.frame, entry.request, request)
+                info = {'source': 'rollup', 'from_grain': entry.request.grain or '',
+                        'from_dims': ", ".join(entry.request.dims)}
+                return _finalize(partial, request), info
+            self._counters['misses'] += 1
+
+        # Materialize outside the lock; the scan is the slow part
+        stored = request
+        if request.grain in _MATERIALIZE_AT and request.aggregate != 'COUNT_DISTINCT':
+            stored = AggregateRequest(request.dataset, request.dims, request.time_column,
+                                      _MATERIALIZE_AT[request.grain], request.measures, request.aggregate,
+                                      request.filters)
+        partial = _materialize(frame, stored, lambda column: self._timestamps(frame, request.dataset, column))
+        with self._lock:
+            self._remember(_Entry(stored.key(), stored, partial))
+        if stored is not request:
+            partial = _roll_up(partial, stored, request)
+        return _finalize(partial, request), {'source': 'computed'}
+
+    def _timestamps(self, frame: pd.DataFrame, dataset: str, column: str) -> pd.Series:
+        """The column parsed as datetimes, cached per dataset"""
+        key = ('timestamps', dataset, column)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry.frame
+        values = frame[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Repeated date strings load as categoricals: parse each distinct value once
+            parsed = pd.to_datetime(values.cat.categories, errors='coerce')
+            stamps = pd.Series(parsed.take(values.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT),
+                               index=values.index, name=column)
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            stamps = values
+        else:
+            stamps = pd.to_datetime(values, errors='coerce')
+        with self._lock:
+            self._remember(_Entry(key, None, stamps))
+        return stamps
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+# ====== AGGREGATION ======
+def _group_keys(request: AggregateRequest):
+    return ([request.grain] if request.grain else []) + list(request.dims)
+
+
+def _materialize(frame: pd.DataFrame, request: AggregateRequest,
+                 timestamps: Callable[[str], pd.Series]) -> pd.DataFrame:
+    """One scan: per-group partials for every measure"""
+    subset = frame[list(set(request.dims) | set(request.measures))]
+    if request.filters:
+        mask = _filter_mask(frame, request.filters, timestamps)
+        subset = subset[mask]
+    work = pd.DataFrame({dim: subset[dim] for dim in request.dims}, index=subset.index)
+    if request.grain:
+        stamps = timestamps(request.time_column)
+        work.insert(0, request.grain, _bucket(stamps[mask] if request.filters else stamps, request.grain))
+    keys = _group_keys(request)
+    for measure in request.measures:
+        work[measure] = pd.to_numeric(subset[measure], errors='coerce') \
+            if request.aggregate != 'COUNT_DISTINCT' else subset[measure]
+    grouped = work.groupby(keys, observed=True, sort=False, dropna=False)
+    parts = {_ROWS: grouped.size()}
+    for measure in request.measures:
+        if request.aggregate == 'COUNT_DISTINCT':
+            parts[f"{measure}|nunique"] = grouped[measure].nunique()
+        else:
+            for func in PARTIALS:
+                parts[f"{measure}|{func}"] = grouped[measure].agg(func)
+    return pd.DataFrame(parts).reset_index()
+
+
+def _roll_up(partial: pd.DataFrame, cached: AggregateRequest, request: AggregateRequest) -> pd.DataFrame:
+    """Re-aggregate cached partials to the request's dimensions, grain and filters"""
+    for column, op, value in request.filters - cached.filters:
+        partial = partial[partial[column].astype(str) == value]
+    partial = partial.copy()
+    if request.grain and request.grain != cached.grain:
+        partial[request.grain] = partial[cached.grain].dt.to_period(_PERIODS[request.grain]).dt.start_time
+    grouped = partial.groupby(_group_keys(request), observed=True, sort=False, dropna=False)
+    parts = {_ROWS: grouped[_ROWS].sum()}
+    for measure in request.measures:
+        for func in PARTIALS:
+            column = f"{measure}|{func}"
+            parts[column] = grouped[column].agg('sum' if func in ('sum', 'count') else func)
+    return pd.DataFrame(parts).reset_index()
+
+
+def _finalize(partial: pd.DataFrame, request: AggregateRequest) -> pd.DataFrame:
+    """Turn partials into the answer columns, named and ordered like the generated SQL"""
+    keys = _group_keys(request)
+    result = partial[keys].copy()
+    if request.aggregate == 'COUNT' or not request.measures:
+        result['row_count'] = partial[_ROWS]
+        order = 'row_count'
+    for measure in request.measures if request.aggregate != 'COUNT' else ():
+        name = f"{request.aggregate.lower()}_{measure}"
+        if request.aggregate == 'AVG':
+            result[name] = partial[f"{measure}|sum"] / partial[f"{measure}|count"]
+        elif request.aggregate == 'COUNT_DISTINCT':
+            result[name] = partial[f"{measure}|nunique"]
+        else:
+            result[name] = partial[f"{measure}|{request.aggregate.lower()}"]
+        order = name
+    if request.grain:
+        return result.sort_values(keys).reset_index(drop=True)
+    return result.sort_values(order, ascending=False).reset_index(drop=True)
+
+
+_default_cache: Optional[AggregateCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_aggregate_cache() -> AggregateCache:
+    """Process-wide cache sized by DATA_EXPLORER_AGG_CACHE_MB"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = AggregateCache(
+                max_bytes=int(os.environ.get('DATA_EXPLORER_AGG_CACHE_MB', DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024
+            )
+        return _default_cache
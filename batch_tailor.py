@@ -0,0 +1,212 @@
+"""
+Batch tailoring - one CV against many job postings
+Usage: python batch_tailor.py cv.pdf postings.csv -o results.jsonl [--workers 4]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import zipfile
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from cv_parser import ParsedCV, parse_cv
+from cv_tailor_core import NamedBuffer, extract_text_from_file, is_extraction_error
+from doc_templates import EXTENSIONS, FORMATS
+from tailor_pipeline import TailorInputs, get_default_pipeline
+
+POSTING_FIELDS = ('job_title', 'company', 'job_description')
+ARTIFACTS = ('summary', 'skills', 'cover_letter', 'linkedin_message')
+# Artifacts rendered from templates in the chosen output format
+DOCUMENTS = ('cover_letter', 'linkedin_message')
+
+
+# ---------- INPUT ----------
+def load_cv(path: str) -> str:
+    """Extract CV text once for the whole batch"""
+    with open(path, 'rb') as fh:
+        cv_text = extract_text_from_file(NamedBuffer(fh.read(), os.path.basename(path)))
+    if is_extraction_error(cv_text):
+        raise ValueError(f"{path}: {cv_text}")
+    return cv_text
+
+
+def _read_jsonl(fh) -> Iterator[object]:
+    for line in fh:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+
+
+def load_postings(path: str) -> Iterator[Dict[str, str]]:
+    """Stream postings from a CSV or JSONL file; rows get a 1-based id when they lack one
+
+    JSONL lines that aren't JSON objects come through as {'id': ..., 'error': ...} records.
+    """
+    with open(path, encoding='utf-8', newline='') as fh:
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            rows = _read_jsonl(fh)
+        else:
+            rows = csv.DictReader(fh)
+        for number, row in enumerate(rows, start=1):
+            if isinstance(row, ValueError):
+                row = {'id': str(number), 'error': f"Invalid JSON: {row}"}
+            elif not isinstance(row, dict):
+                row = {'id': str(number), 'error': f"Expected a JSON object, got {type(row).__name__}"}
+            row.setdefault('id', str(number))
+            yield row
+
+
+# ---------- WORKERS ----------
+_worker_cv_text = ""
+_worker_parsed: Optional[ParsedCV] = None
+_worker_fmt = 'txt'
+
+
+def _init_worker(cv_text: str, fmt: str = 'txt') -> None:
+    """Keep the CV in each worker and parse it once up front"""
+    global _worker_cv_text, _worker_parsed, _worker_fmt
+    _worker_cv_text = cv_text
+    _worker_parsed = parse_cv(cv_text)
+    _worker_fmt = fmt
+
+
+def tailor_posting(cv_text: str, posting: Dict[str, str], parsed: Optional[ParsedCV] = None,
+                   fmt: str = 'txt') -> Dict[str, object]:
+    """Run the four generators and the skills-gap match for one posting; bad rows become an error record"""
+    result = {'id': str(posting.get('id', '')), 'job_title': posting.get('job_title', ''),
+              'company': posting.get('company', '')}
+    if 'error' in posting:
+        # Rejected by load_postings
+        result['error'] = str(posting['error'])
+        return result
+    missing = [field for field in POSTING_FIELDS if not posting.get(field)]
+    if missing:
+        result['error'] = f"Missing fields: {', '.join(missing)}"
+        return result
+    invalid = [field for field in POSTING_FIELDS if not isinstance(posting[field], str)]
+    if invalid:
+        result['error'] = f"Fields must be strings: {', '.join(invalid)}"
+        return result
+    job_desc, company, job_title = posting['job_description'], posting['company'], posting['job_title']
+    # Postings that repeat a description, company or title reuse the artifacts that only read those
+    artifacts, _ = get_default_pipeline().run(TailorInputs(cv_text, job_desc, company, job_title, fmt, parsed))
+    for name in ARTIFACTS:
+        result[name] = artifacts[name]
+    gap = artifacts['skills_gap']
+    result['coverage'] = gap['coverage']
+    result['missing_skills'] = [skill['skill'] for skill in gap['missing']]
+    return result
+
+
+def _tailor_chunk(postings: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    return [tailor_posting(_worker_cv_text, posting, _worker_parsed, _worker_fmt) for posting in postings]
+
+
+def _chunks(postings: Iterable[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+    iterator = iter(postings)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def tailor_postings(cv_text: str, postings: Iterable[Dict[str, str]], workers: int = 1,
+                    chunk_size: int = 32, fmt: str = 'txt') -> Iterator[Dict[str, str]]:
+    """Yield one result per posting, in input order
+
+    With workers > 1, chunks of postings run on a process pool. Only a bounded number of
+    chunks are in flight, so memory stays flat however long the postings file is.
+    """
+    if workers <= 1:
+        _init_worker(cv_text, fmt)
+        for chunk in _chunks(postings, chunk_size):
+            yield from _tailor_chunk(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cv_text, fmt)) as pool:
+        pending = deque()
+        for chunk in _chunks(postings, chunk_size):
+            pending.append(pool.submit(_tailor_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# ---------- OUTPUT ----------
+def write_jsonl(results: Iterable[Dict[str, str]], fh) -> int:
+    count = 0
+    for result in results:
+        fh.write(json.dumps(result, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_zip(results: Iterable[Dict[str, str]], path: str, fmt: str = 'txt') -> int:
+    """One folder per posting with a file per artifact (or error.txt); documents get the format's extension"""
+    count = 0
+    folders = set()
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for result in results:
+            # Ids come from user files, so keep them to safe path characters
+            base = re.sub(r'[^\w-]', '_', result['id']) or 'posting'
+            # Ids like 'a/b' and 'a_b', or repeated ids, would otherwise share a folder
+            folder, suffix = base, 1
+            while folder in folders:
+                suffix += 1
+                folder = f"{base}-{suffix}"
+            folders.add(folder)
+            if 'error' in result:
+                zipf.writestr(f"{folder}/error.txt", result['error'])
+            else:
+                for artifact in ARTIFACTS:
+                    extension = EXTENSIONS[fmt] if artifact in DOCUMENTS else 'txt'
+                    zipf.writestr(f"{folder}/{artifact}.{extension}", result[artifact])
+            count += 1
+    return count
+
+
+def run_batch(cv_path: str, postings_path: str, output: str, workers: int = 1,
+              chunk_size: int = 32, fmt: str = 'txt') -> int:
+    """Tailor one CV against every posting and stream the results to output; returns the row count"""
+    cv_text = load_cv(cv_path)
+    results = tailor_postings(cv_text, load_postings(postings_path), workers, chunk_size, fmt)
+    if output == '-':
+        return write_jsonl(results, sys.stdout)
+    if output.lower().endswith('.zip'):
+        return write_zip(results, output, fmt)
+    with open(output, 'w', encoding='utf-8') as fh:
+        return write_jsonl(results, fh)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tailor one CV against a CSV/JSONL file of job postings")
+    parser.add_argument("cv", help="CV file (PDF, TXT or DOCX)")
+    parser.add_argument("postings", help="CSV or JSONL with job_title, company and job_description columns")
+    parser.add_argument("-o", "--output", default="-", help="results .jsonl or .zip file, '-' for stdout (default)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=32, help="postings per worker task")
+    parser.add_argument("--format", choices=FORMATS, default='txt', help="cover letter and LinkedIn message format")
+    args = parser.parse_args(argv)
+
+    try:
+        count = run_batch(args.cv, args.postings, args.output, args.workers, args.chunk_size, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Tailored {count} postings", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Benchmarks for the CV tailor and data explorer; run modules with python -m benchmarks.<name>"""
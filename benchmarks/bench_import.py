@@ -0,0 +1,76 @@
+"""
+Cold-import benchmark for the headless library modules
+Usage: python -m benchmarks.bench_import [--runs 5] [--json results.json]
+Exits non-zero when a module exceeds its import-time budget or pulls in a heavy dependency.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median cold-import budgets in milliseconds
+IMPORT_BUDGETS_MS = {
+    'cv_tailor_core': 50.0,
+    'data_explorer_core': 20.0,
+    'batch_tailor': 80.0,
+}
+
+# None of these may be imported just by importing a library module
+HEAVY_MODULES = ('streamlit', 'PyPDF2', 'pandas', 'numpy', 'multiprocessing')
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'ms': elapsed, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, runs: int) -> Dict[str, object]:
+    """Import module in a fresh interpreter per run; report the median and any heavy imports"""
+    samples: List[float] = []
+    heavy: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.append(probe['ms'])
+        heavy = probe['heavy']
+    return {'median_ms': statistics.median(samples), 'max_ms': max(samples), 'heavy_imports': heavy}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check cold-import time of the headless modules")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    failed = False
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        result = measure_import(module, args.runs)
+        result['budget_ms'] = budget
+        result['ok'] = result['median_ms'] <= budget and not result['heavy_imports']
+        failed = failed or not result['ok']
+        results[module] = result
+        status = "ok" if result['ok'] else "OVER BUDGET"
+        extra = f" (imports {', '.join(result['heavy_imports'])})" if result['heavy_imports'] else ""
+        print(f"{module:<22} {result['median_ms']:7.1f} ms / {budget:.0f} ms  {status}{extra}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Load test - concurrent headless sessions of the CV tailor and the data explorer
+Usage: python -m benchmarks.bench_load [--apps cv,explorer] [--levels 1,2,4,8] [--duration 20] [--slo-ms 2000]
+                                       [--quick] [--output load.json]
+
+Each session is a Streamlit AppTest walking through a scripted visit: uploading a CV of a mixed
+format and size, filling in the job and generating, or uploading CSVs and asking a stream of
+questions. Each session runs in its own spawned process: AppTest is not thread-safe (threads race
+on script compilation and on the Runtime each test creates), so unlike one Streamlit replica the
+sessions don't share in-process caches. Concurrency ramps up level by level, with every session
+process warmed up by one untimed visit before the level starts. Each level reports rerun latency
+percentiles (overall and per step), throughput, CPU per rerun and per session, and RSS growth per
+session. Saturation is the first level where throughput gains less than --min-gain over the
+previous level, p95 exceeds --slo-ms, or the app fails reruns; errors of the harness itself are
+reported separately and don't count.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from benchmarks.bench_pipeline import peak_rss_mb, percentile, run_metadata
+from benchmarks.corpus import QUESTIONS, job_description, make_csv, make_cv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = {'cv': 'cv_tailor_pro.py', 'explorer': 'data_explorer.py'}
+LEVELS = (1, 2, 4, 8, 16)
+QUICK_LEVELS = (1, 2, 4)
+# Input mixes: (format, pages) per CV upload, rows per CSV, bytes per job description
+CV_MIX = (('txt', 1), ('txt', 3), ('docx', 2), ('docx', 5), ('pdf', 1), ('pdf', 5))
+CSV_ROWS = (1_000, 20_000, 100_000)
+QUICK_CSV_ROWS = (1_000, 5_000)
+JD_SIZES = (800, 3_000, 10_000)
+# Distinct seeds per input, so sessions mix repeat uploads (cache hits) with new ones
+VARIANTS = 3
+MIME = {'pdf': 'application/pdf', 'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'txt': 'text/plain'}
+
+
+# ---------- MEASUREMENT ----------
+def current_rss_mb() -> Optional[float]:
+    """Resident set size right now; falls back to the peak where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+def cpu_seconds() -> float:
+    """User plus system CPU time of this process, summed over all its threads"""
+    times = os.times()
+    return times.user + times.system
+
+
+# ---------- INPUTS ----------
+def build_inputs(app: str, quick: bool) -> Dict[str, list]:
+    """Generate every upload up front so input generation isn't counted as app CPU"""
+    if app == 'cv':
+        mix = CV_MIX[:3] if quick else CV_MIX
+        return {
+            'cvs': [(f"cv_{fmt}_{pages}p_{seed}.{fmt}", make_cv(fmt, pages, seed), MIME[fmt])
+                    for fmt, pages in mix for seed in range(VARIANTS)],
+            'jds': [job_description(size, seed) for size in JD_SIZES for seed in range(VARIANTS)],
+        }
+    return {'csvs': [(f"sales_{rows}_{seed}.csv", make_csv(rows, seed), 'text/csv')
+                     for rows in (QUICK_CSV_ROWS if quick else CSV_ROWS) for seed in range(VARIANTS)]}
+
+
+# ---------- SCENARIOS ----------
+# A scenario sets widgets on the AppTest and yields a step name; the harness then times the rerun
+class HarnessError(Exception):
+    """The scripted visit could not go on, e.g. an expected widget is missing"""
+
+
+def _button(at, label_prefix: str):
+    button = next((button for button in at.button if button.label.startswith(label_prefix)), None)
+    if button is None:
+        raise HarnessError(f"no button labelled {label_prefix}...")
+    return button
+
+
+def _nth(elements, index: int, kind: str):
+    if len(elements) <= index:
+        raise HarnessError(f"no {kind} #{index + 1} on the page")
+    return elements[index]
+
+
+def cv_visit(at, rng: random.Random, inputs: Dict[str, list]) -> Iterator[str]:
+    """Upload a CV, type the job details field by field, generate, then retarget another company"""
+    yield 'open'
+    _nth(at.file_uploader, 0, 'file uploader').set_value(rng.choice(inputs['cvs']))
+    yield 'upload'
+    _nth(at.text_input, 0, 'text input').set_value(rng.choice(["Data Scientist", "ML Engineer", "Data Analyst"]))
+    yield 'job_title'
+    _nth(at.text_input, 1, 'text input').set_value(rng.choice(["Acme", "Globex", "Initech", "NHS"]))
+    yield 'company'
+    _nth(at.text_area, 0, 'text area').set_value(rng.choice(inputs['jds']))
+    yield 'job_description'
+    _button(at, "🚀").click()
+    yield 'generate'
+    _nth(at.text_input, 1, 'text input').set_value(rng.choice(["Umbrella", "Hooli", "Stark"]))
+    yield 'company'
+    _button(at, "🚀").click()
+    yield 'regenerate'
+
+
+def explorer_visit(at, rng: random.Random, inputs: Dict[str, list]) -> Iterator[str]:
+    """Upload one or two CSVs, then ask a few questions in a row"""
+    yield 'open'
+    _nth(at.file_uploader, 0, 'file uploader').set_value(rng.sample(inputs['csvs'], rng.randint(1, 2)))
+    yield 'upload'
+    for question in rng.sample(QUESTIONS, 4):
+        _nth(at.text_input, 0, 'text input').set_value(question)
+        yield 'question'
+
+
+SCENARIOS: Dict[str, Callable] = {'cv': cv_visit, 'explorer': explorer_visit}
+
+
+# ---------- SESSIONS ----------
+def _prepare_process() -> None:
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    # Deprecation warnings from the apps' widgets would otherwise flood the output
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+
+
+def _session(app: str, inputs: Dict[str, list], seed: int, deadline: Optional[float], timeout: float,
+             records: List[tuple], errors: List[str], harness_errors: List[str]) -> None:
+    """Run visits back to back until the deadline, each as a fresh browser session; no deadline runs one visit.
+    App exceptions and timed-out reruns go to errors, failures of the scripted visit to harness_errors"""
+    from streamlit.testing.v1 import AppTest
+    rng = random.Random(seed)
+    while True:
+        at = AppTest.from_file(os.path.join(ROOT, APPS[app]), default_timeout=timeout)
+        step = 'create'
+        try:
+            for step in SCENARIOS[app](at, rng, inputs):
+                started = time.perf_counter()
+                at.run()
+                records.append((step, (time.perf_counter() - started) * 1000))
+                if at.exception:
+                    errors.append(f"{step}: {at.exception[0].message}")
+                    break
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+        except RuntimeError as e:
+            # AppTest reports a rerun that overran its timeout as a RuntimeError
+            (errors if "timed out" in str(e) else harness_errors).append(f"{step}: {type(e).__name__}: {e}")
+        except Exception as e:
+            harness_errors.append(f"{step}: {type(e).__name__}: {e}")
+        if deadline is None or time.perf_counter() >= deadline:
+            return
+
+
+def _session_process(app: str, inputs: Dict[str, list], seed: int, duration: float, timeout: float,
+                     start, results) -> None:
+    """One session in a spawned process: warm up, wait for the others at `start`, then run for duration"""
+    records: List[tuple] = []
+    errors: List[str] = []
+    harness_errors: List[str] = []
+    try:
+        _prepare_process()
+        # One untimed visit loads the lazy imports, pools and caches of this process
+        _session(app, inputs, -1, None, timeout, [], [], harness_errors)
+    except Exception as e:
+        harness_errors.append(f"warm-up: {type(e).__name__}: {e}")
+    rss_before = current_rss_mb()
+    rss_peak = [rss_before or 0.0]
+    stop = threading.Event()
+
+    def sample_rss():
+        while not stop.wait(0.25):
+            rss_peak[0] = max(rss_peak[0], current_rss_mb() or 0.0)
+
+    start.wait()
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    cpu_before = cpu_seconds()
+    _session(app, inputs, seed, time.perf_counter() + duration, timeout, records, errors, harness_errors)
+    cpu = cpu_seconds() - cpu_before
+    stop.set()
+    sampler.join()
+    results.put({'records': records, 'errors': errors, 'harness_errors': harness_errors, 'cpu': cpu,
+                 'rss_mb': rss_peak[0], 'rss_growth_mb': rss_peak[0] - rss_before if rss_before is not None else None})
+
+
+def run_level(app: str, sessions: int, inputs: Dict[str, list], duration: float, timeout: float,
+              seed: int = 0) -> Dict[str, object]:
+    """Hold `sessions` concurrent session processes for `duration` seconds and summarize the reruns"""
+    import multiprocessing
+    from queue import Empty
+    context = multiprocessing.get_context('spawn')
+    start = context.Barrier(sessions + 1)
+    results = context.Queue()
+    processes = [context.Process(target=_session_process,
+                                 args=(app, inputs, seed * 1000 + index, duration, timeout, start, results), daemon=True)
+                 for index in range(sessions)]
+    for process in processes:
+        process.start()
+    outcomes = []
+    harness_errors: List[str] = []
+    started = None
+    try:
+        # Start-up and warm-up of every process happen before the clock starts
+        start.wait(timeout=max(120.0, 3 * timeout))
+        started = time.perf_counter()
+        for _ in processes:
+            outcomes.append(results.get(timeout=duration + 2 * timeout + 60))
+    except (threading.BrokenBarrierError, Empty) as e:
+        harness_errors.append(f"{len(processes) - len(outcomes)} session processes did not report ({type(e).__name__})")
+        if started is None:
+            started = time.perf_counter()
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+    records = [record for outcome in outcomes for record in outcome['records']]
+    errors = [error for outcome in outcomes for error in outcome['errors']]
+    harness_errors += [error for outcome in outcomes for error in outcome['harness_errors']]
+    cpu = sum(outcome['cpu'] for outcome in outcomes)
+    growth = [outcome['rss_growth_mb'] for outcome in outcomes if outcome['rss_growth_mb'] is not None]
+
+    latencies = sorted(ms for _, ms in records)
+    steps = {}
+    for step in dict.fromkeys(step for step, _ in records):
+        values = sorted(ms for name, ms in records if name == step)
+        steps[step] = {'n': len(values), 'p50_ms': percentile(values, 0.50), 'p95_ms': percentile(values, 0.95)}
+    return {
+        'app': app,
+        'sessions': sessions,
+        'reruns': len(records),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'harness_errors': len(harness_errors),
+        'harness_error_samples': harness_errors[:5],
+        'elapsed_s': elapsed,
+        'reruns_per_s': len(records) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': latencies[-1] if latencies else 0.0,
+        'cpu_ms_per_rerun': cpu * 1000 / len(records) if records else 0.0,
+        'cpu_cores': cpu / elapsed if elapsed else 0.0,
+        'cpu_cores_per_session': cpu / elapsed / sessions if elapsed else 0.0,
+        'rss_mb': sum(outcome['rss_mb'] for outcome in outcomes),
+        'rss_mb_per_session': sum(growth) / len(growth) if growth else None,
+        'steps': steps,
+    }
+
+
+def saturation(levels: List[Dict], slo_ms: float, min_gain: float) -> Optional[Dict[str, object]]:
+    """The first level that stops scaling, with the reason, or None if every level kept up"""
+    previous = None
+    for row in levels:
+        reason = None
+        # Only the app's own failures count; harness errors are reported alongside
+        if row['errors']:
+            reason = f"{row['errors']} failed reruns"
+        elif row['p95_ms'] > slo_ms:
+            reason = f"p95 {row['p95_ms']:.0f} ms above the {slo_ms:.0f} ms SLO"
+        elif previous and row['reruns_per_s'] < previous['reruns_per_s'] * (1 + min_gain):
+            reason = f"throughput gained under {min_gain:.0%} over {previous['sessions']} sessions"
+        if reason:
+            return {'sessions': row['sessions'], 'max_sessions': previous['sessions'] if previous else 0,
+                    'reason': reason}
+        previous = row
+    return None
+
+
+def run_app(app: str, levels: List[int], duration: float, slo_ms: float, min_gain: float,
+            timeout: float, quick: bool) -> Dict[str, object]:
+    """Ramp one app through the concurrency levels, each with fresh session processes"""
+    inputs = build_inputs(app, quick)
+    rows = []
+    for sessions in levels:
+        row = run_level(app, sessions, inputs, duration, timeout, seed=len(rows))
+        rows.append(row)
+        print(f"{app:<9} {sessions:>8} {row['reruns']:>7} {row['errors']:>6} {row['reruns_per_s']:>9.2f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['cpu_ms_per_rerun']:>10.1f} "
+              f"{row['cpu_cores']:>6.2f} " + (f"{row['rss_mb_per_session']:>9.1f}" if row['rss_mb_per_session'] is not None else "      n/a"),
+              flush=True)
+        for error in row['harness_error_samples']:
+            print(f"  harness error (not counted): {error}", file=sys.stderr)
+        # Past the saturation point, higher levels only queue up more work
+        if saturation(rows, slo_ms, min_gain):
+            break
+    return {'app': app, 'levels': rows, 'saturation': saturation(rows, slo_ms, min_gain)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit apps with concurrent headless sessions")
+    parser.add_argument("--apps", default=",".join(APPS), help=f"comma-separated subset of {', '.join(APPS)}")
+    parser.add_argument("--levels", help=f"comma-separated session counts (default {','.join(map(str, LEVELS))})")
+    parser.add_argument("--duration", type=float, help="seconds per concurrency level (default 20, 5 with --quick)")
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="p95 rerun latency counted as saturated")
+    parser.add_argument("--min-gain", type=float, default=0.10, help="throughput gain per level below which the app is saturated")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before a single rerun counts as failed")
+    parser.add_argument("--quick", action="store_true", help="short levels and small inputs for a smoke run")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    apps = [app for app in args.apps.split(",") if app]
+    unknown = set(apps) - set(APPS)
+    if unknown:
+        parser.error(f"unknown apps: {', '.join(sorted(unknown))}")
+    if args.levels:
+        levels = [int(level) for level in args.levels.split(",")]
+    else:
+        levels = list(QUICK_LEVELS if args.quick else LEVELS)
+    duration = args.duration or (5.0 if args.quick else 20.0)
+
+    results = []
+    print(f"{'app':<9} {'sessions':>8} {'reruns':>7} {'errors':>6} {'reruns/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'CPU ms/run':>10} {'cores':>6} {'MB/sess':>9}")
+    for app in apps:
+        result = run_app(app, levels, duration, args.slo_ms, args.min_gain, args.timeout, args.quick)
+        results.append(result)
+    for result in results:
+        point = result['saturation']
+        if point:
+            print(f"{result['app']}: saturated at {point['sessions']} sessions ({point['reason']}); "
+                  f"sustains {point['max_sessions']}")
+        else:
+            print(f"{result['app']}: not saturated up to {result['levels'][-1]['sessions']} sessions")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'meta': run_metadata(), 'results': results}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Benchmarks for the extraction and generation hot paths
+Usage: python -m benchmarks.bench_pipeline [--quick] [--output results.json] [--compare baseline.json]
+
+Each case runs in a fresh worker process so its peak RSS is its own. Generator cases clear the
+keyword-feature memo before every call, so they measure a cold scan of the job description.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.corpus import cv_lines, job_description, make_cv
+
+CV_PAGES = (1, 5, 20, 50)
+JD_SIZES = (500, 5_000, 20_000, 100_000)
+QUICK_CV_PAGES = (1, 5)
+QUICK_JD_SIZES = (500, 5_000)
+CV_FORMATS = ('txt', 'docx', 'pdf')
+GENERATOR_STAGES = ('summary', 'skills', 'cover_letter', 'linkedin')
+STAGES = ('extract', 'sections') + GENERATOR_STAGES
+
+
+# ---------- MEASUREMENT ----------
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _case_callable(stage: str, params: Dict[str, int]):
+    """Build the inputs for one case and return (call, input_bytes)"""
+    import cv_tailor_core as core
+    from cv_parser import clear_parse_cache
+    from keyword_matcher import text_features
+
+    if stage == 'extract':
+        fmt, pages = params['format'], params['pages']
+        data = make_cv(fmt, pages)
+        upload = core.NamedBuffer(data, f"cv.{fmt}")
+        return (lambda: core.extract_text_from_file(upload)), len(data)
+    cv_text = "\n".join(cv_lines(params.get('pages', 2)))
+    if stage == 'sections':
+        def parse_call():
+            clear_parse_cache()
+            return core.extract_sections(cv_text)
+        return parse_call, len(cv_text.encode('utf-8'))
+
+    job_desc = job_description(params['jd_bytes'])
+    generators = {
+        'summary': lambda: core.generate_tailored_summary(job_desc, cv_text),
+        'skills': lambda: core.generate_tailored_skills(job_desc, cv_text),
+        'cover_letter': lambda: core.generate_cover_letter(job_desc, cv_text, "Acme", "Data Scientist"),
+        'linkedin': lambda: core.generate_linkedin_message("Data Scientist", "Acme", job_desc),
+    }
+    generate = generators[stage]
+
+    def cold_call():
+        text_features.cache_clear()
+        clear_parse_cache()
+        return generate()
+    return cold_call, len(job_desc.encode('utf-8'))
+
+
+def run_case(stage: str, params: Dict[str, int], reps: int, max_seconds: float,
+             pdf_workers: Optional[int] = None) -> Dict[str, object]:
+    """Time one case in this process; meant to run in a dedicated worker"""
+    import extractors
+    if pdf_workers is not None:
+        extractors.PDF_WORKERS = pdf_workers
+    rss_before = peak_rss_mb()
+    call, input_bytes = _case_callable(stage, params)
+    samples: List[float] = []
+    try:
+        call()  # warm-up: lazy imports, pools
+        started = time.perf_counter()
+        while len(samples) < reps and (len(samples) < 3 or time.perf_counter() - started < max_seconds):
+            t0 = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - t0) * 1000)
+    finally:
+        # A leftover page pool would keep this worker process from exiting
+        extractors.shutdown_pool()
+    total_s = sum(samples) / 1000
+    samples.sort()
+    rss_after = peak_rss_mb()
+    return {
+        'stage': stage,
+        'case': "-".join(f"{key}={value}" for key, value in params.items()),
+        'params': params,
+        'n': len(samples),
+        'input_bytes': input_bytes,
+        'mean_ms': total_s * 1000 / len(samples),
+        'p50_ms': percentile(samples, 0.50),
+        'p95_ms': percentile(samples, 0.95),
+        'p99_ms': percentile(samples, 0.99),
+        'ops_per_s': len(samples) / total_s if total_s else 0.0,
+        'mb_per_s': input_bytes * len(samples) / total_s / 1e6 if total_s else 0.0,
+        'peak_rss_mb': rss_after,
+        'rss_growth_mb': rss_after - rss_before if rss_after is not None else None,
+    }
+
+
+def build_cases(stages: List[str], quick: bool) -> List[tuple]:
+    pages = QUICK_CV_PAGES if quick else CV_PAGES
+    jd_sizes = QUICK_JD_SIZES if quick else JD_SIZES
+    cases = []
+    for stage in stages:
+        if stage == 'extract':
+            cases += [(stage, {'format': fmt, 'pages': count}) for fmt in CV_FORMATS for count in pages]
+        elif stage == 'sections':
+            cases += [(stage, {'pages': count}) for count in pages]
+        else:
+            cases += [(stage, {'jd_bytes': size}) for size in jd_sizes]
+    return cases
+
+
+def run_isolated(stage: str, params: Dict[str, int], reps: int, max_seconds: float,
+                 pdf_workers: Optional[int]) -> Dict[str, object]:
+    """Run a case in a fresh spawn-based worker so peak RSS is attributable to it"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(run_case, stage, params, reps, max_seconds, pdf_workers).result()
+
+
+# ---------- REPORTING ----------
+def run_metadata() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit,
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count()}
+
+
+def compare(results: List[Dict], baseline_path: str, threshold: float) -> int:
+    """Print p95 changes against a previous run; returns the number of regressions"""
+    with open(baseline_path, encoding='utf-8') as fh:
+        baseline = {(row['stage'], row['case']): row for row in json.load(fh)['results']}
+    regressions = 0
+    print(f"\nComparison with {baseline_path} (p95, regression threshold {threshold:.0%})")
+    for row in results:
+        old = baseline.get((row['stage'], row['case']))
+        if not old or not old['p95_ms']:
+            continue
+        change = row['p95_ms'] / old['p95_ms'] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"  {row['stage']:<13} {row['case']:<22} {old['p95_ms']:9.3f} -> {row['p95_ms']:9.3f} ms "
+              f"{change:+7.1%} {flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark extraction, section parsing and generators")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {', '.join(STAGES)}")
+    parser.add_argument("--quick", action="store_true", help="small corpus for a fast smoke run")
+    parser.add_argument("--reps", type=int, default=50, help="max timed calls per case")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="time budget per case")
+    parser.add_argument("--pdf-workers", type=int, help="override CV_TAILOR_PDF_WORKERS in the workers")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p95 slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = []
+    print(f"{'stage':<13} {'case':<22} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'MB/s':>8} {'RSS MB':>7}")
+    for stage, params in build_cases(stages, args.quick):
+        row = run_isolated(stage, params, args.reps, args.max_seconds, args.pdf_workers)
+        results.append(row)
+        rss = f"{row['peak_rss_mb']:7.1f}" if row['peak_rss_mb'] is not None else "    n/a"
+        print(f"{row['stage']:<13} {row['case']:<22} {row['n']:>4} {row['p50_ms']:9.3f} {row['p95_ms']:9.3f} "
+              f"{row['p99_ms']:9.3f} {row['ops_per_s']:9.1f} {row['mb_per_s']:8.2f} {rss}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'meta': run_metadata(), 'results': results}, fh, indent=2)
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Synthetic corpus for benchmarks - CVs as PDF/DOCX/TXT, job descriptions of a target size and sales CSVs
+Everything is generated with the standard library and seeded, so runs are comparable.
+"""
+
+import random
+import zipfile
+from io import BytesIO
+from typing import List
+from xml.sax.saxutils import escape
+
+LINES_PER_PAGE = 45
+
+_SECTIONS = ['Professional Summary', 'Skills', 'Experience', 'Education', 'Projects', 'Certifications']
+_SKILLS = ['Python', 'SQL', 'pandas', 'NumPy', 'scikit-learn', 'TensorFlow', 'PyTorch', 'Power BI',
+           'Tableau', 'AWS', 'Azure', 'GCP', 'Spark', 'Hadoop', 'Docker', 'Kubernetes', 'R', 'NLP',
+           'machine learning', 'deep learning', 'ETL', 'dashboards', 'statistics', 'A/B testing']
+_WORDS = ['delivered', 'built', 'led', 'senior', 'team', 'stakeholders', 'pipeline', 'model', 'analysis',
+          'customer', 'revenue', 'forecast', 'data', 'platform', 'insights', 'reporting', 'improved',
+          'reduced', 'latency', 'quality', 'strategy', 'cross-functional', 'product', 'growth', 'the',
+          'and', 'with', 'for', 'using', 'across', 'to', 'of', 'in', 'requirements', 'experience']
+
+
+def _sentence(rng: random.Random, length: int = 12) -> str:
+    words = [rng.choice(_SKILLS) if rng.random() < 0.2 else rng.choice(_WORDS) for _ in range(length)]
+    return " ".join(words).capitalize() + "."
+
+
+def cv_lines(pages: int, seed: int = 0) -> List[str]:
+    """Plain-text CV lines filling roughly `pages` pages, with the usual section headings"""
+    rng = random.Random(seed)
+    lines = ['Jane Doe - Data Scientist', 'jane.doe@example.com | London']
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(_SECTIONS[len(lines) // 12 % len(_SECTIONS)] if len(lines) % 12 == 0 else _sentence(rng))
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def job_description(size_bytes: int, seed: int = 0) -> str:
+    """Job description text of about size_bytes bytes"""
+    rng = random.Random(seed)
+    parts = ['We are hiring a Data Scientist.']
+    total = len(parts[0])
+    while total < size_bytes:
+        sentence = _sentence(rng, rng.randint(8, 20))
+        parts.append(sentence)
+        total += len(sentence) + 1
+    return " ".join(parts)[:size_bytes]
+
+
+# ---------- FILE FORMATS ----------
+def make_txt(lines: List[str]) -> bytes:
+    return "\n".join(lines).encode('utf-8')
+
+
+def _pdf_string(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    """Minimal text PDF (Helvetica, LINES_PER_PAGE lines per page) that PyPDF2 can extract"""
+    pages = [lines[start:start + LINES_PER_PAGE] for start in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    kids = " ".join(f"{3 + 2 * index} 0 R" for index in range(len(pages)))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode()]
+    for index, page_lines in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * index} 0 R >>".encode()
+        )
+        body = "BT /F1 9 Tf 40 760 Td 16 TL " + " ".join(
+            f"({_pdf_string(line)}) '" for line in page_lines) + " ET"
+        stream = body.encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def make_docx(lines: List[str]) -> bytes:
+    """Minimal DOCX with one paragraph per line"""
+    body = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>" for line in lines)
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr('[Content_Types].xml',
+                      '<?xml version="1.0" encoding="UTF-8"?>'
+                      '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                      '<Default Extension="xml" ContentType="application/xml"/></Types>')
+        zipf.writestr('word/document.xml',
+                      f'<?xml version="1.0" encoding="UTF-8"?><w:document {_W_NS}><w:body>{body}</w:body></w:document>')
+    return buffer.getvalue()
+
+
+FORMATS = {'pdf': make_pdf, 'docx': make_docx, 'txt': make_txt}
+
+
+def make_cv(fmt: str, pages: int, seed: int = 0) -> bytes:
+    """CV file bytes in the given format ('pdf', 'docx' or 'txt')"""
+    return FORMATS[fmt](cv_lines(pages, seed))
+
+
+# ---------- DATA EXPLORER ----------
+_PRODUCTS = ['Laptop', 'Phone', 'Tablet', 'Monitor', 'Keyboard', 'Headset', 'Camera', 'Router']
+_REGIONS = ['North', 'South', 'East', 'West']
+QUESTIONS = [
+    "Show average sales by product for Q1 2024",
+    "Total sales by region",
+    "Show sales trend over time",
+    "Top 5 products by quantity",
+    "Average price by region and product",
+    "How many orders per month in 2023",
+    "Show the distribution of sales",
+]
+
+
+def make_csv(rows: int, seed: int = 0) -> bytes:
+    """Sales table CSV (order_id, date, product, region, quantity, price, sales) with `rows` rows"""
+    rng = random.Random(seed)
+    out = ["order_id,date,product,region,quantity,price,sales"]
+    for order_id in range(1, rows + 1):
+        quantity, price = rng.randint(1, 20), round(rng.uniform(5, 2000), 2)
+        out.append(f"{order_id},{2023 + rng.randint(0, 1)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},"
+                   f"{rng.choice(_PRODUCTS)},{rng.choice(_REGIONS)},{quantity},{price},{round(quantity * price, 2)}")
+    return ("\n".join(out) + "\n").encode('utf-8')
@@ -0,0 +1,118 @@
+"""
+Server-side chart data for the data explorer
+Turns a query plan into a small, chart-ready frame so the browser never receives the raw rows:
+line series are aggregated to the plan's time grain and reduced with Largest-Triangle-Three-
+Buckets, bar charts keep the top groups, histograms are binned here, and scatter plots are a
+seeded uniform sample. Every chart is capped at DATA_EXPLORER_CHART_POINTS points.
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from aggregate_cache import AggregateRequest, get_default_aggregate_cache
+
+MAX_POINTS = int(os.environ.get('DATA_EXPLORER_CHART_POINTS', 2000))
+MAX_BARS = 50
+MAX_SERIES = 10
+HISTOGRAM_BINS = 40
+
+
+# ====== DOWNSAMPLING ======
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of `threshold` points that keep the visual shape of the series (Steinarsson's LTTB)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # First and last points are fixed; the rest is split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], max(edges[bucket + 1], edges[bucket] + 1)
+        next_start = stop
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:max(next_stop, next_start + 1)].mean()
+        next_y = y[next_start:max(next_stop, next_start + 1)].mean()
+        # Pick the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_line(frame: pd.DataFrame, x: str, y: str, series: Optional[str] = None,
+                    max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """LTTB per series, splitting the point budget evenly across series"""
+    frame = frame.sort_values(x)
+    groups = [frame] if series is None else [group for _, group in frame.groupby(series, observed=True)]
+    budget = max(3, max_points // max(1, len(groups)))
+    parts = []
+    for group in groups:
+        x_values = group[x]
+        numeric_x = x_values.astype('int64') if pd.api.types.is_datetime64_any_dtype(x_values) else x_values
+        parts.append(group.iloc[lttb(numeric_x.to_numpy(dtype=np.float64), group[y].to_numpy(dtype=np.float64),
+                                     budget)])
+    return pd.concat(parts, ignore_index=True)
+
+
+def histogram(values: pd.Series, bins: int = HISTOGRAM_BINS) -> pd.DataFrame:
+    """Counts per equal-width bin, labelled by bin start"""
+    data = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    data = data[np.isfinite(data)]
+    if not len(data):
+        return pd.DataFrame({'bin': [], 'count': []})
+    counts, edges = np.histogram(data, bins=bins)
+    return pd.DataFrame({'bin': np.round(edges[:-1], 4), 'count': counts})
+
+
+def sample_points(frame: pd.DataFrame, max_points: int = MAX_POINTS, seed: int = 0) -> pd.DataFrame:
+    """Uniform row sample; seeded so reruns draw the same points"""
+    if len(frame) <= max_points:
+        return frame
+    return frame.sample(n=max_points, random_state=seed)
+
+
+# ====== CHART SPECS ======
+def build_chart(df: pd.DataFrame, plan, dataset_key: Optional[str] = None,
+                max_points: int = MAX_POINTS) -> Optional[Dict[str, object]]:
+    """{'kind', 'data', 'x', 'y', 'color', 'rows_in'} for the plan's chart, or None for a summary table"""
+    measures = [ref.column for ref in plan.measures if ref.column in df.columns]
+    spec = {'rows_in': len(df), 'color': None}
+
+    if plan.intent == 'correlation' and len(measures) >= 2:
+        points = sample_points(df[measures[:2]].dropna(), max_points)
+        return dict(spec, kind='scatter', data=points, x=measures[0], y=measures[1])
+
+    if plan.intent == 'distribution' and measures:
+        return dict(spec, kind='histogram', data=histogram(df[measures[0]]), x='bin', y='count')
+
+    request = AggregateRequest.from_plan(plan, dataset_key) if dataset_key else None
+    if request is not None and all(column in df.columns for column in request.dims + request.measures):
+        aggregated, _ = get_default_aggregate_cache().answer(request, df)
+        keys = ([request.grain] if request.grain else []) + list(request.dims)
+        value = [column for column in aggregated.columns if column not in keys][0]
+        if request.grain:
+            color = request.dims[0] if request.dims else None
+            if color is not None:
+                # One line per group for the largest groups only
+                top = aggregated.groupby(color, observed=True)[value].sum().nlargest(MAX_SERIES).index
+                aggregated = aggregated[aggregated[color].isin(top)]
+            data = downsample_line(aggregated, request.grain, value, color, max_points)
+            return dict(spec, kind='line', data=data, x=request.grain, y=value, color=color)
+        dimension = request.dims[0]
+        top = aggregated.groupby(dimension, observed=True)[value].sum().nlargest(MAX_BARS).reset_index()
+        return dict(spec, kind='bar', data=top, x=dimension, y=value)
+
+    if plan.intent == 'trend' and measures:
+        # No time column: plot the measure in row order
+        series = pd.DataFrame({'row': np.arange(len(df)), measures[0]: df[measures[0]].to_numpy()})
+        return dict(spec, kind='line', data=downsample_line(series, 'row', measures[0], None, max_points),
+                    x='row', y=measures[0])
+    return None
@@ -0,0 +1,351 @@
+"""
+Recruiter mode - a searchable index over a corpus of CVs
+Usage: python cv_corpus.py ingest cvs/ --index cv_index [--workers 8]
+       python cv_corpus.py search job.txt --index cv_index [-k 20]
+
+CVs from a directory tree or a zip are extracted on a process pool and turned into hashed
+sparse term vectors (words and word pairs, sublinear tf). The index is stored as .npy arrays in
+feature-major (CSC) order and memory-mapped on open, so a query only reads the postings of its
+own terms. Scores are TF-IDF cosine similarities with the current document frequencies.
+Re-ingesting skips files whose size and timestamp (or zip CRC) are unchanged and drops CVs that
+are no longer in the source.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import zipfile
+import zlib
+from collections import Counter, deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from cv_tailor_core import NamedBuffer, extract_text_from_file, is_extraction_error
+
+N_FEATURES = 1 << 20
+SUFFIXES = ('.pdf', '.docx', '.txt')
+INDEX_VERSION = 1
+
+_WORD = re.compile(r"[a-z][a-z0-9+#]*")
+STOP_WORDS = frozenset("""a an and are as at be by for from has have in is it its of on or that the to was
+were will with i me my we our you your he she they this these those who which""".split())
+
+
+# ---------- VECTORIZING ----------
+def term_vector(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(feature ids, sublinear tf weights) over words and adjacent word pairs, feature-hashed"""
+    words = [word for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+    counts = Counter(zlib.crc32(word.encode()) & (N_FEATURES - 1) for word in words)
+    counts.update(zlib.crc32(f"{a} {b}".encode()) & (N_FEATURES - 1) for a, b in zip(words, words[1:]))
+    features = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    return features, weights.astype(np.float32)
+
+
+# ---------- SOURCES ----------
+def iter_sources(source: str) -> Iterator[Tuple[str, str]]:
+    """(name, fingerprint) for every CV file in a directory tree or zip"""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zipf:
+            for info in zipf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(SUFFIXES):
+                    yield info.filename, f"{info.file_size}:{info.CRC}"
+        return
+    for root, _, files in os.walk(source):
+        for filename in sorted(files):
+            if filename.lower().endswith(SUFFIXES):
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # e.g. a dangling symlink: never matches a stored fingerprint, so the read error gets reported
+                    yield os.path.relpath(path, source), ""
+                    continue
+                yield os.path.relpath(path, source), f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+_worker_source = ""
+_worker_zip: Optional[zipfile.ZipFile] = None
+
+
+def _init_worker(source: str) -> None:
+    global _worker_source, _worker_zip
+    # Workers are already a pool; long PDFs must not start a nested one
+    import extractors
+    extractors.PDF_WORKERS = 1
+    _worker_source = source
+    _worker_zip = zipfile.ZipFile(source) if zipfile.is_zipfile(source) else None
+
+
+def _vectorize_files(names: List[str]) -> List[Tuple[str, Optional[np.ndarray], Optional[np.ndarray], str]]:
+    """(name, features, weights, error) per file; unreadable files and extraction failures carry the message instead"""
+    results = []
+    for name in names:
+        try:
+            if _worker_zip is not None:
+                data = _worker_zip.read(name)
+            else:
+                with open(os.path.join(_worker_source, name), 'rb') as fh:
+                    data = fh.read()
+        except (OSError, zipfile.BadZipFile) as e:
+            # One unreadable file (deleted mid-ingest, no permission, corrupt zip member) must not stop the rest
+            results.append((name, None, None, f"Could not read file: {e}"))
+            continue
+        text = extract_text_from_file(NamedBuffer(data, os.path.basename(name)))
+        if is_extraction_error(text):
+            results.append((name, None, None, text))
+        else:
+            results.append((name, *term_vector(text), ""))
+    return results
+
+
+# ---------- INDEX ----------
+ARRAYS = ('indptr', 'doc_ids', 'weights', 'idf', 'norms')
+
+
+class CorpusIndex:
+    """On-disk sparse index of CV vectors; arrays are memory-mapped read-only once saved"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        # (documents, arrays) swapped as one reference, so searches never see half an ingest
+        self._state: Tuple[List[Dict[str, str]], Dict[str, np.ndarray]] = ([], {
+            'indptr': np.zeros(N_FEATURES + 1, dtype=np.int64),
+            'doc_ids': np.zeros(0, dtype=np.int32),
+            'weights': np.zeros(0, dtype=np.float32),
+            'idf': np.zeros(N_FEATURES, dtype=np.float32),
+            'norms': np.zeros(0, dtype=np.float32),
+        })
+        self._ingest_lock = threading.Lock()
+        if os.path.exists(self._path('docs.json')):
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    @property
+    def docs(self) -> List[Dict[str, str]]:
+        return self._state[0]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self) -> None:
+        with open(self._path('docs.json'), encoding='utf-8') as fh:
+            meta = json.load(fh)
+        if meta.get('version') != INDEX_VERSION or meta.get('features') != N_FEATURES:
+            raise ValueError(f"{self.directory}: index was built with a different format; re-ingest into a new directory")
+        self._state = (meta['docs'], {name: np.load(self._path(f"{name}.npy"), mmap_mode='r') for name in ARRAYS})
+
+    # ---------- INGEST ----------
+    def ingest(self, source: str, workers: int = os.cpu_count() or 1, chunk_size: int = 16) -> Dict[str, object]:
+        """Sync the index with source: add new and changed CVs, drop ones no longer there, rewrite the index.
+        A changed CV that can no longer be read is dropped too, so it is retried on the next ingest.
+        Returns counts per outcome plus 'errors', a list of (name, reason) for CVs that could not be read"""
+        source = os.path.abspath(source)
+        with self._ingest_lock:
+            docs = [dict(doc) for doc in self._state[0]]
+            # The same file name may turn up in several sources, so documents are keyed by both
+            by_key = {(doc['source'], doc['name']): position for position, doc in enumerate(docs)}
+            found = list(iter_sources(source))
+            pending = [(name, fingerprint) for name, fingerprint in found
+                       if (source, name) not in by_key or docs[by_key[source, name]]['fingerprint'] != fingerprint]
+            fingerprints = dict(pending)
+            present = {name for name, _ in found}
+            removed = [position for position, doc in enumerate(docs)
+                       if doc['source'] == source and doc['name'] not in present]
+            stats: Dict[str, object] = {'unchanged': len(found) - len(pending), 'added': 0, 'updated': 0,
+                                        'removed': len(removed), 'failed': 0, 'errors': []}
+
+            vectors: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+            for name, features, weights, error in self._extract(source, [name for name, _ in pending], workers, chunk_size):
+                position = by_key.get((source, name))
+                if features is None:
+                    stats['failed'] += 1
+                    stats['errors'].append((name, error))
+                    if position is not None:
+                        # The stored vectors and fingerprint describe the old content
+                        removed.append(position)
+                    continue
+                if position is not None:
+                    stats['updated'] += 1
+                else:
+                    stats['added'] += 1
+                    position = by_key[source, name] = len(docs)
+                    docs.append({'source': source, 'name': name})
+                docs[position]['fingerprint'] = fingerprints[name]
+                vectors[position] = (features, weights)
+            if vectors or removed:
+                arrays = self._rebuild(len(docs), vectors, removed)
+                removed_set = set(removed)
+                self._save([doc for position, doc in enumerate(docs) if position not in removed_set], arrays)
+        return stats
+
+    def _extract(self, source: str, names: List[str], workers: int, chunk_size: int):
+        chunks = [names[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+        if workers <= 1:
+            _init_worker(source)
+            for chunk in chunks:
+                yield from _vectorize_files(chunk)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        # Spawned rather than forked: the Streamlit server that calls this runs other threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(source,)) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(pool.submit(_vectorize_files, chunk))
+                if len(in_flight) >= workers * 2:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+    def _rebuild(self, n_docs: int, vectors: Dict[int, Tuple[np.ndarray, np.ndarray]],
+                 removed: List[int] = ()) -> Dict[str, np.ndarray]:
+        """Stored postings merged with the new vectors (replacing updated CVs) minus the removed CVs,
+        with document ids compacted and idf and norms recomputed"""
+        arrays = self._state[1]
+        features = np.repeat(np.arange(N_FEATURES, dtype=np.int32), np.diff(arrays['indptr']))
+        dropped = np.fromiter(list(vectors) + list(removed), dtype=np.int32, count=len(vectors) + len(removed))
+        keep = ~np.isin(arrays['doc_ids'], dropped)
+        feature_parts = [features[keep]]
+        doc_parts = [np.asarray(arrays['doc_ids'])[keep]]
+        weight_parts = [np.asarray(arrays['weights'])[keep]]
+        for position, (ids, weights) in vectors.items():
+            feature_parts.append(ids)
+            doc_parts.append(np.full(len(ids), position, dtype=np.int32))
+            weight_parts.append(weights)
+        features = np.concatenate(feature_parts)
+        order = np.argsort(features, kind='stable')
+        features = features[order]
+        doc_ids = np.concatenate(doc_parts)[order]
+        if len(removed):
+            survivors = np.ones(n_docs, dtype=bool)
+            survivors[removed] = False
+            doc_ids = (np.cumsum(survivors, dtype=np.int32) - 1)[doc_ids]
+            n_docs -= len(removed)
+        weights = np.concatenate(weight_parts)[order]
+        document_frequency = np.bincount(features, minlength=N_FEATURES)
+        idf = (np.log((1 + n_docs) / (1 + document_frequency)) + 1).astype(np.float32)
+        weighted = weights * idf[features]
+        return {
+            'indptr': np.concatenate([[0], np.cumsum(document_frequency)]).astype(np.int64),
+            'doc_ids': doc_ids,
+            'weights': weights,
+            'idf': idf,
+            'norms': np.sqrt(np.bincount(doc_ids, weights=weighted * weighted, minlength=n_docs)).astype(np.float32),
+        }
+
+    def _save(self, docs: List[Dict[str, str]], arrays: Dict[str, np.ndarray]) -> None:
+        """Write arrays then the document list, each via a temporary file and rename, and map them"""
+        os.makedirs(self.directory, exist_ok=True)
+        for name in ARRAYS:
+            tmp_path = self._path(f"{name}.tmp.npy")
+            np.save(tmp_path, arrays[name])
+            os.replace(tmp_path, self._path(f"{name}.npy"))
+        tmp_path = self._path('docs.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'version': INDEX_VERSION, 'features': N_FEATURES, 'docs': docs}, fh)
+        os.replace(tmp_path, self._path('docs.json'))
+        self._open()
+
+    # ---------- SEARCH ----------
+    def search(self, job_description: str, k: int = 10) -> List[Dict[str, object]]:
+        """Top-k CVs by cosine similarity to the job description"""
+        docs, arrays = self._state
+        if not docs:
+            return []
+        idf = arrays['idf']
+        features, weights = term_vector(job_description)
+        query = weights * idf[features]
+        query_norm = float(np.sqrt(np.dot(query, query)))
+        if not query_norm:
+            return []
+        # Only the postings of the query's own features are read
+        starts, stops = arrays['indptr'][features], arrays['indptr'][features + 1]
+        lengths = stops - starts
+        total = int(lengths.sum())
+        if not total:
+            return []
+        # Concatenated posting ranges without a Python loop over the query terms
+        positions = np.arange(total) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        contributions = arrays['weights'][positions] * np.repeat(query * idf[features], lengths)
+        scores = np.bincount(arrays['doc_ids'][positions], weights=contributions, minlength=len(docs))
+        norms = np.asarray(arrays['norms'])
+        scores = np.divide(scores, norms * query_norm, out=np.zeros_like(scores), where=norms > 0)
+        k = min(k, int((scores > 0).sum()))
+        if not k:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [{'name': docs[i]['name'], 'source': docs[i]['source'], 'score': round(float(scores[i]), 4)}
+                for i in top]
+
+
+_default_index: Optional[CorpusIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_default_corpus_index() -> CorpusIndex:
+    """Process-wide index in CV_TAILOR_CORPUS_INDEX (default cv_index)"""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = CorpusIndex(os.environ.get('CV_TAILOR_CORPUS_INDEX', 'cv_index'))
+        return _default_index
+
+
+def list_corpus_sources(root: str) -> List[str]:
+    """The root and the directories and zips directly under it that resolve inside it.
+    These are the only sources the app ingests (CV_TAILOR_CORPUS_ROOT); the command line takes any path"""
+    root = os.path.realpath(root)
+    sources = [root]
+    for entry in sorted(os.listdir(root)):
+        path = os.path.realpath(os.path.join(root, entry))
+        if os.path.commonpath([root, path]) == root and (os.path.isdir(path) or path.lower().endswith('.zip')):
+            sources.append(path)
+    return sources
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Index a corpus of CVs and rank them against a job description")
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help="add a directory or zip of PDF/DOCX/TXT CVs to the index")
+    ingest.add_argument("source", help="directory (searched recursively) or .zip file")
+    ingest.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    search = commands.add_parser('search', help="rank indexed CVs against a job description")
+    search.add_argument("job_description", help="text file with the job description, '-' for stdin")
+    search.add_argument("-k", type=int, default=20, help="number of CVs to return")
+    for command in (ingest, search):
+        command.add_argument("--index", default=os.environ.get('CV_TAILOR_CORPUS_INDEX', 'cv_index'),
+                             help="index directory (default CV_TAILOR_CORPUS_INDEX or cv_index)")
+    args = parser.parse_args(argv)
+
+    try:
+        index = CorpusIndex(args.index)
+        if args.command == 'ingest':
+            stats = index.ingest(args.source, args.workers)
+            for name, error in stats.pop('errors'):
+                print(f"{name}: {error}", file=sys.stderr)
+            print(json.dumps(dict(stats, indexed=len(index))), file=sys.stderr)
+            return 0
+        if args.job_description == '-':
+            job_description = sys.stdin.read()
+        else:
+            with open(args.job_description, encoding='utf-8') as fh:
+                job_description = fh.read()
+        for match in index.search(job_description, args.k):
+            print(json.dumps(match, ensure_ascii=False))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Structured CV parse model shared by the generators
+A CV is parsed once into sections, vocabulary skills with their spans, seniority signals and
+experience date ranges. Parses are memoized by content hash, so the Streamlit app, the HTTP
+service and batch runs reuse one record per CV however many postings it is tailored against.
+"""
+
+import datetime
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from keyword_matcher import MATCHER, SENIOR_TERMS, JUNIOR_TERMS
+
+MAX_CACHED = 256
+
+# ---------- SECTIONS ----------
+SECTION_HEADINGS = {
+    'summary': ('summary', 'profile', 'objective', 'about me'),
+    'skills': ('skills', 'competencies', 'technologies', 'tech stack'),
+    'experience': ('experience', 'employment', 'work history', 'career history'),
+    'education': ('education', 'qualifications'),
+    'certifications': ('certifications', 'certificates', 'licenses'),
+    'projects': ('projects',),
+}
+# Words that may qualify a heading word, as in "Professional Summary" or "Key Skills"
+HEADING_QUALIFIERS = ('professional', 'technical', 'key', 'core', 'relevant', 'work', 'career', 'selected',
+                      'additional', 'academic', 'personal')
+
+
+def _heading_phrase(words) -> str:
+    return r"(?:(?:" + "|".join(HEADING_QUALIFIERS) + r")\s+)*(?:" + "|".join(words) + r")"
+
+
+# A heading line holds nothing but heading words: a phrase naming the section, optionally followed
+# by further phrases ("Skills & Competencies", "Skills Summary") and a colon, so "5 years
+# experience in Python" stays content
+_ANY_HEADING = _heading_phrase(word for words in SECTION_HEADINGS.values() for word in words)
+_HEADINGS = {section: re.compile(_heading_phrase(words) + r"(?:(?:\s*(?:&|and|/|,)\s*|\s+)" + _ANY_HEADING + r")*\s*:?")
+             for section, words in SECTION_HEADINGS.items()}
+
+# ---------- DATES ----------
+_MONTHS = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+           'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+_DATE = r"(?:(?P<{p}mon>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+|(?P<{p}num>0?[1-9]|1[0-2])[/.-])?" \
+        r"(?P<{p}year>(?:19|20)\d\d)"
+_DATE_RANGE = re.compile(
+    r"\b" + _DATE.format(p='s') + r"\s*(?:-|–|—|to|until)\s*(?:" + _DATE.format(p='e') + r"|(?P<current>present|current|now|today))\b"
+)
+
+
+def _month(match, prefix: str, default: int) -> int:
+    name, number = match.group(f'{prefix}mon'), match.group(f'{prefix}num')
+    if name:
+        return _MONTHS[name]
+    return int(number) if number else default
+
+
+def _date_ranges(lower: str, today: datetime.date) -> List[Tuple[Tuple[int, int], Tuple[int, int], bool]]:
+    """((start_year, start_month), (end_year, end_month), is_current) for every date range"""
+    ranges = []
+    for match in _DATE_RANGE.finditer(lower):
+        start = (int(match.group('syear')), _month(match, 's', 1))
+        if match.group('current'):
+            end, current = (today.year, today.month), True
+        else:
+            end, current = (int(match.group('eyear')), _month(match, 'e', 12)), False
+        if end >= start:
+            ranges.append((start, end, current))
+    return ranges
+
+
+def _months_covered(ranges) -> int:
+    """Months covered by the union of the ranges, so overlapping roles are not counted twice"""
+    total, reach = 0, None
+    for start, end, _ in sorted(ranges):
+        first, last = start[0] * 12 + start[1], end[0] * 12 + end[1]
+        if reach is not None and first <= reach:
+            first = reach + 1
+        if last >= first:
+            total += last - first + 1
+        reach = last if reach is None else max(reach, last)
+    return total
+
+
+# ---------- PARSE MODEL ----------
+class ParsedCV:
+    """Compact structured record of one CV"""
+    __slots__ = ('key', 'sections', 'skills', 'features', 'seniority', 'seniority_signals',
+                 'experience', 'years_experience')
+
+    def __init__(self, key: str, sections: Dict[str, List[str]], skills: Dict[str, List[Tuple[int, int]]],
+                 experience: List[tuple]):
+        self.key = key
+        self.sections = sections
+        # Vocabulary term -> spans in the lower-cased CV text
+        self.skills = skills
+        self.features: FrozenSet[str] = frozenset(skills)
+        senior, junior = self.features & SENIOR_TERMS, self.features & JUNIOR_TERMS
+        self.seniority = 'senior' if senior else 'junior' if junior else 'mid'
+        self.seniority_signals = sorted(senior or junior)
+        self.experience = experience
+        self.years_experience = round(_months_covered(experience) / 12, 1)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'sections': {name: len(lines) for name, lines in self.sections.items()},
+            'skills': {term: len(spans) for term, spans in self.skills.items()},
+            'seniority': self.seniority,
+            'seniority_signals': self.seniority_signals,
+            'experience': [{'start': f"{s[0]}-{s[1]:02d}", 'end': 'present' if current else f"{e[0]}-{e[1]:02d}"}
+                           for s, e, current in self.experience],
+            'years_experience': self.years_experience,
+        }
+
+
+def parse_sections(text: str) -> Dict[str, List[str]]:
+    """Non-empty lines grouped under the last recognised heading; lines before any heading are dropped"""
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        lower = line.lower()
+        heading = next((name for name, pattern in _HEADINGS.items() if pattern.fullmatch(lower)), None)
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+        elif current:
+            sections[current].append(line)
+    return sections
+
+
+def _parse(key: str, cv_text: str, today: Optional[datetime.date] = None) -> ParsedCV:
+    sections = parse_sections(cv_text)
+    # Dates are read from the experience section when there is one, so education years don't count
+    dated = "\n".join(sections['experience']) if sections.get('experience') else cv_text
+    return ParsedCV(key, sections, MATCHER.spans(cv_text), _date_ranges(dated.lower(), today or datetime.date.today()))
+
+
+_parsed: "OrderedDict[str, ParsedCV]" = OrderedDict()
+_parsed_lock = threading.Lock()
+
+
+def parse_cv(cv_text: str) -> ParsedCV:
+    """The parse record for this CV text, built once per distinct content"""
+    key = hashlib.sha256(cv_text.encode('utf-8', 'surrogatepass')).hexdigest()
+    with _parsed_lock:
+        parsed = _parsed.get(key)
+        if parsed is not None:
+            _parsed.move_to_end(key)
+            return parsed
+    parsed = _parse(key, cv_text)
+    with _parsed_lock:
+        _parsed[key] = parsed
+        while len(_parsed) > MAX_CACHED:
+            _parsed.popitem(last=False)
+    return parsed
+
+
+def clear_parse_cache() -> None:
+    with _parsed_lock:
+        _parsed.clear()
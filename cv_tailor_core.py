@@ -0,0 +1,212 @@
+"""
+CV Tailor core - text extraction and tailored content generation
+Importable without Streamlit; PDF support is loaded on first use
+"""
+
+from typing import List, Dict, Optional
+from io import BytesIO
+from pathlib import Path
+
+from cv_parser import ParsedCV, parse_cv
+from doc_templates import render as render_template
+from extractors import extract_docx_text, extract_pdf_text, extract_txt_text
+from instrumentation import span
+from keyword_matcher import (
+    TECH_KEYWORDS, CV_PYTHON_TERMS, CV_SQL_TERMS, CV_ML_TERMS,
+    JD_PYTHON_TERMS, JD_SQL_TERMS, JD_ML_TERMS, JD_DEEP_LEARNING_TERMS, JD_NLP_TERMS,
+    JD_VISUALIZATION_TERMS, JD_CLOUD_TERMS, JD_BIG_DATA_TERMS,
+    ML_FOCUS_TERMS, ANALYTICS_FOCUS_TERMS, ENGINEERING_FOCUS_TERMS, text_features
+)
+from text_cache import content_hash, get_default_cache
+
+# ---------- TEXT EXTRACTION ----------
+class NamedBuffer(BytesIO):
+    """In-memory file with a name, standing in for Streamlit's UploadedFile"""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+def extract_text_from_file(uploaded_file):
+    """Extract text from uploaded file with error handling - PDF, TXT, and DOCX"""
+    try:
+        if uploaded_file.name.lower().endswith('.pdf'):
+            # Check if PyPDF2 is available
+            try:
+                # Pages are streamed under a page/byte budget; long PDFs go to a process pool
+                text = extract_pdf_text(uploaded_file)
+                return text if text.strip() else "No text could be extracted from the PDF"
+            except ImportError:
+                return "PDF processing unavailable. Please install PyPDF2."
+        
+        elif uploaded_file.name.lower().endswith('.txt'):
+            # For text files: decoded in chunks from a sniffed encoding, cleaned and capped as it goes
+            text = extract_txt_text(uploaded_file)
+            return text if text.strip() else "No text could be extracted from the TXT file"
+        
+        elif uploaded_file.name.lower().endswith('.docx'):
+            # For DOCX files: read word/document.xml straight from the upload buffer
+            try:
+                text = extract_docx_text(uploaded_file)
+                return text if text.strip() else "No text could be extracted from the DOCX file"
+            except Exception as e:
+                return f"Error processing DOCX file: {str(e)}"
+        
+        else:
+            return "Unsupported file type. Please upload PDF, TXT, or DOCX files."
+            
+    except Exception as e:
+        return f"Error reading file: {str(e)}"
+
+# Messages returned by extract_text_from_file instead of CV text
+EXTRACTION_ERRORS = ["Unsupported file type", "Error reading file", "Error processing", "No text could be extracted",
+                     "PDF processing unavailable"]
+
+def is_extraction_error(text: str) -> bool:
+    """Check whether extract_text_from_file returned an error message"""
+    return any(text.startswith(msg) for msg in EXTRACTION_ERRORS)
+
+def cached_extract_text(uploaded_file) -> str:
+    """Extract text once per upload content; reruns reuse the cached text"""
+    suffix = Path(uploaded_file.name).suffix
+    with span("file_read", fmt=suffix):
+        key = content_hash(uploaded_file.getvalue(), suffix)
+
+    def extract():
+        # Only cache misses reach the extractor, so this span measures real parsing
+        with span("extraction", fmt=suffix):
+            return extract_text_from_file(uploaded_file)
+    return get_default_cache().get_or_extract(
+        key, extract, cacheable=lambda text: not is_extraction_error(text)
+    )
+
+# ---------- SMART CONTENT GENERATION ----------
+def extract_sections(text: str) -> Dict[str, List[str]]:
+    """Extract summary and skills from CV (first 10 lines of each, for display)"""
+    sections = parse_cv(text).sections
+    return {name: sections.get(name, [])[:10] for name in ('summary', 'skills')}
+
+def generate_tailored_summary(job_description: str, cv_text: str, parsed: Optional[ParsedCV] = None) -> str:
+    """Generate a professional summary tailored to the job and CV content"""
+    
+    # Extract key technologies from job description
+    jd_features = text_features(job_description)
+    technologies = [tech_name for keyword, tech_name in TECH_KEYWORDS.items() if keyword in jd_features]
+    
+    # Experience level comes from the parsed CV
+    parsed = parsed or parse_cv(cv_text)
+    experience_keywords = []
+    if parsed.seniority == 'senior':
+        experience_keywords = ['senior-level', 'leadership', 'strategic']
+    elif parsed.seniority == 'junior':
+        experience_keywords = ['emerging', 'enthusiastic', 'foundational']
+    else:
+        experience_keywords = ['experienced', 'proven', 'skilled']
+    
+    tech_text = ', '.join(technologies[:4]) if technologies else 'data science and analytics'
+    exp_text = ' '.join(experience_keywords[:2])
+    
+    summary = f"""{exp_text.title()} Data Scientist with comprehensive expertise in {tech_text}. Proven ability to transform complex data into actionable insights that drive measurable business outcomes. Skilled in developing and deploying predictive models, creating interactive dashboards, and effectively communicating technical findings to diverse stakeholders. Strong background in data preprocessing, feature engineering, and statistical analysis with a demonstrated track record of delivering innovative solutions in fast-paced environments."""
+    
+    return summary
+
+def generate_tailored_skills(job_description: str, cv_text: str, parsed: Optional[ParsedCV] = None) -> str:
+    """Generate tailored skills section based on job requirements and CV content"""
+    
+    jd_features = text_features(job_description)
+    cv_features = (parsed or parse_cv(cv_text)).features
+    skills = []
+    
+    # Detect what skills are already in CV
+    cv_has_python = bool(cv_features & CV_PYTHON_TERMS)
+    cv_has_sql = bool(cv_features & CV_SQL_TERMS)
+    cv_has_ml = bool(cv_features & CV_ML_TERMS)
+    
+    # Programming & Databases (only include if in CV)
+    if cv_has_python and jd_features & JD_PYTHON_TERMS:
+        skills.append('Python (Pandas, NumPy, Scikit-learn, Matplotlib, Seaborn)')
+    if cv_has_sql and jd_features & JD_SQL_TERMS:
+        skills.append('SQL (Complex queries, database optimization, ETL processes)')
+    if 'r' in cv_features and 'r' in jd_features:
+        skills.append('R (tidyverse, ggplot2, statistical analysis, data visualization)')
+    
+    # Machine Learning (only include if in CV)
+    if cv_has_ml:
+        if jd_features & JD_ML_TERMS:
+            skills.append('Machine Learning (Regression, Classification, Clustering, Model Evaluation)')
+        if jd_features & JD_DEEP_LEARNING_TERMS:
+            skills.append('Deep Learning (Neural Networks, TensorFlow, PyTorch, Keras)')
+        if jd_features & JD_NLP_TERMS:
+            skills.append('Natural Language Processing (Sentiment Analysis, Text Classification, NLTK)')
+    
+    # Visualization & BI Tools
+    if jd_features & JD_VISUALIZATION_TERMS:
+        skills.append('Data Visualization (Power BI, Tableau, Matplotlib, Plotly)')
+    
+    # Cloud & Big Data
+    if jd_features & JD_CLOUD_TERMS:
+        skills.append('Cloud Platforms (AWS/Azure, Databricks, Cloud ML Services)')
+    if jd_features & JD_BIG_DATA_TERMS:
+        skills.append('Big Data Technologies (Apache Spark, Hadoop, Distributed Computing)')
+    
+    # Essential data science skills (always include)
+    essential_skills = [
+        'Statistical Analysis & Hypothesis Testing',
+        'Data Wrangling & Feature Engineering', 
+        'Model Deployment & MLOps Practices',
+        'Cross-functional Collaboration & Stakeholder Management',
+        'Data Storytelling & Technical Communication'
+    ]
+    
+    # Combine and limit to 10 skills
+    all_skills = skills + essential_skills
+    return "\n".join([f"• {skill}" for skill in all_skills[:10]])
+
+def generate_cover_letter(job_description: str, cv_text: str, company: str, job_title: str,
+                          parsed: Optional[ParsedCV] = None, fmt: str = 'txt') -> str:
+    """Generate a professional cover letter tailored to the job and CV"""
+    # parsed is accepted like the other CV generators; the letter body currently draws on the posting only
+    
+    # Extract key requirements
+    jd_features = text_features(job_description)
+    
+    # Build skills mention based on job requirements
+    skills_mentioned = []
+    if 'python' in jd_features: skills_mentioned.append('Python programming')
+    if 'sql' in jd_features: skills_mentioned.append('SQL and database management')
+    if 'machine learning' in jd_features: skills_mentioned.append('machine learning model development')
+    if 'power bi' in jd_features or 'tableau' in jd_features: skills_mentioned.append('data visualization')
+    if 'aws' in jd_features or 'azure' in jd_features: skills_mentioned.append('cloud platform experience')
+    
+    skills_text = ', '.join(skills_mentioned) if skills_mentioned else 'data science and analytics'
+    
+    # The fixed paragraphs live in a template compiled once per format
+    return render_template('cover_letter', {
+        'company': company, 'company_upper': company.upper(), 'job_title': job_title,
+        'skills_text': skills_text, 'job_excerpt': job_description[:120],
+    }, fmt)
+
+def generate_linkedin_message(job_title: str, company: str, job_description: str, fmt: str = 'txt') -> str:
+    """Generate a professional LinkedIn connection message"""
+    
+    # Extract a key aspect from job description for personalization
+    key_aspect = ""
+    jd_features = text_features(job_description)
+    if jd_features & ML_FOCUS_TERMS:
+        key_aspect = "machine learning initiatives"
+    elif jd_features & ANALYTICS_FOCUS_TERMS:
+        key_aspect = "data analytics projects"
+    elif jd_features & ENGINEERING_FOCUS_TERMS:
+        key_aspect = "data engineering work"
+    else:
+        key_aspect = "data science work"
+    
+    return render_template('linkedin_message', {'job_title': job_title, 'company': company,
+                                                 'key_aspect': key_aspect}, fmt)
+
+# ---------- SKILLS GAP ----------
+def skills_gap(job_description: str, cv_text: str, limit: int = 15) -> Dict[str, object]:
+    """Coverage of the posting's skills by the CV and the ranked missing skills, via the skill taxonomy"""
+    # Imported on first use so the core module stays cheap to import
+    from skill_taxonomy import get_default_taxonomy
+    return get_default_taxonomy().skills_gap(job_description, cv_text, limit)
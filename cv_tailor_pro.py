@@ -5,11 +5,14 @@ Supports PDF, TXT, and DOCX files
 """
 
 import streamlit as st
-import re
-from typing import List, Dict
-import sys
-import tempfile
 import os
+import uuid
+
+# Extraction and generation live in cv_tailor_core so workers can import them without Streamlit
+from cv_tailor_core import is_extraction_error, cached_extract_text, extract_sections
+from tailor_pipeline import TailorInputs, get_default_pipeline
+from instrumentation import ring_buffer, span, span_context
+from text_cache import get_default_cache
 
 # ---------- DEPENDENCY CHECK ----------
 def check_dependencies():
@@ -24,10 +27,8 @@ def check_dependencies():
         return False
 
 # ---------- CUSTOM STYLING ----------
-st.set_page_config(page_title="CV Tailor Pro", layout="wide")
-
 # Inject custom CSS for professional green styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main {
         background-color: #f8f9fa;
@@ -108,250 +109,81 @@ st.markdown("""
         border: 2px solid #e8f5e8;
     }
 </style>
-""", unsafe_allow_html=True)
-
-# ---------- TEXT EXTRACTION ----------
-def extract_text_from_file(uploaded_file):
-    """Extract text from uploaded file with error handling - PDF, TXT, and DOCX"""
-    try:
-        if uploaded_file.name.lower().endswith('.pdf'):
-            # Check if PyPDF2 is available
-            try:
-                from PyPDF2 import PdfReader
-                from io import BytesIO
-                reader = PdfReader(BytesIO(uploaded_file.read()))
-                text = "\n".join([page.extract_text() or "" for page in reader.pages])
-                return text if text.strip() else "No text could be extracted from the PDF"
-            except ImportError:
-                return "PDF processing unavailable. Please install PyPDF2."
-        
-        elif uploaded_file.name.lower().endswith('.txt'):
-            # For text files
-            return uploaded_file.getvalue().decode('utf-8')
-        
-        elif uploaded_file.name.lower().endswith('.docx'):
-            # For DOCX files
-            try:
-                import docx2txt
-                # Save uploaded file temporarily
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_file_path = tmp_file.name
-                
-                # Extract text using docx2txt
-                text = docx2txt.process(tmp_file_path)
-                
-                # Clean up temporary file
-                os.unlink(tmp_file_path)
-                
-                return text if text.strip() else "No text could be extracted from the DOCX file"
-                
-            except ImportError:
-                return "DOCX processing unavailable. Please install python-docx or docx2txt."
-            except Exception as e:
-                return f"Error processing DOCX file: {str(e)}"
-        
-        else:
-            return "Unsupported file type. Please upload PDF, TXT, or DOCX files."
-            
-    except Exception as e:
-        return f"Error reading file: {str(e)}"
-
-# ---------- SMART CONTENT GENERATION ----------
-def extract_sections(text: str) -> Dict[str, List[str]]:
-    """Extract summary and skills from CV"""
-    sections = {'summary': [], 'skills': []}
-    lines = text.split('\n')
-    current_section = None
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        lower_line = line.lower()
-        if 'summary' in lower_line:
-            current_section = 'summary'
-        elif 'skills' in lower_line:
-            current_section = 'skills'
-        elif current_section and len(sections[current_section]) < 10:
-            sections[current_section].append(line)
-    
-    return sections
-
-def generate_tailored_summary(job_description: str, cv_text: str) -> str:
-    """Generate a professional summary tailored to the job and CV content"""
-    
-    # Extract key technologies from job description
-    jd_lower = job_description.lower()
-    technologies = []
-    
-    # Tech stack detection
-    tech_keywords = {
-        'python': 'Python', 'sql': 'SQL', 'r ': 'R', 'java ': 'Java',
-        'machine learning': 'Machine Learning', 'deep learning': 'Deep Learning',
-        'nlp': 'NLP', 'computer vision': 'Computer Vision',
-        'power bi': 'Power BI', 'tableau': 'Tableau', 'looker': 'Looker',
-        'aws': 'AWS', 'azure': 'Azure', 'gcp': 'GCP', 'spark': 'Apache Spark',
-        'hadoop': 'Hadoop', 'docker': 'Docker', 'kubernetes': 'Kubernetes'
-    }
-    
-    for keyword, tech_name in tech_keywords.items():
-        if keyword in jd_lower:
-            technologies.append(tech_name)
-    
-    # Extract experience level from CV
-    cv_lower = cv_text.lower()
-    experience_keywords = []
-    if any(word in cv_lower for word in ['senior', 'lead', 'manager', 'head of']):
-        experience_keywords = ['senior-level', 'leadership', 'strategic']
-    elif any(word in cv_lower for word in ['junior', 'entry', 'graduate', 'intern']):
-        experience_keywords = ['emerging', 'enthusiastic', 'foundational']
-    else:
-        experience_keywords = ['experienced', 'proven', 'skilled']
-    
-    tech_text = ', '.join(technologies[:4]) if technologies else 'data science and analytics'
-    exp_text = ' '.join(experience_keywords[:2])
-    
-    summary = f"""{exp_text.title()} Data Scientist with comprehensive expertise in {tech_text}. Proven ability to transform complex data into actionable insights that drive measurable business outcomes. Skilled in developing and deploying predictive models, creating interactive dashboards, and effectively communicating technical findings to diverse stakeholders. Strong background in data preprocessing, feature engineering, and statistical analysis with a demonstrated track record of delivering innovative solutions in fast-paced environments."""
-    
-    return summary
-
-def generate_tailored_skills(job_description: str, cv_text: str) -> str:
-    """Generate tailored skills section based on job requirements and CV content"""
-    
-    jd_lower = job_description.lower()
-    cv_lower = cv_text.lower()
-    skills = []
-    
-    # Detect what skills are already in CV
-    cv_has_python = any(word in cv_lower for word in ['python', 'pandas', 'numpy'])
-    cv_has_sql = any(word in cv_lower for word in ['sql', 'database', 'query'])
-    cv_has_ml = any(word in cv_lower for word in ['machine learning', 'scikit', 'tensorflow', 'pytorch'])
-    
-    # Programming & Databases (only include if in CV)
-    if cv_has_python and any(word in jd_lower for word in ['python', 'programming']):
-        skills.append('Python (Pandas, NumPy, Scikit-learn, Matplotlib, Seaborn)')
-    if cv_has_sql and any(word in jd_lower for word in ['sql', 'database']):
-        skills.append('SQL (Complex queries, database optimization, ETL processes)')
-    if 'r' in cv_lower and 'r' in jd_lower:
-        skills.append('R (tidyverse, ggplot2, statistical analysis, data visualization)')
-    
-    # Machine Learning (only include if in CV)
-    if cv_has_ml:
-        if any(word in jd_lower for word in ['machine learning', 'ml', 'predictive']):
-            skills.append('Machine Learning (Regression, Classification, Clustering, Model Evaluation)')
-        if any(word in jd_lower for word in ['deep learning', 'neural', 'tensorflow', 'pytorch']):
-            skills.append('Deep Learning (Neural Networks, TensorFlow, PyTorch, Keras)')
-        if any(word in jd_lower for word in ['nlp', 'natural language']):
-            skills.append('Natural Language Processing (Sentiment Analysis, Text Classification, NLTK)')
-    
-    # Visualization & BI Tools
-    if any(word in jd_lower for word in ['power bi', 'tableau', 'dashboard', 'visualization']):
-        skills.append('Data Visualization (Power BI, Tableau, Matplotlib, Plotly)')
-    
-    # Cloud & Big Data
-    if any(word in jd_lower for word in ['aws', 'azure', 'gcp', 'cloud']):
-        skills.append('Cloud Platforms (AWS/Azure, Databricks, Cloud ML Services)')
-    if any(word in jd_lower for word in ['spark', 'big data', 'hadoop']):
-        skills.append('Big Data Technologies (Apache Spark, Hadoop, Distributed Computing)')
-    
-    # Essential data science skills (always include)
-    essential_skills = [
-        'Statistical Analysis & Hypothesis Testing',
-        'Data Wrangling & Feature Engineering', 
-        'Model Deployment & MLOps Practices',
-        'Cross-functional Collaboration & Stakeholder Management',
-        'Data Storytelling & Technical Communication'
-    ]
-    
-    # Combine and limit to 10 skills
-    all_skills = skills + essential_skills
-    return "\n".join([f"• {skill}" for skill in all_skills[:10]])
-
-def generate_cover_letter(job_description: str, cv_text: str, company: str, job_title: str) -> str:
-    """Generate a professional cover letter tailored to the job and CV"""
-    
-    # Extract key requirements
-    jd_lower = job_description.lower()
-    
-    # Build skills mention based on job requirements
-    skills_mentioned = []
-    if 'python' in jd_lower: skills_mentioned.append('Python programming')
-    if 'sql' in jd_lower: skills_mentioned.append('SQL and database management')
-    if 'machine learning' in jd_lower: skills_mentioned.append('machine learning model development')
-    if 'power bi' in jd_lower or 'tableau' in jd_lower: skills_mentioned.append('data visualization')
-    if 'aws' in jd_lower or 'azure' in jd_lower: skills_mentioned.append('cloud platform experience')
-    
-    skills_text = ', '.join(skills_mentioned) if skills_mentioned else 'data science and analytics'
-    
-    cover_letter = f"""
-{company.upper()}
-Hiring Manager
-Data Science Department
-
-Dear Hiring Manager,
-
-I am writing to express my enthusiastic interest in the {job_title} position at {company}. With my comprehensive background in data science and my expertise in {skills_text}, I am confident in my ability to make significant contributions to your team.
-
-{job_description[:120]}...
-
-My qualifications align perfectly with your requirements:
-
-• Technical Expertise: Advanced proficiency in the technical stack required for this role, with hands-on experience in developing and deploying data-driven solutions
-• Business Impact: Proven ability to translate complex data into actionable insights that drive strategic decision-making and measurable business outcomes
-• Collaboration: Strong communication skills with experience working in cross-functional teams to deliver projects that meet both technical and business requirements
-
-I am particularly excited about the opportunity to contribute to {company}'s data initiatives and am impressed by your organization's commitment to innovation and excellence.
-
-Thank you for considering my application. I have attached my CV for your review and would welcome the opportunity to discuss how my skills and experience can benefit your team.
-
-Sincerely,
-
-[Your Name]
-[Your Phone Number]
-[Your Email]
-[Your LinkedIn Profile]
 """
-    return cover_letter.strip()
-
-def generate_linkedin_message(job_title: str, company: str, job_description: str) -> str:
-    """Generate a professional LinkedIn connection message"""
-    
-    # Extract a key aspect from job description for personalization
-    key_aspect = ""
-    jd_lower = job_description.lower()
-    if any(word in jd_lower for word in ['machine learning', 'ml']):
-        key_aspect = "machine learning initiatives"
-    elif any(word in jd_lower for word in ['data analysis', 'analytics']):
-        key_aspect = "data analytics projects"
-    elif any(word in jd_lower for word in ['data engineering', 'etl']):
-        key_aspect = "data engineering work"
-    else:
-        key_aspect = "data science work"
-    
-    message = f"""
-Hi [Hiring Manager Name],
 
-I hope this message finds you well. I came across the {job_title} position at {company} and was particularly impressed by your team's focus on {key_aspect}.
+def apply_page_style():
+    """Page config and CSS; called from main() so importing this module has no side effects"""
+    st.set_page_config(page_title="CV Tailor Pro", layout="wide")
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
-With my background in data science and experience in [mention your most relevant skill from the job description], I believe I could bring valuable expertise to your team. I've been following {company}'s work in the industry and am excited about the opportunity to contribute to your data-driven initiatives.
+# ---------- RECRUITER MODE ----------
+def recruiter_mode(root: str):
+    """Rank an indexed corpus of CVs against a job description; CVs are ingested only from under root"""
+    # Imported here so the tailoring view does not load numpy
+    from cv_corpus import get_default_corpus_index, list_corpus_sources
+    index = get_default_corpus_index()
+    root = os.path.realpath(root)
+    st.title("🔎 Recruiter Mode")
+    st.markdown(f'<div class="info-box">📚 {len(index):,} CVs indexed in <code>{index.directory}</code></div>', unsafe_allow_html=True)
 
-Would you be open to a brief 15-minute chat next week to discuss how my experience aligns with your team's needs?
+    with st.expander("➕ Add CVs to the index", expanded=not len(index)):
+        try:
+            sources = list_corpus_sources(root)
+        except OSError as e:
+            st.error(f"Could not list {root}: {e}")
+            sources = []
+        source = st.selectbox("Directory or .zip of CVs", sources, format_func=lambda path: os.path.relpath(path, root))
+        if st.button("Ingest", disabled=not source):
+            with st.spinner("Extracting and indexing CVs..."), span("corpus.ingest"):
+                try:
+                    stats = index.ingest(source)
+                except (OSError, ValueError) as e:
+                    st.error(f"Could not ingest {os.path.relpath(source, root)}: {e}")
+                else:
+                    st.success(f"Added {stats['added']}, updated {stats['updated']}, removed {stats['removed']}, "
+                               f"unchanged {stats['unchanged']}, failed {stats['failed']}")
+                    for name, error in stats['errors'][:20]:
+                        st.warning(f"{name}: {error}")
 
-Looking forward to connecting.
+    job_desc = st.text_area("Job Description*", height=200, placeholder="Paste the full job description here...")
+    top_k = st.slider("CVs to show", 5, 100, 20)
+    if job_desc and len(index):
+        with span("corpus.search"):
+            matches = index.search(job_desc, top_k)
+        if matches:
+            st.dataframe(matches, use_container_width=True)
+        else:
+            st.info("No indexed CV shares any terms with this job description.")
 
-Best regards,
+# ---------- DEBUG PANEL ----------
+# Operator setting: recording spans is process-wide, so a visitor can't switch it on
+DEBUG_PANEL = os.environ.get('CV_TAILOR_DEBUG_PANEL') == '1'
 
-[Your Name]
-Data Scientist
-[Your Phone Number] | [Your Email]
-[Your LinkedIn Profile URL]
-"""
-    return message.strip()
+def debug_panel(spans, session: str):
+    """Stage timings of this session only"""
+    with st.sidebar.expander("🐞 Stage timings", expanded=True):
+        st.dataframe(list(reversed(spans.records(session=session)[-50:])), use_container_width=True)
+        if st.button("Clear timings"):
+            spans.clear(session=session)
 
 # ---------- MAIN APPLICATION ----------
 def main():
+    apply_page_style()
+    # Spans are tagged with the session so the debug panel only shows this visitor's
+    session = st.session_state.setdefault("span_session", uuid.uuid4().hex[:12])
+    # Installed before rendering so the first run's spans are recorded too
+    spans = ring_buffer() if DEBUG_PANEL else None
+    with span_context(session=session):
+        # Recruiter mode shares one server-side index, so it only exists where an operator configured a corpus root
+        corpus_root = os.environ.get('CV_TAILOR_CORPUS_ROOT')
+        if corpus_root and st.sidebar.radio("Mode", ["Tailor my CV", "Recruiter"]) == "Recruiter":
+            recruiter_mode(corpus_root)
+        else:
+            tailor_view()
+    if spans is not None:
+        debug_panel(spans, session)
+
+def tailor_view():
     st.title("🎯 Professional CV Tailor")
     st.markdown("### Transform your CV with AI-powered tailored content for each job application")
     
@@ -372,57 +204,73 @@ def main():
     
     if uploaded_file and job_desc and company_name and job_title:
         
-        cv_text = extract_text_from_file(uploaded_file)
+        cv_text = cached_extract_text(uploaded_file)
         
         # Check if file was processed successfully
-        if any(cv_text.startswith(msg) for msg in ["Unsupported file type", "Error reading file", "No text could be extracted", "processing unavailable"]):
+        if is_extraction_error(cv_text):
             st.error(cv_text)
         else:
             if st.button("🚀 Generate Tailored Content", use_container_width=True):
                 with st.spinner("Creating your professional application package..."):
                     
-                    # Generate all tailored content
-                    new_summary = generate_tailored_summary(job_desc, cv_text)
-                    new_skills = generate_tailored_skills(job_desc, cv_text)
-                    cover_letter = generate_cover_letter(job_desc, cv_text, company_name, job_title)
-                    linkedin_msg = generate_linkedin_message(job_title, company_name, job_desc)
+                    # Parse the CV once (memoized by content) and share it with every generator
+                    with span("parse"):
+                        inputs = TailorInputs(cv_text, job_desc, company_name, job_title)
+
+                    # Only artifacts whose inputs changed since an earlier run are regenerated
+                    pipeline = get_default_pipeline()
+                    artifacts, reused = pipeline.run(inputs)
+                    new_summary, new_skills = artifacts['summary'], artifacts['skills']
+                    cover_letter, linkedin_msg, gap = artifacts['cover_letter'], artifacts['linkedin_message'], artifacts['skills_gap']
                     
-                    st.markdown('<div class="success-box">✅ Your tailored content is ready! Copy and use these sections in your application.</div>', unsafe_allow_html=True)
+                    with span("render"):
+                        st.markdown('<div class="success-box">✅ Your tailored content is ready! Copy and use these sections in your application.</div>', unsafe_allow_html=True)
+                        if reused:
+                            st.caption("♻️ Unchanged inputs, reused: " + ", ".join(name.replace('_', ' ') for name in reused))
                     
-                    # Display in tabs for better organization
-                    tab1, tab2, tab3, tab4 = st.tabs(["🎯 Professional Summary", "🛠️ Skills Section", "✉️ Cover Letter", "💼 LinkedIn Message"])
+                        # Display in tabs for better organization
+                        tab1, tab2, tab3, tab4 = st.tabs(["🎯 Professional Summary", "🛠️ Skills Section", "✉️ Cover Letter", "💼 LinkedIn Message"])
                     
-                    with tab1:
-                        st.markdown('<div class="tab-container">', unsafe_allow_html=True)
-                        st.subheader("Tailored Professional Summary")
-                        st.text_area("Copy this summary to your CV:", new_summary, height=200, key="summary_area")
-                        st.download_button("📄 Download Summary", new_summary, "professional_summary.txt", "text/plain", use_container_width=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
+                        with tab1:
+                            st.markdown('<div class="tab-container">', unsafe_allow_html=True)
+                            st.subheader("Tailored Professional Summary")
+                            st.text_area("Copy this summary to your CV:", new_summary, height=200, key="summary_area")
+                            st.download_button("📄 Download Summary", new_summary, "professional_summary.txt", "text/plain", use_container_width=True)
+                            st.markdown('</div>', unsafe_allow_html=True)
                         
-                    with tab2:
-                        st.markdown('<div class="tab-container">', unsafe_allow_html=True)
-                        st.subheader("Tailored Skills Section")
-                        st.text_area("Copy these skills to your CV:", new_skills, height=200, key="skills_area")
-                        st.download_button("📄 Download Skills", new_skills, "tailored_skills.txt", "text/plain", use_container_width=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
+                        with tab2:
+                            st.markdown('<div class="tab-container">', unsafe_allow_html=True)
+                            st.subheader("Tailored Skills Section")
+                            st.text_area("Copy these skills to your CV:", new_skills, height=200, key="skills_area")
+                            st.download_button("📄 Download Skills", new_skills, "tailored_skills.txt", "text/plain", use_container_width=True)
+                            st.metric("Job skills covered by your CV", f"{gap['coverage']:.0%}")
+                            if gap['missing']:
+                                st.write("**Missing skills (most important first):**")
+                                st.text("\n".join(f"• {skill['skill']}" + (" (related experience in CV)" if skill['related_in_cv'] else "")
+                                                  for skill in gap['missing']))
+                            st.markdown('</div>', unsafe_allow_html=True)
                         
-                    with tab3:
-                        st.markdown('<div class="tab-container">', unsafe_allow_html=True)
-                        st.subheader("Professional Cover Letter")
-                        st.text_area("Use this cover letter:", cover_letter, height=400, key="cover_area")
-                        st.download_button("📄 Download Cover Letter", cover_letter, "cover_letter.txt", "text/plain", use_container_width=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
+                        with tab3:
+                            st.markdown('<div class="tab-container">', unsafe_allow_html=True)
+                            st.subheader("Professional Cover Letter")
+                            st.text_area("Use this cover letter:", cover_letter, height=400, key="cover_area")
+                            st.download_button("📄 Download Cover Letter", cover_letter, "cover_letter.txt", "text/plain", use_container_width=True)
+                            html_inputs = TailorInputs(cv_text, job_desc, company_name, job_title, 'html', inputs.parsed)
+                            st.download_button("🌐 Download as HTML", pipeline.run(html_inputs, ['cover_letter'])[0]['cover_letter'],
+                                               "cover_letter.html", "text/html", use_container_width=True)
+                            st.markdown('</div>', unsafe_allow_html=True)
                         
-                    with tab4:
-                        st.markdown('<div class="tab-container">', unsafe_allow_html=True)
-                        st.subheader("LinkedIn Connection Message")
-                        st.text_area("Use this LinkedIn message:", linkedin_msg, height=300, key="linkedin_area")
-                        st.download_button("📄 Download LinkedIn Message", linkedin_msg, "linkedin_message.txt", "text/plain", use_container_width=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
+                        with tab4:
+                            st.markdown('<div class="tab-container">', unsafe_allow_html=True)
+                            st.subheader("LinkedIn Connection Message")
+                            st.text_area("Use this LinkedIn message:", linkedin_msg, height=300, key="linkedin_area")
+                            st.download_button("📄 Download LinkedIn Message", linkedin_msg, "linkedin_message.txt", "text/plain", use_container_width=True)
+                            st.markdown('</div>', unsafe_allow_html=True)
                     
                     # Show original content for comparison
                     with st.expander("🔍 View Original CV Content (for reference)"):
-                        original_sections = extract_sections(cv_text)
+                        with span("sections"):
+                            original_sections = extract_sections(cv_text)
                         if original_sections['summary']:
                             st.write("**Original Summary:**")
                             st.text(" ".join(original_sections['summary'][:3]))
@@ -437,6 +285,9 @@ def main():
     st.markdown("---")
     st.markdown("💡 **Pro Tip:** Always customize the generated content with your specific achievements and experiences!")
     st.markdown("⚡ **Built with Streamlit** • **Deployment Ready**")
+    
+    with st.sidebar.expander("🗄️ Extraction cache"):
+        st.json(get_default_cache().stats())
 
 # Run the app
 if __name__ == "__main__":
@@ -1,10 +1,14 @@
 import streamlit as st
-import pandas as pd
-import itertools
-from datetime import datetime
+
+from dataset_registry import get_default_registry
+from query_planner import SchemaIndex, plan_query
+from sql_engine import DEFAULT_PAGE_SIZE, QueryError, SQLEngine
+from aggregate_cache import AggregateRequest, get_default_aggregate_cache
+from chart_data import build_chart
+from data_explorer_core import generate_sql, table_name, suggest_dax, recommend_chart
 
 # ====== CUSTOM STYLING ======
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     /* ====== 🌿 Global Page ====== */
     .main {
@@ -91,105 +95,128 @@ st.markdown("""
         color: #1b7a3a;
     }
 </style>
-""", unsafe_allow_html=True)
-
-# ====== APP HEADER ======
-st.set_page_config(page_title="Full-Stack Data Assistant", layout="wide")
-st.title("🤖 Full-Stack Data Assistant")
-st.caption("Upload datasets, auto-generate SQL queries, DAX measures, and chart recommendations.")
-
-# ====== 1. UPLOAD CSV DATASETS ======
-st.subheader("📂 Upload one or more CSV files")
-uploaded_files = st.file_uploader("Upload CSV files", type=["csv"], accept_multiple_files=True)
-
-datasets = {}
-if uploaded_files:
-    for file in uploaded_files:
-        df = pd.read_csv(file)
-        datasets[file.name] = df
-        st.write(f"### Dataset: {file.name}")
-        st.dataframe(df.head())
-        st.write("**Summary:**")
-        st.write(df.describe(include='all').transpose())
-
-# ====== 2. DETECT RELATIONSHIPS & JOIN KEYS ======
-def detect_relationships(datasets):
-    keys = {}
-    if len(datasets) > 1:
-        for (name1, df1), (name2, df2) in itertools.combinations(datasets.items(), 2):
-            common_cols = set(df1.columns).intersection(df2.columns)
-            if common_cols:
-                keys[(name1, name2)] = list(common_cols)
-    return keys
-
-join_keys = detect_relationships(datasets)
-if join_keys:
-    st.subheader("🔗 Suggested JOIN Relationships")
-    for (d1, d2), cols in join_keys.items():
-        st.write(f"**{d1}** ⟷ **{d2}** → Possible JOIN keys: `{', '.join(cols)}`")
-
-# ====== 3. NATURAL LANGUAGE QUESTION BOX ======
-st.subheader("💬 Ask a Question in Plain English")
-user_query = st.text_input("Type your question, e.g., 'Show average sales by product for Q1 2024'")
-
-# ====== 4. SQL QUERY GENERATOR ======
-def generate_sql(user_query, datasets, join_keys):
-    if not user_query or not datasets:
-        return "Type a question above and upload data."
-
-    sql_parts = []
-    if len(datasets) == 1:
-        table = list(datasets.keys())[0].replace(".csv", "")
-        sql_parts.append(f"-- Single table query for {table}")
-        sql_parts.append(f"SELECT column1, column2, AVG(column3) AS avg_value")
-        sql_parts.append(f"FROM {table}")
-        sql_parts.append("WHERE date BETWEEN [start] AND [end]")
-        sql_parts.append("GROUP BY column1, column2;")
-    else:
-        (t1, t2), cols = list(join_keys.items())[0]
-        join_col = cols[0]
-        sql_parts.append(f"-- Auto-generated JOIN query")
-        sql_parts.append(f"SELECT t1.columnA, t2.columnB, SUM(t1.metric) AS total_metric")
-        sql_parts.append(f"FROM {t1.replace('.csv','')} t1")
-        sql_parts.append(f"JOIN {t2.replace('.csv','')} t2 ON t1.{join_col} = t2.{join_col}")
-        sql_parts.append("WHERE t1.date BETWEEN [start] AND [end]")
-        sql_parts.append("GROUP BY t1.columnA, t2.columnB;")
-    return "\n".join(sql_parts)
-
-if user_query:
-    st.subheader("🧩 Suggested SQL Query")
-    sql_output = generate_sql(user_query, datasets, join_keys)
-    st.code(sql_output, language="sql")
-
-# ====== 5. POWER BI DAX SUGGESTIONS ======
-def suggest_dax(user_query):
-    if "average" in user_query.lower():
-        return "DAX Suggestion: `Average Sales = AVERAGE(Sales[Amount])`"
-    elif "total" in user_query.lower() or "sum" in user_query.lower():
-        return "DAX Suggestion: `Total Sales = SUM(Sales[Amount])`"
-    elif "count" in user_query.lower():
-        return "DAX Suggestion: `Customer Count = DISTINCTCOUNT(Customer[ID])`"
-    else:
-        return "DAX Suggestion: Try `Measure = SUM(Table[Metric]) / COUNT(Table[ID])`"
-
-if user_query:
-    st.subheader("📊 Suggested DAX Measure")
-    st.info(suggest_dax(user_query))
-
-# ====== 6. CHART RECOMMENDER ======
-def recommend_chart(df, user_query):
-    if any(word in user_query.lower() for word in ["trend", "over time", "date"]):
-        return "📈 Recommended Chart: Line Chart (showing trends over time)"
-    elif "compare" in user_query.lower() or "by" in user_query.lower():
-        return "📊 Recommended Chart: Bar Chart (compare categories)"
-    elif "distribution" in user_query.lower():
-        return "📦 Recommended Chart: Histogram"
-    elif "correlation" in user_query.lower():
-        return "🔗 Recommended Chart: Scatter Plot"
-    else:
-        return "🧭 Recommended Chart: Summary Table or Pie Chart"
-
-if uploaded_files and user_query:
-    st.subheader("🪄 Chart Recommendation")
-    first_df = list(datasets.values())[0]
-    st.success(recommend_chart(first_df, user_query))
\ No newline at end of file
+"""
+
+
+def main():
+    # ====== APP HEADER ======
+    st.set_page_config(page_title="Full-Stack Data Assistant", layout="wide")
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    st.title("🤖 Full-Stack Data Assistant")
+    st.caption("Upload datasets, auto-generate SQL queries, DAX measures, and chart recommendations.")
+
+    # ====== 1. UPLOAD CSV DATASETS ======
+    st.subheader("📂 Upload one or more CSV files")
+    uploaded_files = st.file_uploader("Upload CSV files", type=["csv"], accept_multiple_files=True)
+
+    registry = get_default_registry()
+    entries = {}
+    if uploaded_files:
+        for file in uploaded_files:
+            # Reruns with the same upload reuse the parsed frame and profile
+            try:
+                entry = registry.load(file)
+            except ValueError as e:
+                # Malformed CSVs (parser and Arrow conversion errors are ValueErrors) skip just this file
+                st.error(f"Could not read {file.name}: {e}")
+                continue
+            entries[file.name] = entry
+            df, report = entry.frame, entry.report
+            st.write(f"### Dataset: {file.name}")
+            st.caption(f"{report['rows']:,} rows · {report['memory_mb']} MB in memory · loaded via {report['mode']}")
+            if report['truncated']:
+                st.warning("File exceeds the memory limit and pyarrow is not installed; showing the rows that fit.")
+            st.dataframe(df.head())
+            st.write("**Summary:**")
+            st.dataframe(entry.summary())
+    datasets = {name: entry.frame for name, entry in entries.items()}
+
+    # ====== 2. DETECT RELATIONSHIPS & JOIN KEYS ======
+    join_keys = registry.relationships(entries)
+    if join_keys:
+        st.subheader("🔗 Suggested JOIN Relationships")
+        for (d1, d2), candidates in join_keys.items():
+            keys = ", ".join(f"{c1} = {c2} ({containment:.0%} match)" for c1, c2, containment in candidates)
+            st.write(f"**{d1}** ⟷ **{d2}** → Possible JOIN keys: `{keys}`")
+
+    with st.sidebar.expander("🗄️ Dataset cache"):
+        st.json({'datasets': registry.stats(), 'aggregates': get_default_aggregate_cache().stats(),
+                 'snapshots': registry.snapshots.stats() if registry.snapshots else 'disabled'})
+
+    # ====== 3. NATURAL LANGUAGE QUESTION BOX ======
+    st.subheader("💬 Ask a Question in Plain English")
+    user_query = st.text_input("Type your question, e.g., 'Show average sales by product for Q1 2024'")
+
+    # ====== 4. SQL QUERY GENERATOR ======
+    plan = None
+    if user_query and entries:
+        # The schema index is rebuilt only when the set of uploads changes
+        index_key = tuple(entry.key for entry in entries.values()) + tuple(entries)
+        if st.session_state.get('schema_index_key') != index_key:
+            st.session_state.schema_index = SchemaIndex.from_datasets(datasets)
+            st.session_state.schema_index_key = index_key
+        plan = plan_query(user_query, st.session_state.schema_index)
+        with st.expander("🧭 Query plan"):
+            st.json(plan.to_dict())
+
+    if user_query:
+        # Frames are registered once per session and content; reruns only re-run the query
+        if 'sql_engine' not in st.session_state:
+            st.session_state.sql_engine = SQLEngine()
+        engine = st.session_state.sql_engine
+
+        st.subheader("🧩 Suggested SQL Query")
+        sql_output = generate_sql(user_query, datasets, join_keys, plan, dialect=engine.backend)
+        st.code(sql_output, language="sql")
+
+        for name, entry in entries.items():
+            key_columns = {col for (d1, d2), candidates in join_keys.items() if name in (d1, d2)
+                           for c1, c2, _ in candidates for col in ((c1,) if name == d1 else (c2,))}
+            # The snapshot is only mapped when the table actually needs (re)registering
+            engine.register(table_name(name), entry.frame, key=entry.key, index_columns=key_columns,
+                            arrow=(lambda entry=entry: registry.snapshot_table(entry)) if engine.backend == 'duckdb' else None)
+        engine.retain(table_name(name) for name in entries)
+        plan_datasets = plan.datasets() if plan is not None else []
+        request = AggregateRequest.from_plan(plan, entries[plan_datasets[0]].key) if plan_datasets else None
+        if request is not None:
+            # Single-table group-bys are answered from (or added to) the aggregate cache
+            answer, info = get_default_aggregate_cache().answer(request, entries[plan_datasets[0]].frame)
+            st.dataframe(answer.head(DEFAULT_PAGE_SIZE))
+            source = {'hit': "aggregate cache", 'computed': "computed and cached",
+                      'rollup': f"rolled up from cached {info.get('from_grain') or info.get('from_dims')} aggregates"}
+            st.caption(f"{len(answer):,} groups · {source[info['source']]}")
+        elif entries:
+            page = st.number_input("Result page", min_value=1, value=1, step=1) - 1
+            try:
+                result = engine.execute(sql_output, page=int(page))
+                st.dataframe(result['frame'])
+                more = " · more rows on the next page" if result['has_more'] else ""
+                st.caption(f"{result['backend']} · {result['elapsed_ms']} ms{more}")
+            except QueryError as e:
+                st.error(f"Query failed: {e}")
+
+    # ====== 5. POWER BI DAX SUGGESTIONS ======
+    if user_query:
+        st.subheader("📊 Suggested DAX Measure")
+        st.info(suggest_dax(user_query, plan))
+
+    # ====== 6. CHART RECOMMENDER ======
+    if uploaded_files and user_query:
+        st.subheader("🪄 Chart Recommendation")
+        # Chart the dataset the plan reads from, falling back to the first upload
+        chart_name = plan_datasets[0] if len(plan_datasets) == 1 else list(datasets)[0]
+        chart_df = datasets[chart_name]
+        st.success(recommend_chart(chart_df, user_query, plan))
+        chart = build_chart(chart_df, plan, entries[chart_name].key) if plan is not None else None
+        if chart is not None:
+            # Only the aggregated / downsampled frame is sent to the browser
+            draw = {'line': st.line_chart, 'bar': st.bar_chart, 'histogram': st.bar_chart,
+                    'scatter': st.scatter_chart}[chart['kind']]
+            options = {'color': chart['color']} if chart['color'] else {}
+            draw(chart['data'], x=chart['x'], y=chart['y'], **options)
+            st.caption(f"{len(chart['data']):,} points drawn from {chart['rows_in']:,} rows")
+
+
+# Streamlit runs this file as __main__; importing it does not render anything
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Full-Stack Data Assistant core - relationship detection and query/chart suggestions
+Importable without Streamlit or pandas; relationship detection loads pandas on first use
+"""
+
+import re
+from collections import defaultdict
+
+# A join needs one side that looks like a key and most of the other side's values inside it
+KEY_UNIQUENESS = 0.9
+MIN_CONTAINMENT = 0.6
+MIN_KEY_DISTINCT = 10
+
+
+# ====== DETECT RELATIONSHIPS & JOIN KEYS ======
+def _candidate_pairs(profiles, distinct):
+    """LSH over MinHash bins: columns from different datasets sharing a bin minimum collide"""
+    buckets = defaultdict(list)
+    for name, profile in profiles.items():
+        for column, stats in profile.columns.items():
+            if distinct[(name, column)] >= MIN_KEY_DISTINCT:
+                for band in stats.values.bands():
+                    buckets[band].append((name, column))
+    pairs = set()
+    for members in buckets.values():
+        for index, left in enumerate(members):
+            for right in members[index + 1:]:
+                if left[0] != right[0]:
+                    pairs.add((left, right))
+    return pairs
+
+
+def _containment(key_stats, other_stats, key_distinct, other_distinct):
+    """Estimated share of the other column's distinct values that appear in the key column"""
+    jaccard = key_stats.values.jaccard(other_stats.values)
+    overlap = jaccard * (key_distinct + other_distinct) / (1 + jaccard)
+    return min(1.0, overlap / other_distinct) if other_distinct else 0.0
+
+
+def detect_relationships(datasets, profiles=None):
+    """Join keys between datasets, found by value overlap rather than column names
+
+    Returns {(dataset1, dataset2): [(column1, column2, containment), ...]} with the best
+    candidates first. `profiles` maps dataset names to profiler.DatasetProfile; frames without
+    one are profiled here.
+    """
+    if len(datasets) < 2:
+        return {}
+    from profiler import profile_frame
+    profiles = {name: (profiles or {}).get(name) or profile_frame(df) for name, df in datasets.items()}
+    order = {name: index for index, name in enumerate(datasets)}
+    distinct = {(name, column): stats.distinct.count()
+                for name, profile in profiles.items() for column, stats in profile.columns.items()}
+
+    ranked = defaultdict(list)
+    for left, right in _candidate_pairs(profiles, distinct):
+        if order[left[0]] > order[right[0]]:
+            left, right = right, left
+        best = None
+        for key, other in ((left, right), (right, left)):
+            key_stats, other_stats = profiles[key[0]].columns[key[1]], profiles[other[0]].columns[other[1]]
+            if key_stats.count and distinct[key] >= KEY_UNIQUENESS * key_stats.count:
+                containment = _containment(key_stats, other_stats, distinct[key], distinct[other])
+                best = max(best or 0.0, containment)
+        if best is not None and best >= MIN_CONTAINMENT:
+            # Ties go to matching names, then to the column with more distinct values
+            rank = (round(best, 2), left[1] == right[1], distinct[left])
+            ranked[(left[0], right[0])].append((rank, (left[1], right[1], round(best, 3))))
+
+    keys = {}
+    for pair in sorted(ranked, key=lambda pair: (order[pair[0]], order[pair[1]])):
+        keys[pair] = [candidate for _, candidate in sorted(ranked[pair], key=lambda item: item[0], reverse=True)]
+    return keys
+
+
+# ====== SQL QUERY GENERATOR ======
+_PLAIN_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_RESERVED = {'all', 'and', 'as', 'by', 'case', 'from', 'group', 'having', 'in', 'is', 'join', 'limit', 'not',
+             'null', 'on', 'or', 'order', 'select', 'table', 'to', 'union', 'user', 'when', 'where'}
+
+
+def table_name(file_name):
+    """SQL table name for an uploaded file"""
+    return re.sub(r"\.csv$", "", file_name, flags=re.IGNORECASE)
+
+
+def quote_identifier(name):
+    if _PLAIN_IDENTIFIER.fullmatch(name) and name.lower() not in _RESERVED:
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _time_bucket(column, grain, dialect):
+    if dialect == 'duckdb':
+        return f"date_trunc('{grain}', CAST({column} AS TIMESTAMP))"
+    formats = {'day': '%Y-%m-%d', 'week': '%Y-%W', 'month': '%Y-%m', 'year': '%Y'}
+    if grain == 'quarter':
+        return f"strftime('%Y', {column}) || '-Q' || ((CAST(strftime('%m', {column}) AS INTEGER) + 2) / 3)"
+    return f"strftime('{formats[grain]}', {column})"
+
+
+def _join_path(names, join_keys):
+    """Aliases for the plan's datasets and the JOIN clauses linking them to the first one"""
+    aliases, joins = {names[0]: 't1'}, []
+    for other in names[1:]:
+        for (d1, d2), candidates in join_keys.items():
+            if other in (d1, d2) and ({d1, d2} - {other}) <= set(aliases):
+                known = d1 if other == d2 else d2
+                known_col, other_col = candidates[0][:2] if known == d1 else candidates[0][1::-1]
+                aliases[other] = f"t{len(aliases) + 1}"
+                joins.append(f"JOIN {quote_identifier(table_name(other))} {aliases[other]} "
+                             f"ON {aliases[known]}.{quote_identifier(known_col)} = "
+                             f"{aliases[other]}.{quote_identifier(other_col)}")
+                break
+    return aliases, joins
+
+
+def _plan(user_query, datasets, plan):
+    if plan is not None:
+        return plan
+    from query_planner import SchemaIndex, plan_query
+    return plan_query(user_query, SchemaIndex.from_datasets(datasets))
+
+
+def generate_sql(user_query, datasets, join_keys, plan=None, dialect='duckdb'):
+    """SQL for the question over the uploaded tables; `dialect` is 'duckdb' or 'sqlite'"""
+    if not user_query or not datasets:
+        return "Type a question above and upload data."
+
+    plan = _plan(user_query, datasets, plan)
+    names = plan.datasets() or [next(iter(datasets))]
+    aliases, joins = _join_path(names, join_keys)
+    unreachable = [name for name in names if name not in aliases]
+
+    def column(ref):
+        name = quote_identifier(ref.column)
+        return f"{aliases[ref.dataset]}.{name}" if joins else name
+
+    def usable(ref):
+        return ref is not None and ref.dataset in aliases
+
+    group, select = [], []
+    if usable(plan.time_column) and plan.time_grain:
+        bucket = _time_bucket(column(plan.time_column), plan.time_grain, dialect)
+        group.append(bucket)
+        select.append(f"{bucket} AS {plan.time_grain}")
+    for ref in filter(usable, plan.dimensions):
+        group.append(column(ref))
+        select.append(column(ref))
+    measures = [ref for ref in plan.measures if usable(ref)]
+    if plan.aggregate == 'COUNT' or not measures:
+        select.append("COUNT(*) AS row_count")
+        order = "row_count"
+    else:
+        for ref in measures:
+            alias = quote_identifier(f"{plan.aggregate.lower()}_{ref.column}")
+            if plan.aggregate == 'COUNT_DISTINCT':
+                select.append(f"COUNT(DISTINCT {column(ref)}) AS {alias}")
+            else:
+                select.append(f"{plan.aggregate}({column(ref)}) AS {alias}")
+        order = alias
+
+    where = []
+    for ref, op, value in plan.filters:
+        if not usable(ref):
+            continue
+        if op == 'between':
+            where.append(f"{column(ref)} >= {_sql_literal(value[0])} AND {column(ref)} < {_sql_literal(value[1])}")
+        else:
+            where.append(f"{column(ref)} = {_sql_literal(value)}")
+
+    base = names[0]
+    sql_parts = [f"-- {'Auto-generated JOIN query' if joins else 'Single table query for ' + table_name(base)}"]
+    if unreachable:
+        sql_parts.append(f"-- No join key found for: {', '.join(unreachable)}")
+    sql_parts.append(f"SELECT {', '.join(select)}")
+    sql_parts.append(f"FROM {quote_identifier(table_name(base))}" + (" t1" if joins else ""))
+    sql_parts.extend(joins)
+    if where:
+        sql_parts.append("WHERE " + "\n  AND ".join(where))
+    if group:
+        sql_parts.append(f"GROUP BY {', '.join(group)}")
+        sql_parts.append(f"ORDER BY {plan.time_grain if plan.time_grain and usable(plan.time_column) else order + ' DESC'}")
+    return "\n".join(sql_parts) + ";"
+
+
+# ====== POWER BI DAX SUGGESTIONS ======
+_DAX_FUNCTIONS = {'AVG': 'AVERAGE', 'SUM': 'SUM', 'MIN': 'MIN', 'MAX': 'MAX', 'COUNT_DISTINCT': 'DISTINCTCOUNT'}
+_DAX_LABELS = {'AVG': 'Average', 'SUM': 'Total', 'MIN': 'Min', 'MAX': 'Max', 'COUNT': 'Count',
+               'COUNT_DISTINCT': 'Distinct'}
+
+
+def _dax_table(dataset):
+    table = table_name(dataset)
+    return table if _PLAIN_IDENTIFIER.fullmatch(table) else "'" + table.replace("'", "''") + "'"
+
+
+def _dax_column(ref):
+    return f"{_dax_table(ref.dataset)}[{ref.column}]"
+
+
+def _dax_date(iso):
+    year, month, day = (int(part) for part in iso.split("-"))
+    return f"DATE({year}, {month}, {day})"
+
+
+def suggest_dax(user_query, plan=None, datasets=None):
+    """A DAX measure for the question; without a plan or data, a generic pattern"""
+    if plan is None and datasets:
+        plan = _plan(user_query, datasets, None)
+    if plan is None:
+        query = user_query.lower()
+        if "average" in query:
+            return "DAX Suggestion: `Average Sales = AVERAGE(Sales[Amount])`"
+        elif "total" in query or "sum" in query:
+            return "DAX Suggestion: `Total Sales = SUM(Sales[Amount])`"
+        elif "count" in query:
+            return "DAX Suggestion: `Customer Count = DISTINCTCOUNT(Customer[ID])`"
+        return "DAX Suggestion: Try `Measure = SUM(Table[Metric]) / COUNT(Table[ID])`"
+
+    measure = plan.measures[0] if plan.measures else None
+    if plan.aggregate == 'COUNT' or measure is None:
+        base = (plan.datasets() or [None])[0]
+        if base is None:
+            return "DAX Suggestion: Try `Measure = SUM(Table[Metric]) / COUNT(Table[ID])`"
+        label, expression = f"{table_name(base)} Rows", f"COUNTROWS({_dax_table(base)})"
+    else:
+        label = f"{_DAX_LABELS[plan.aggregate]} {measure.column}"
+        expression = f"{_DAX_FUNCTIONS[plan.aggregate]}({_dax_column(measure)})"
+
+    conditions = []
+    for ref, op, value in plan.filters:
+        if op == 'between':
+            conditions.append(f"{_dax_column(ref)} >= {_dax_date(value[0])}")
+            conditions.append(f"{_dax_column(ref)} < {_dax_date(value[1])}")
+        else:
+            conditions.append(f"{_dax_column(ref)} = \"{value}\"")
+    if conditions:
+        expression = f"CALCULATE({expression}, {', '.join(conditions)})"
+    return f"DAX Suggestion: `{label} = {expression}`"
+
+
+# ====== CHART RECOMMENDER ======
+def recommend_chart(df, user_query, plan=None):
+    if plan is None:
+        query = user_query.lower()
+        if any(word in query for word in ["trend", "over time", "date"]):
+            return "📈 Recommended Chart: Line Chart (showing trends over time)"
+        elif "compare" in query or "by" in query:
+            return "📊 Recommended Chart: Bar Chart (compare categories)"
+        elif "distribution" in query:
+            return "📦 Recommended Chart: Histogram"
+        elif "correlation" in query:
+            return "🔗 Recommended Chart: Scatter Plot"
+        return "🧭 Recommended Chart: Summary Table or Pie Chart"
+
+    measure = plan.measures[0].column if plan.measures else "row count"
+    if plan.intent == 'trend':
+        grain = plan.time_grain or 'time'
+        return f"📈 Recommended Chart: Line Chart ({measure} by {grain})"
+    if plan.intent == 'correlation' and len(plan.measures) >= 2:
+        return f"🔗 Recommended Chart: Scatter Plot ({plan.measures[0].column} vs {plan.measures[1].column})"
+    if plan.intent == 'distribution':
+        return f"📦 Recommended Chart: Histogram ({measure})"
+    if plan.dimensions:
+        return f"📊 Recommended Chart: Bar Chart ({measure} across {plan.dimensions[0].column})"
+    return "🧭 Recommended Chart: Summary Table or Pie Chart"
@@ -0,0 +1,167 @@
+"""
+Memory-aware CSV loading for the data explorer
+Samples the file to pick compact dtypes, reads in chunks under a memory ceiling, and falls back
+to a memory-mapped Arrow file when the data won't fit.
+"""
+
+import os
+import re
+import tempfile
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from profiler import DatasetProfile, profile_frame
+
+DEFAULT_MEMORY_LIMIT_MB = int(os.environ.get('DATA_EXPLORER_MEMORY_LIMIT_MB', 1024))
+DEFAULT_CHUNK_ROWS = 200_000
+SAMPLE_ROWS = 20_000
+# Object columns whose sample is at most this fraction distinct are read as categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _rewind(source) -> None:
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def infer_read_dtypes(source, sample_rows: int = SAMPLE_ROWS) -> Dict[str, str]:
+    """Sample the head of the file and pick categorical dtypes for repetitive text columns"""
+    _rewind(source)
+    sample = pd.read_csv(source, nrows=sample_rows)
+    _rewind(source)
+    dtypes = {}
+    for column in sample.columns:
+        values = sample[column]
+        is_text = pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)
+        if is_text and len(values) and values.nunique() / len(values) <= CATEGORY_MAX_RATIO:
+            dtypes[column] = 'category'
+    return dtypes
+
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink ints to the smallest type that fits; floats go to float32 only when lossless"""
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_integer_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            df[column] = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values) and values.dtype != 'float32':
+            narrowed = values.astype('float32')
+            if ((narrowed == values) | values.isna()).all():
+                df[column] = narrowed
+    return df
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunks, keeping categoricals categorical by aligning their categories first"""
+    if len(chunks) == 1:
+        return chunks[0]
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+            categories = pd.Index([])
+            for chunk in chunks:
+                categories = categories.union(chunk[column].cat.categories)
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+# pyarrow names the failing column in conversion errors, e.g. "In CSV column #3: CSV conversion error"
+_ARROW_CSV_COLUMN = re.compile(r"CSV column #(\d+)")
+
+
+def _spill_csv_arrow(source, spill_dir: str, column_types: Dict) -> pd.DataFrame:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    _rewind(source)
+    reader = pa_csv.open_csv(source, convert_options=pa_csv.ConvertOptions(column_types=column_types))
+    fd, path = tempfile.mkstemp(suffix='.arrow', dir=spill_dir)
+    os.close(fd)
+    try:
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    finally:
+        # The mapping keeps the data readable after the directory entry is gone (POSIX)
+        if os.name == 'posix':
+            os.unlink(path)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def load_csv_arrow(source, spill_dir: str = None) -> pd.DataFrame:
+    """Stream the CSV into an Arrow IPC file on disk and return an Arrow-backed frame over a memory map
+
+    Arrow infers column types from the first block; a column that turns out to hold other values
+    further down is re-read as text.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    column_types: Dict[str, object] = {}
+    while True:
+        try:
+            return _spill_csv_arrow(source, spill_dir, column_types)
+        except pa.ArrowInvalid as e:
+            _rewind(source)
+            names = pa_csv.open_csv(source).schema.names
+            match = _ARROW_CSV_COLUMN.search(str(e))
+            column = names[int(match.group(1))] if match and int(match.group(1)) < len(names) else None
+            if column is None or column in column_types:
+                if len(column_types) == len(names):
+                    raise
+                # Unattributed error: read every column as text
+                column_types = {name: pa.string() for name in names}
+            else:
+                column_types[column] = pa.string()
+
+
+def load_csv(source, memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+             spill_dir: str = None) -> Tuple[pd.DataFrame, Dict]:
+    """Load a CSV with compact dtypes; returns (frame, report)
+
+    The report has the row count, in-memory size, how it was loaded ('pandas' or 'arrow-mmap'),
+    whether rows were dropped because neither path fit, and the column profile.
+    """
+    read_dtypes = infer_read_dtypes(source)
+    limit_bytes = memory_limit_mb * 1024 * 1024
+    chunks: List[pd.DataFrame] = []
+    used = 0
+    over_limit = False
+    profile = DatasetProfile()
+    # The context manager leaves a caller's buffer open; an abandoned reader would close it
+    with pd.read_csv(source, dtype=read_dtypes or None, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            chunk = downcast_numeric(chunk)
+            size = chunk.memory_usage(deep=True).sum()
+            if used + size > limit_bytes:
+                over_limit = True
+                # Only kept if the Arrow fallback is unavailable and nothing else fit
+                chunks = chunks or [chunk]
+                break
+            used += size
+            chunks.append(chunk)
+            profile.update(chunk)
+
+    report = {'mode': 'pandas', 'truncated': False, 'categorical_columns': sorted(read_dtypes)}
+    if over_limit:
+        try:
+            df = load_csv_arrow(source, spill_dir)
+            report['mode'] = 'arrow-mmap'
+        except ImportError:
+            # No pyarrow: keep the rows that fit under the ceiling
+            df = _concat_chunks(chunks)
+            report['truncated'] = True
+        profile = profile_frame(df, chunk_rows)
+    elif chunks:
+        df = _concat_chunks(chunks)
+    else:
+        _rewind(source)
+        df = pd.read_csv(source, nrows=0)
+        profile = profile_frame(df)
+    report['profile'] = profile
+    report['rows'] = len(df)
+    size = df.memory_usage(deep=report['mode'] == 'pandas').sum()
+    report['memory_mb'] = round(float(size) / (1024 * 1024), 1)
+    return df, report
@@ -0,0 +1,187 @@
+"""
+Per-dataset state for the data explorer, kept across Streamlit reruns
+Uploads are keyed by content hash; each entry holds the loaded frame and its load report
+(including the column profile and sketches). Entries are evicted least-recently-used once the
+frames exceed a memory budget, and join-key results are cached per pair of datasets so a new
+or changed upload only recomputes the pairs it takes part in. Parsed uploads are also written
+to the snapshot store, so a later session maps the snapshot instead of parsing the CSV again.
+"""
+
+import hashlib
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from data_explorer_core import detect_relationships
+from data_loader import load_csv
+from snapshot_store import SnapshotStore, get_default_snapshot_store
+
+DEFAULT_MAX_BYTES = 2048 * 1024 * 1024
+
+
+def source_hash(source) -> str:
+    """sha256 of an upload buffer or a file path, without copying the bytes"""
+    digest = hashlib.sha256()
+    if hasattr(source, 'getbuffer'):
+        with source.getbuffer() as view:
+            digest.update(view)
+    else:
+        with open(source, 'rb') as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetEntry:
+    """A loaded dataset: frame, load report (with 'profile') and its in-memory size"""
+    __slots__ = ('key', 'frame', 'report', 'size', '_summary')
+
+    def __init__(self, key: str, frame, report: Dict):
+        self.key = key
+        self.frame = frame
+        self.report = report
+        self.size = int(frame.memory_usage(deep=report['mode'] == 'pandas').sum())
+        self._summary = None
+
+    @property
+    def profile(self):
+        return self.report['profile']
+
+    def summary(self):
+        """The profile table, built on first use"""
+        if self._summary is None:
+            self._summary = self.profile.to_frame()
+        return self._summary
+
+
+class DatasetRegistry:
+    """Memory-bounded LRU of loaded datasets plus per-pair relationship results"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, snapshots: Optional[SnapshotStore] = None):
+        self.max_bytes = max_bytes
+        self.snapshots = snapshots
+        self._entries: "OrderedDict[str, DatasetEntry]" = OrderedDict()
+        self._relationships: Dict[Tuple[str, str], List[tuple]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'pair_hits': 0, 'pair_misses': 0}
+
+    # ---------- DATASETS ----------
+    def _remember(self, entry: DatasetEntry) -> None:
+        if entry.size > self.max_bytes or entry.key in self._entries:
+            return
+        self._entries[entry.key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            old_key, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self._counters['evictions'] += 1
+            for pair in [pair for pair in self._relationships if old_key in pair]:
+                del self._relationships[pair]
+
+    def load(self, source) -> DatasetEntry:
+        """The entry for this upload, parsing the CSV only if its content is new"""
+        key = source_hash(source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return entry
+            self._counters['misses'] += 1
+        # Parse outside the lock so other sessions aren't blocked by a large file
+        loaded = self._load_snapshot(key)
+        if loaded is None:
+            loaded = load_csv(source)
+            self._save_snapshot(key, *loaded)
+        entry = DatasetEntry(key, *loaded)
+        with self._lock:
+            self._remember(entry)
+        return entry
+
+    def _load_snapshot(self, key: str):
+        if self.snapshots is None or key not in self.snapshots:
+            return None
+        try:
+            return self.snapshots.load(key)
+        except ImportError:
+            return None
+
+    def _save_snapshot(self, key: str, frame, report: Dict) -> None:
+        if self.snapshots is None:
+            return
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return
+        try:
+            self.snapshots.save(key, frame, report)
+        except (OSError, pa.ArrowException):
+            # A full or read-only disk, or a mixed-type column Arrow can't convert, only costs the next session a re-parse
+            pass
+
+    def snapshot_table(self, entry: DatasetEntry):
+        """The entry's snapshot as a memory-mapped Arrow table, or None"""
+        if self.snapshots is None or entry.key not in self.snapshots:
+            return None
+        try:
+            return self.snapshots.table(entry.key)
+        except (ImportError, OSError):
+            return None
+
+    # ---------- RELATIONSHIPS ----------
+    def relationships(self, entries: Dict[str, DatasetEntry]) -> Dict[Tuple[str, str], List[tuple]]:
+        """detect_relationships() for named entries, recomputing only pairs not seen before"""
+        names = list(entries)
+        pairs = list(itertools.combinations(names, 2))
+        with self._lock:
+            cached = {pair: self._cached_pair(entries[pair[0]].key, entries[pair[1]].key) for pair in pairs}
+        stale = [pair for pair, found in cached.items() if found is None]
+        # Pairs are scored independently, so each missing pair is detected on its own two datasets
+        for pair in stale:
+            found = detect_relationships({name: entries[name].frame for name in pair},
+                                         {name: entries[name].profile for name in pair})
+            cached[pair] = found.get(pair, [])
+            with self._lock:
+                self._relationships[(entries[pair[0]].key, entries[pair[1]].key)] = cached[pair]
+        with self._lock:
+            self._counters['pair_hits'] += len(pairs) - len(stale)
+            self._counters['pair_misses'] += len(stale)
+        return {pair: cached[pair] for pair in pairs if cached[pair]}
+
+    def _cached_pair(self, left: str, right: str) -> Optional[List[tuple]]:
+        if (left, right) in self._relationships:
+            return self._relationships[(left, right)]
+        if (right, left) in self._relationships:
+            return [(c2, c1, containment) for c1, c2, containment in self._relationships[(right, left)]]
+        return None
+
+    # ---------- HOUSEKEEPING ----------
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._relationships.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries), bytes=self._bytes,
+                        max_bytes=self.max_bytes, cached_pairs=len(self._relationships))
+
+
+_default_registry: Optional[DatasetRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_default_registry() -> DatasetRegistry:
+    """Process-wide registry sized by DATA_EXPLORER_REGISTRY_MB, backed by the default snapshot store"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = DatasetRegistry(
+                max_bytes=int(os.environ.get('DATA_EXPLORER_REGISTRY_MB', DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024,
+                snapshots=get_default_snapshot_store(),
+            )
+        return _default_registry
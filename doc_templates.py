@@ -0,0 +1,202 @@
+"""
+Document templates for the cover letter and LinkedIn message
+Templates use {slot} placeholders ({{ and }} for literal braces). Each template is converted to
+its output format and split into literal segments once; rendering only escapes the slot values
+and joins the list. House-style templates can replace the built-in ones by dropping
+<name>.txt files into CV_TAILOR_TEMPLATE_DIR; edited files are picked up on the next render.
+"""
+
+import hashlib
+import html
+import os
+import re
+import string
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+FORMATS = ('txt', 'markdown', 'html')
+EXTENSIONS = {'txt': 'txt', 'markdown': 'md', 'html': 'html'}
+# How often an overridden template file is checked for edits
+RELOAD_INTERVAL = 2.0
+
+# Built-in templates and the slots each may use
+DEFAULT_TEMPLATES = {
+    'cover_letter': """{company_upper}
+Hiring Manager
+Data Science Department
+
+Dear Hiring Manager,
+
+I am writing to express my enthusiastic interest in the {job_title} position at {company}. With my comprehensive background in data science and my expertise in {skills_text}, I am confident in my ability to make significant contributions to your team.
+
+{job_excerpt}...
+
+My qualifications align perfectly with your requirements:
+
+• Technical Expertise: Advanced proficiency in the technical stack required for this role, with hands-on experience in developing and deploying data-driven solutions
+• Business Impact: Proven ability to translate complex data into actionable insights that drive strategic decision-making and measurable business outcomes
+• Collaboration: Strong communication skills with experience working in cross-functional teams to deliver projects that meet both technical and business requirements
+
+I am particularly excited about the opportunity to contribute to {company}'s data initiatives and am impressed by your organization's commitment to innovation and excellence.
+
+Thank you for considering my application. I have attached my CV for your review and would welcome the opportunity to discuss how my skills and experience can benefit your team.
+
+Sincerely,
+
+[Your Name]
+[Your Phone Number]
+[Your Email]
+[Your LinkedIn Profile]""",
+    'linkedin_message': """Hi [Hiring Manager Name],
+
+I hope this message finds you well. I came across the {job_title} position at {company} and was particularly impressed by your team's focus on {key_aspect}.
+
+With my background in data science and experience in [mention your most relevant skill from the job description], I believe I could bring valuable expertise to your team. I've been following {company}'s work in the industry and am excited about the opportunity to contribute to your data-driven initiatives.
+
+Would you be open to a brief 15-minute chat next week to discuss how my experience aligns with your team's needs?
+
+Looking forward to connecting.
+
+Best regards,
+
+[Your Name]
+Data Scientist
+[Your Phone Number] | [Your Email]
+[Your LinkedIn Profile URL]""",
+}
+TEMPLATE_SLOTS = {
+    'cover_letter': frozenset(['company', 'company_upper', 'job_title', 'skills_text', 'job_excerpt']),
+    'linkedin_message': frozenset(['company', 'job_title', 'key_aspect']),
+}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+# ---------- FORMAT CONVERSION ----------
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]<>#|])")
+_BULLET = "• "
+
+
+def _markdown_source(text: str) -> str:
+    return "\n".join("- " + line[len(_BULLET):] if line.startswith(_BULLET) else line for line in text.split("\n"))
+
+
+def _html_source(text: str) -> str:
+    """Paragraphs per blank-line block, bullet lines as lists; placeholders pass through untouched"""
+    blocks = []
+    for block in re.split(r"\n\s*\n", text):
+        lines = [html.escape(line, quote=False) for line in block.split("\n")]
+        if all(line.startswith(_BULLET) for line in lines):
+            items = "\n".join(f"<li>{line[len(_BULLET):]}</li>" for line in lines)
+            blocks.append(f"<ul>\n{items}\n</ul>")
+        else:
+            blocks.append("<p>" + "<br>\n".join(lines) + "</p>")
+    return "\n".join(blocks)
+
+
+def _escape_value(value: str, fmt: str) -> str:
+    if fmt == 'html':
+        return html.escape(value, quote=False).replace("\n", "<br>\n")
+    if fmt == 'markdown':
+        return _MARKDOWN_SPECIAL.sub(r"\\\1", value)
+    return value
+
+
+# ---------- COMPILED TEMPLATES ----------
+class Template:
+    """A template compiled for one output format: literal segments with slot positions"""
+    __slots__ = ('name', 'fmt', 'version', '_parts', '_slots', '_strip_edges')
+
+    def __init__(self, name: str, source: str, fmt: str = 'txt', slots: Optional[frozenset] = None):
+        if fmt not in FORMATS:
+            raise TemplateError(f"Unknown format {fmt!r}; use one of {', '.join(FORMATS)}")
+        self.name = name
+        self.fmt = fmt
+        # Changes whenever the source does, so memoized renders can tell an edited template apart
+        self.version = hashlib.sha1(f"{fmt}\0{source}".encode('utf-8')).hexdigest()
+        source = source.strip()
+        if fmt == 'html':
+            source = _html_source(source)
+        elif fmt == 'markdown':
+            source = _markdown_source(source)
+        parts: List[str] = []
+        positions: List[Tuple[int, str]] = []
+        try:
+            parsed = list(string.Formatter().parse(source))
+        except ValueError as e:
+            raise TemplateError(f"{name}: {e}")
+        for literal, field, spec, conversion in parsed:
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            if not field.isidentifier() or spec or conversion:
+                raise TemplateError(f"{name}: placeholders must be plain names, got {{{field}}}")
+            if slots is not None and field not in slots:
+                raise TemplateError(f"{name}: unknown slot {{{field}}}; available: {', '.join(sorted(slots))}")
+            positions.append((len(parts), field))
+            parts.append("")
+        self._parts = parts
+        self._slots = positions
+        # Output is stripped like the hand-written text was, so a value at either end is stripped on that side
+        self._strip_edges = fmt == 'txt'
+
+    @property
+    def slots(self) -> frozenset:
+        return frozenset(field for _, field in self._slots)
+
+    def render(self, values: Dict[str, str]) -> str:
+        parts = self._parts.copy()
+        if self.fmt == 'txt':
+            for position, field in self._slots:
+                parts[position] = values[field]
+        else:
+            for position, field in self._slots:
+                parts[position] = _escape_value(values[field], self.fmt)
+        if self._strip_edges and parts:
+            parts[0] = parts[0].lstrip()
+            parts[-1] = parts[-1].rstrip()
+        return "".join(parts)
+
+
+# (name, format) -> (source mtime or None, time checked, template)
+_compiled: Dict[Tuple[str, str], Tuple[Optional[float], float, Template]] = {}
+_compiled_lock = threading.Lock()
+
+
+def _template_path(name: str) -> Optional[str]:
+    directory = os.environ.get('CV_TAILOR_TEMPLATE_DIR')
+    if not directory:
+        return None
+    path = os.path.join(directory, f"{name}.txt")
+    return path if os.path.exists(path) else None
+
+
+def get_template(name: str, fmt: str = 'txt') -> Template:
+    """The compiled template, from CV_TAILOR_TEMPLATE_DIR when overridden there; recompiled when the file changes"""
+    key = (name, fmt)
+    now = time.monotonic()
+    cached = _compiled.get(key)
+    if cached is not None and now - cached[1] < RELOAD_INTERVAL:
+        return cached[2]
+    if name not in DEFAULT_TEMPLATES:
+        raise TemplateError(f"Unknown template {name!r}")
+    path = _template_path(name)
+    mtime = os.path.getmtime(path) if path else None
+    if cached is not None and cached[0] == mtime:
+        template = cached[2]
+    elif path:
+        with open(path, encoding='utf-8') as fh:
+            template = Template(name, fh.read(), fmt, TEMPLATE_SLOTS[name])
+    else:
+        template = Template(name, DEFAULT_TEMPLATES[name], fmt, TEMPLATE_SLOTS[name])
+    with _compiled_lock:
+        _compiled[key] = (mtime, now, template)
+    return template
+
+
+def render(name: str, values: Dict[str, str], fmt: str = 'txt') -> str:
+    return get_template(name, fmt).render(values)
@@ -0,0 +1,274 @@
+"""
+Per-stage timing and allocation spans with pluggable sinks
+Disabled by default: span() then returns a shared no-op context manager.
+
+Enable with CV_TAILOR_INSTRUMENT, a comma-separated list of sinks:
+  log                 one JSON line per span on the 'cv_tailor.spans' logger
+  ring[:N]            in-memory ring buffer of the last N spans (default 500)
+  prom:/path/file     Prometheus text-format summary, rewritten at most once a second and at exit
+Add CV_TAILOR_INSTRUMENT_ALLOC=1 to record tracemalloc allocation deltas per span. tracemalloc
+is process-wide, so spans that overlap a span in another thread are recorded without them.
+span_context() tags every span in the current context, e.g. with the Streamlit session.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Dict, List, Optional
+
+
+# ---------- SINKS ----------
+class LogSink:
+    """Emit each span as a JSON log line"""
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger('cv_tailor.spans')
+
+    def emit(self, record: Dict) -> None:
+        self.logger.info(json.dumps(record))
+
+
+class RingBufferSink:
+    """Keep the most recent spans in memory, e.g. for a debug panel"""
+
+    def __init__(self, capacity: int = 500):
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def records(self, **match) -> List[Dict]:
+        """Recorded spans, optionally only those with the given attributes, e.g. session=..."""
+        with self._lock:
+            return [record for record in self._records
+                    if all(record.get(name) == value for name, value in match.items())]
+
+    def clear(self, **match) -> None:
+        with self._lock:
+            kept = [record for record in self._records
+                    if match and not all(record.get(name) == value for name, value in match.items())]
+            self._records.clear()
+            self._records.extend(kept)
+
+
+class PrometheusTextSink:
+    """Aggregate spans into a Prometheus text-format file (summary count/sum plus max)"""
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._stats: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._pending = False
+
+    def emit(self, record: Dict) -> None:
+        seconds = record['duration_ms'] / 1000
+        with self._lock:
+            count, total, worst = self._stats.get(record['name'], (0, 0.0, 0.0))
+            self._stats[record['name']] = [count + 1, total + seconds, max(worst, seconds)]
+            self._pending = True
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self) -> None:
+        """Write spans recorded since the last rewrite, e.g. the ones inside the final second"""
+        with self._lock:
+            if self._pending:
+                self._flush()
+
+    def _flush(self) -> None:
+        lines = ['# HELP cv_tailor_stage_seconds Time spent per pipeline stage',
+                 '# TYPE cv_tailor_stage_seconds summary']
+        for name, (count, total, _) in sorted(self._stats.items()):
+            lines.append(f'cv_tailor_stage_seconds_count{{stage="{name}"}} {count}')
+            lines.append(f'cv_tailor_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+        lines += ['# HELP cv_tailor_stage_max_seconds Slowest call per pipeline stage',
+                  '# TYPE cv_tailor_stage_max_seconds gauge']
+        lines += [f'cv_tailor_stage_max_seconds{{stage="{name}"}} {worst:.6f}'
+                  for name, (_, _, worst) in sorted(self._stats.items())]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            fh.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+        self._last_flush = time.monotonic()
+        self._pending = False
+
+
+# ---------- SPANS ----------
+_sinks: list = []
+_enabled = False
+_track_allocations = False
+_started_tracemalloc = False
+_sinks_lock = threading.Lock()
+_context: contextvars.ContextVar = contextvars.ContextVar('span_context', default={})
+
+# Allocation figures are only kept for spans no other thread's span overlapped
+_alloc_lock = threading.Lock()
+_alloc_open: Dict[int, int] = {}      # thread -> open spans
+_alloc_entered: Dict[int, int] = {}   # thread -> spans entered so far
+_alloc_entries = 0
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def _enter_allocations() -> tuple:
+    global _alloc_entries
+    thread = threading.get_ident()
+    with _alloc_lock:
+        _alloc_entries += 1
+        _alloc_open[thread] = _alloc_open.get(thread, 0) + 1
+        _alloc_entered[thread] = _alloc_entered.get(thread, 0) + 1
+        alone = len(_alloc_open) == 1
+        mem_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return mem_start, _alloc_entries, _alloc_entered[thread], alone
+
+
+def _exit_allocations(state: tuple) -> Optional[Dict]:
+    """alloc_kb/peak_kb, or None when another thread entered a span meanwhile"""
+    mem_start, entries, entered, alone = state
+    thread = threading.get_ident()
+    with _alloc_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        alone = alone and len(_alloc_open) == 1 and _alloc_entries - entries == _alloc_entered[thread] - entered
+        _alloc_open[thread] -= 1
+        if not _alloc_open[thread]:
+            del _alloc_open[thread]
+            del _alloc_entered[thread]
+    if not alone:
+        return None
+    # Nested spans reset the peak, so an outer span's peak only covers its tail
+    return {'alloc_kb': round((current - mem_start) / 1024, 1), 'peak_kb': round((peak - mem_start) / 1024, 1)}
+
+
+class _Span:
+    __slots__ = ('name', 'attrs', '_start', '_alloc')
+
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self._alloc = _enter_allocations() if _track_allocations else None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start
+        record = {'name': self.name, 'ts': time.time(), 'duration_ms': round(duration * 1000, 3)}
+        if self._alloc is not None:
+            record.update(_exit_allocations(self._alloc) or {})
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(_context.get())
+        if self.attrs:
+            record.update(self.attrs)
+        for sink in _sinks:
+            sink.emit(record)
+        return False
+
+
+def span(name: str, **attrs):
+    """Time a block: `with span('extraction', fmt='pdf'): ...`; free when instrumentation is off"""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+@contextlib.contextmanager
+def span_context(**attrs):
+    """Add attributes to every span recorded in this context: `with span_context(session=sid): ...`"""
+    token = _context.set(dict(_context.get(), **attrs))
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def add_sink(sink) -> None:
+    global _enabled
+    with _sinks_lock:
+        if sink not in _sinks:
+            _sinks.append(sink)
+        _enabled = True
+
+
+def set_allocation_tracking(enabled: bool) -> None:
+    """Turn allocation deltas on or off; only stops tracemalloc if this module started it"""
+    global _track_allocations, _started_tracemalloc
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _track_allocations = enabled
+    if not enabled and _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def flush() -> None:
+    """Write out whatever buffering sinks still hold"""
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        if hasattr(sink, 'flush'):
+            sink.flush()
+
+
+def disable() -> None:
+    global _enabled
+    flush()
+    with _sinks_lock:
+        _sinks.clear()
+        _enabled = False
+    set_allocation_tracking(False)
+
+
+_ring: Optional[RingBufferSink] = None
+
+
+def ring_buffer(capacity: int = 500) -> RingBufferSink:
+    """The process-wide ring buffer, installed as a sink on first use"""
+    global _ring
+    with _sinks_lock:
+        if _ring is None:
+            _ring = RingBufferSink(capacity)
+    add_sink(_ring)
+    return _ring
+
+
+def configure_from_env() -> None:
+    for item in filter(None, (part.strip() for part in os.environ.get('CV_TAILOR_INSTRUMENT', '').split(','))):
+        kind, _, arg = item.partition(':')
+        if kind == 'log':
+            add_sink(LogSink())
+        elif kind == 'ring':
+            ring_buffer(int(arg) if arg else 500)
+        elif kind == 'prom' and arg:
+            add_sink(PrometheusTextSink(arg))
+    if os.environ.get('CV_TAILOR_INSTRUMENT_ALLOC') == '1':
+        set_allocation_tracking(True)
+
+
+configure_from_env()
+atexit.register(flush)
@@ -0,0 +1,127 @@
+"""
+Shared keyword matcher for the CV/job description generators
+The vocabulary is indexed once at import and each document is tokenized once, matching whole words only
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+# ---------- VOCABULARY ----------
+TECH_KEYWORDS = {
+    'python': 'Python', 'sql': 'SQL', 'r': 'R', 'java': 'Java',
+    'machine learning': 'Machine Learning', 'deep learning': 'Deep Learning',
+    'nlp': 'NLP', 'computer vision': 'Computer Vision',
+    'power bi': 'Power BI', 'tableau': 'Tableau', 'looker': 'Looker',
+    'aws': 'AWS', 'azure': 'Azure', 'gcp': 'GCP', 'spark': 'Apache Spark',
+    'hadoop': 'Hadoop', 'docker': 'Docker', 'kubernetes': 'Kubernetes'
+}
+
+SENIOR_TERMS = frozenset(['senior', 'lead', 'manager', 'head of'])
+JUNIOR_TERMS = frozenset(['junior', 'entry', 'graduate', 'intern'])
+
+CV_PYTHON_TERMS = frozenset(['python', 'pandas', 'numpy'])
+CV_SQL_TERMS = frozenset(['sql', 'database', 'query'])
+CV_ML_TERMS = frozenset(['machine learning', 'scikit', 'tensorflow', 'pytorch'])
+
+JD_PYTHON_TERMS = frozenset(['python', 'programming'])
+JD_SQL_TERMS = frozenset(['sql', 'database'])
+JD_ML_TERMS = frozenset(['machine learning', 'ml', 'predictive'])
+JD_DEEP_LEARNING_TERMS = frozenset(['deep learning', 'neural', 'tensorflow', 'pytorch'])
+JD_NLP_TERMS = frozenset(['nlp', 'natural language'])
+JD_VISUALIZATION_TERMS = frozenset(['power bi', 'tableau', 'dashboard', 'visualization'])
+JD_CLOUD_TERMS = frozenset(['aws', 'azure', 'gcp', 'cloud'])
+JD_BIG_DATA_TERMS = frozenset(['spark', 'big data', 'hadoop'])
+
+ML_FOCUS_TERMS = frozenset(['machine learning', 'ml'])
+ANALYTICS_FOCUS_TERMS = frozenset(['data analysis', 'analytics'])
+ENGINEERING_FOCUS_TERMS = frozenset(['data engineering', 'etl'])
+
+VOCABULARY = frozenset(TECH_KEYWORDS).union(
+    SENIOR_TERMS, JUNIOR_TERMS, CV_PYTHON_TERMS, CV_SQL_TERMS, CV_ML_TERMS,
+    JD_PYTHON_TERMS, JD_SQL_TERMS, JD_ML_TERMS, JD_DEEP_LEARNING_TERMS, JD_NLP_TERMS,
+    JD_VISUALIZATION_TERMS, JD_CLOUD_TERMS, JD_BIG_DATA_TERMS,
+    ML_FOCUS_TERMS, ANALYTICS_FOCUS_TERMS, ENGINEERING_FOCUS_TERMS,
+)
+
+
+# ---------- MATCHER ----------
+# 'r&d' and 'at&t' stay one token, so they don't match the single-letter term 'r'
+_WORD = re.compile(r"\w+(?:&\w+)*")
+# Terms this short get no plural forms: 'rs' and 'res' are not the language R
+MIN_PLURAL_LENGTH = 3
+
+
+class KeywordMatcher:
+    """Word-level matcher: one tokenizing pass per document, then set lookups"""
+
+    def __init__(self, terms: Iterable[str]):
+        # Surface form -> term, so plurals like 'databases' or 'dashboards' map to their term
+        self.single_words: Dict[str, str] = {}
+        # Multi-word terms are confirmed with a phrase regex only when all their words occur
+        self.phrases: List[Tuple[str, FrozenSet[str], "re.Pattern[str]"]] = []
+        for term in sorted(set(terms)):
+            words = term.split()
+            if len(words) == 1:
+                forms = (term, f"{term}s", f"{term}es") if len(term) >= MIN_PLURAL_LENGTH else (term,)
+                for form in forms:
+                    self.single_words.setdefault(form, term)
+            else:
+                phrase = r"\s+".join(re.escape(word) for word in words)
+                # No leading \b, so the regex engine can jump straight to the literal first word
+                self.phrases.append((term, frozenset(words), re.compile(rf"{phrase}(?:e?s)?\b")))
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Return the set of vocabulary terms that occur as whole words in text"""
+        # str.split runs at C speed; only the few distinct tokens with punctuation need the regex
+        lower = text.lower()
+        tokens = set()
+        for chunk in set(lower.split()):
+            if chunk.isalnum():
+                tokens.add(chunk)
+            else:
+                tokens.update(_WORD.findall(chunk))
+        lookup = self.single_words
+        found = {lookup[token] for token in tokens if token in lookup}
+        for term, words, pattern in self.phrases:
+            if all(word in tokens or f"{word}s" in tokens for word in words) and _has_phrase(pattern, lower):
+                found.add(term)
+        return frozenset(found)
+
+    def spans(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Character spans (into text.lower()) of every whole-word occurrence of each vocabulary term"""
+        lower = text.lower()
+        found: Dict[str, List[Tuple[int, int]]] = {}
+        tokens = set()
+        lookup = self.single_words
+        for match in _WORD.finditer(lower):
+            token = match.group()
+            tokens.add(token)
+            if token in lookup:
+                found.setdefault(lookup[token], []).append(match.span())
+        for term, words, pattern in self.phrases:
+            if not all(word in tokens or f"{word}s" in tokens for word in words):
+                continue
+            for match in pattern.finditer(lower):
+                start = match.start()
+                if start == 0 or not (lower[start - 1].isalnum() or lower[start - 1] == '_'):
+                    found.setdefault(term, []).append(match.span())
+        return {term: found[term] for term in sorted(found)}
+
+
+def _has_phrase(pattern: "re.Pattern[str]", lower: str) -> bool:
+    """Search for a phrase match that starts on a word boundary"""
+    for match in pattern.finditer(lower):
+        start = match.start()
+        if start == 0 or not (lower[start - 1].isalnum() or lower[start - 1] == '_'):
+            return True
+    return False
+
+
+MATCHER = KeywordMatcher(VOCABULARY)
+
+
+@lru_cache(maxsize=256)
+def text_features(text: str) -> FrozenSet[str]:
+    """Keyword features of a document, memoized so every generator shares one scan"""
+    return MATCHER.scan(text)
@@ -0,0 +1,183 @@
+"""
+Single-pass column profiles for the data explorer
+Each chunk updates exact moments (count, nulls, min, max, mean, variance) and mergeable sketches
+(distinct count, quantiles), so a file is profiled while it is being read and profiles of
+chunks or files combine without another pass.
+"""
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from sketches import HyperLogLog, MinHash, QuantileSketch, hash_values
+
+PROFILE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def _is_numeric(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+class ColumnProfile:
+    """Streaming statistics for one column"""
+
+    def __init__(self, name: str, dtype: str, numeric: bool):
+        self.name = name
+        self.dtype = dtype
+        self.numeric = numeric
+        self.count = 0
+        self.nulls = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.distinct = HyperLogLog()
+        self.values = MinHash()
+        self.quantiles = QuantileSketch() if numeric else None
+
+    def _adopt_kind(self, dtype, numeric: bool) -> None:
+        """Until a value is seen the kind is provisional: an all-empty first chunk reads as float"""
+        if self.count == 0 and numeric != self.numeric:
+            self.dtype = str(dtype)
+            self.numeric = numeric
+            self.quantiles = QuantileSketch() if numeric else None
+
+    def update(self, values: pd.Series) -> None:
+        if self.count == 0 and values.notna().any():
+            self._adopt_kind(values.dtype, _is_numeric(values.dtype))
+        if self.numeric:
+            if not _is_numeric(values.dtype):
+                # A later chunk of a numeric column with stray text: unparseable values count as nulls
+                values = pd.to_numeric(values.astype(object), errors='coerce')
+            array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            present = array[~np.isnan(array)]
+            self.nulls += len(array) - len(present)
+            self._update_moments(present)
+            self.quantiles.update(present)
+            hashes = hash_values(present)
+        else:
+            missing = values.isna().to_numpy()
+            self.nulls += int(missing.sum())
+            self.count += len(values) - int(missing.sum())
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                hashes = hash_values(values.array)
+            else:
+                hashes = hash_values(values.to_numpy(dtype=object)[~missing])
+        self.distinct.update(hashes)
+        self.values.update(hashes)
+
+    def _update_moments(self, present: np.ndarray) -> None:
+        n = len(present)
+        if not n:
+            return
+        mean = float(present.mean())
+        m2 = float(((present - mean) ** 2).sum())
+        self._combine(n, mean, m2, float(present.min()), float(present.max()))
+
+    def _combine(self, n: int, mean: float, m2: float, low: float, high: float) -> None:
+        # Chan et al. parallel update: exact moments from per-chunk summaries
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def merge(self, other: 'ColumnProfile') -> 'ColumnProfile':
+        if other.count:
+            self._adopt_kind(other.dtype, other.numeric)
+        if self.numeric and other.numeric:
+            if other.count:
+                self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            self.quantiles.merge(other.quantiles)
+        else:
+            self.count += other.count
+        self.nulls += other.nulls
+        self.distinct.merge(other.distinct)
+        self.values.merge(other.values)
+        return self
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-able state; from_dict() restores a profile that keeps merging"""
+        return {
+            'name': self.name, 'dtype': self.dtype, 'numeric': self.numeric, 'count': self.count,
+            'nulls': self.nulls, 'min': self.min, 'max': self.max, 'mean': self.mean, 'm2': self.m2,
+            'distinct': self.distinct.to_dict(), 'values': self.values.to_dict(),
+            'quantiles': self.quantiles.to_dict() if self.quantiles is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, object]) -> 'ColumnProfile':
+        column = cls(state['name'], state['dtype'], state['numeric'])
+        for name in ('count', 'nulls', 'min', 'max', 'mean', 'm2'):
+            setattr(column, name, state[name])
+        column.distinct = HyperLogLog.from_dict(state['distinct'])
+        column.values = MinHash.from_dict(state['values'])
+        if state['quantiles'] is not None:
+            column.quantiles = QuantileSketch.from_dict(state['quantiles'])
+        return column
+
+    def summary(self) -> Dict[str, object]:
+        row = {'dtype': self.dtype, 'count': self.count, 'nulls': self.nulls, 'distinct': self.distinct.count()}
+        if self.numeric and self.count:
+            std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+            q25, q50, q75 = self.quantiles.quantiles(PROFILE_QUANTILES)
+            row.update(mean=self.mean, std=std, min=self.min, p25=q25, p50=q50, p75=q75, max=self.max)
+        return row
+
+
+class DatasetProfile:
+    """Column profiles for a frame, built chunk by chunk"""
+
+    def __init__(self):
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.rows = 0
+
+    def update(self, chunk: pd.DataFrame) -> 'DatasetProfile':
+        self.rows += len(chunk)
+        for name, values in chunk.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = ColumnProfile(name, str(values.dtype), _is_numeric(values.dtype))
+            column.update(values)
+        return self
+
+    def merge(self, other: 'DatasetProfile') -> 'DatasetProfile':
+        """Fold in another profile, e.g. of the next file; columns are matched by name"""
+        self.rows += other.rows
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        return self
+
+    def to_dict(self) -> Dict[str, object]:
+        return {'rows': self.rows, 'columns': [column.to_dict() for column in self.columns.values()]}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, object]) -> 'DatasetProfile':
+        profile = cls()
+        profile.rows = state['rows']
+        profile.columns = {column['name']: ColumnProfile.from_dict(column) for column in state['columns']}
+        return profile
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per column, in the spirit of describe().transpose()"""
+        return pd.DataFrame.from_dict({name: column.summary() for name, column in self.columns.items()},
+                                      orient='index')
+
+
+def profile_frame(df: pd.DataFrame, chunk_rows: int = 200_000,
+                  profile: Optional[DatasetProfile] = None) -> DatasetProfile:
+    """Profile an in-memory frame in row slices (bounds the temporaries for wide frames)"""
+    profile = profile or DatasetProfile()
+    for start in range(0, len(df), chunk_rows):
+        profile.update(df.iloc[start:start + chunk_rows])
+    if not len(df):
+        profile.update(df)
+    return profile
+
@@ -0,0 +1,274 @@
+"""
+Schema-aware planning of plain-English questions for the data explorer
+SchemaIndex maps name tokens and sampled categorical values of every uploaded column to the
+column; plan_query() tokenizes a question once and resolves it against the index into a
+QueryPlan (aggregate, measures, dimensions, filters, time grain) that the SQL, DAX and chart
+generators all read. Planning is dictionary lookups per question token, so its cost does not
+grow with the number of columns.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+MAX_INDEXED_VALUES = 200  # categorical values indexed per column
+VALUE_SAMPLE_ROWS = 5_000
+NAME_MATCH_MIN = 0.5  # share of a column name's tokens the question must contain
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_QUARTER = re.compile(r"\bq([1-4])\s*(?:of\s*)?((?:19|20)\d{2})\b")
+_YEAR = re.compile(r"\b((?:19|20)\d{2})\b")
+_MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+_MONTH_YEAR = re.compile(r"\b(" + "|".join(_MONTHS) + r")[a-z]*\s+((?:19|20)\d{2})\b")
+
+AGGREGATE_WORDS = {
+    'average': 'AVG', 'avg': 'AVG', 'mean': 'AVG',
+    'total': 'SUM', 'sum': 'SUM',
+    'count': 'COUNT', 'number': 'COUNT', 'many': 'COUNT',
+    'distinct': 'COUNT_DISTINCT', 'unique': 'COUNT_DISTINCT',
+    'max': 'MAX', 'maximum': 'MAX', 'highest': 'MAX', 'largest': 'MAX',
+    'min': 'MIN', 'minimum': 'MIN', 'lowest': 'MIN', 'smallest': 'MIN',
+}
+GRAIN_WORDS = {
+    'day': 'day', 'daily': 'day', 'week': 'week', 'weekly': 'week', 'month': 'month', 'monthly': 'month',
+    'quarter': 'quarter', 'quarterly': 'quarter', 'year': 'year', 'yearly': 'year', 'annual': 'year',
+}
+DIMENSION_MARKERS = {'by', 'per', 'each', 'across'}
+CLAUSE_BREAKS = {'for', 'in', 'where', 'with', 'during', 'from', 'since', 'between', 'when'}
+DATE_NAME_TOKENS = {'date', 'time', 'timestamp', 'datetime', 'created', 'updated'}
+INTENT_WORDS = {
+    'trend': 'trend', 'trends': 'trend', 'timeline': 'trend',
+    'compare': 'compare', 'comparison': 'compare', 'versus': 'compare', 'vs': 'compare',
+    'distribution': 'distribution', 'histogram': 'distribution', 'spread': 'distribution',
+    'correlation': 'correlation', 'correlate': 'correlation', 'relationship': 'correlation',
+}
+
+
+def _stem(token: str) -> str:
+    """Crude singular form so 'sales' matches a 'sale' column and vice versa"""
+    if len(token) > 3 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; camelCase and snake_case names split into their words"""
+    return _WORD.findall(_CAMEL.sub(" ", text).lower())
+
+
+def _column_kind(dtype, name: str) -> str:
+    kind = getattr(dtype, 'kind', 'O')
+    if kind == 'M' or (kind == 'O' and DATE_NAME_TOKENS.intersection(tokenize(name))):
+        return 'date'
+    if kind in 'iuf':
+        return 'numeric'
+    return 'text'
+
+
+class ColumnRef:
+    """A column of one dataset, with its kind: 'numeric', 'text' or 'date'"""
+    __slots__ = ('dataset', 'column', 'kind', 'tokens', 'width')
+
+    def __init__(self, dataset: str, column: str, kind: str):
+        self.dataset = dataset
+        self.column = column
+        self.kind = kind
+        self.tokens = [_stem(token) for token in tokenize(column)]
+        self.width = len(set(self.tokens)) or 1
+
+    @property
+    def key_like(self) -> bool:
+        return bool(self.tokens) and self.tokens[-1] in ('id', 'key', 'code')
+
+    def __repr__(self):
+        return f"ColumnRef({self.dataset!r}, {self.column!r}, {self.kind!r})"
+
+
+# ====== SCHEMA INDEX ======
+class SchemaIndex:
+    """Inverted index from stemmed name tokens and categorical values to columns"""
+
+    def __init__(self):
+        self.columns: List[ColumnRef] = []
+        self.datasets: List[str] = []
+        self._by_token: Dict[str, List[ColumnRef]] = defaultdict(list)
+        # First token of a value -> [(value tokens, value, column)]
+        self._by_value: Dict[str, List[Tuple[Tuple[str, ...], str, ColumnRef]]] = defaultdict(list)
+
+    def add_dataset(self, name: str, df) -> 'SchemaIndex':
+        self.datasets.append(name)
+        for column, dtype in df.dtypes.items():
+            ref = ColumnRef(name, str(column), _column_kind(dtype, str(column)))
+            self.columns.append(ref)
+            for token in set(ref.tokens):
+                self._by_token[token].append(ref)
+            if ref.kind == 'text':
+                for value in _sample_values(df[column]):
+                    tokens = tuple(tokenize(value))
+                    if tokens:
+                        self._by_value[tokens[0]].append((tokens, value, ref))
+        return self
+
+    @classmethod
+    def from_datasets(cls, datasets: Dict[str, object]) -> 'SchemaIndex':
+        index = cls()
+        for name, df in datasets.items():
+            index.add_dataset(name, df)
+        return index
+
+    def match_columns(self, tokens: List[str]) -> List[Tuple[ColumnRef, float]]:
+        """Columns whose name tokens are mostly present, best coverage first"""
+        hits: Dict[ColumnRef, int] = defaultdict(int)
+        for token in set(tokens):
+            for ref in self._by_token.get(token, ()):
+                hits[ref] += 1
+        scored = [(ref, count / ref.width) for ref, count in hits.items() if count >= NAME_MATCH_MIN * ref.width]
+        return sorted(scored, key=lambda item: -item[1])
+
+    def match_values(self, tokens: List[str]) -> List[Tuple[ColumnRef, str]]:
+        """Categorical values spelled out in the question, as (column, value)"""
+        found = []
+        for position, token in enumerate(tokens):
+            for value_tokens, value, ref in self._by_value.get(token, ()):
+                if tuple(tokens[position:position + len(value_tokens)]) == value_tokens:
+                    found.append((ref, value))
+        return found
+
+
+def _sample_values(series) -> List[str]:
+    """Distinct values of a low-cardinality text column, from its categories or a head sample"""
+    if str(series.dtype) == 'category':
+        values = series.cat.categories
+    else:
+        values = series.head(VALUE_SAMPLE_ROWS).dropna().unique()
+    if len(values) > MAX_INDEXED_VALUES:
+        return []
+    return [str(value) for value in values]
+
+
+# ====== QUERY PLAN ======
+class QueryPlan:
+    """What a question asks for, resolved to real columns"""
+
+    def __init__(self, question: str, tokens: List[str]):
+        self.question = question
+        self.tokens = tokens
+        self.aggregate = 'SUM'
+        self.measures: List[ColumnRef] = []
+        self.dimensions: List[ColumnRef] = []
+        # (column, operator, value): operator is '=' with a string or 'between' with (start, end)
+        self.filters: List[Tuple[ColumnRef, str, object]] = []
+        self.time_column: Optional[ColumnRef] = None
+        self.time_grain: Optional[str] = None
+        self.intent = 'summary'
+
+    def datasets(self) -> List[str]:
+        """Datasets the plan touches, the measure's first"""
+        names = []
+        for ref in self.measures + self.dimensions + [f[0] for f in self.filters] + [self.time_column]:
+            if ref is not None and ref.dataset not in names:
+                names.append(ref.dataset)
+        return names
+
+    def to_dict(self) -> Dict[str, object]:
+        def name(ref):
+            return f"{ref.dataset}.{ref.column}"
+        return {
+            'aggregate': self.aggregate,
+            'measures': [name(ref) for ref in self.measures],
+            'dimensions': [name(ref) for ref in self.dimensions],
+            'filters': [(name(ref), op, value) for ref, op, value in self.filters],
+            'time_column': name(self.time_column) if self.time_column else None,
+            'time_grain': self.time_grain,
+            'intent': self.intent,
+        }
+
+
+def _time_filter(question: str) -> Optional[Tuple[str, str]]:
+    """ISO [start, end) range for 'Q1 2024', 'March 2024' or '2024' in the question"""
+    match = _QUARTER.search(question)
+    if match:
+        quarter, year = int(match.group(1)), int(match.group(2))
+        start_month = 3 * quarter - 2
+        end = f"{year + 1}-01-01" if quarter == 4 else f"{year}-{start_month + 3:02d}-01"
+        return f"{year}-{start_month:02d}-01", end
+    match = _MONTH_YEAR.search(question)
+    if match:
+        month, year = _MONTHS.index(match.group(1)) + 1, int(match.group(2))
+        end = f"{year + 1}-01-01" if month == 12 else f"{year}-{month + 1:02d}-01"
+        return f"{year}-{month:02d}-01", end
+    match = _YEAR.search(question)
+    if match:
+        year = int(match.group(1))
+        return f"{year}-01-01", f"{year + 1}-01-01"
+    return None
+
+
+def plan_query(question: str, index: SchemaIndex) -> QueryPlan:
+    """Resolve a question against the schema index"""
+    lowered = question.lower()
+    raw_tokens = tokenize(question)
+    tokens = [_stem(token) for token in raw_tokens]
+    plan = QueryPlan(question, tokens)
+
+    aggregates = [AGGREGATE_WORDS[token] for token in raw_tokens if token in AGGREGATE_WORDS]
+    # 'count distinct' / 'number of unique' mean a distinct count wherever the qualifier sits
+    plan.aggregate = 'COUNT_DISTINCT' if 'COUNT_DISTINCT' in aggregates else (aggregates[0] if aggregates else 'SUM')
+    intents = [INTENT_WORDS[token] for token in raw_tokens if token in INTENT_WORDS]
+    if 'over time' in lowered:
+        intents.insert(0, 'trend')
+    plan.intent = intents[0] if intents else 'summary'
+    grains = [GRAIN_WORDS[token] for token in raw_tokens if token in GRAIN_WORDS]
+    plan.time_grain = grains[0] if grains else None
+
+    # Words after 'by'/'per' up to the next clause name the grouping
+    grouping, in_group = set(), False
+    for token in raw_tokens:
+        if token in DIMENSION_MARKERS:
+            in_group = True
+        elif token in CLAUSE_BREAKS:
+            in_group = False
+        elif in_group:
+            grouping.add(_stem(token))
+
+    for ref, _ in index.match_columns(tokens):
+        if ref.kind == 'date':
+            plan.time_column = plan.time_column or ref
+            if grouping.intersection(ref.tokens) and plan.time_grain is None:
+                plan.time_grain = 'day'
+        elif grouping.intersection(ref.tokens) or (ref.kind == 'text' and plan.aggregate != 'COUNT_DISTINCT'):
+            plan.dimensions.append(ref)
+        elif not ref.key_like or plan.aggregate == 'COUNT_DISTINCT':
+            plan.measures.append(ref)
+
+    for ref, value in index.match_values(raw_tokens):
+        if all(existing[0] is not ref or existing[2] != value for existing in plan.filters):
+            plan.filters.append((ref, '=', value))
+            # A value filter on a column makes grouping by that same column pointless
+            plan.dimensions = [dim for dim in plan.dimensions if dim is not ref]
+
+    date_range = _time_filter(lowered)
+    wants_time = plan.time_grain or plan.intent == 'trend' or date_range
+    if wants_time and plan.time_column is None:
+        base = plan.datasets()[:1] or index.datasets[:1]
+        plan.time_column = next((ref for ref in index.columns if ref.kind == 'date' and ref.dataset in base), None) \
+            or next((ref for ref in index.columns if ref.kind == 'date'), None)
+    if plan.time_column is not None:
+        if date_range:
+            plan.filters.append((plan.time_column, 'between', date_range))
+        if plan.intent == 'trend' and plan.time_grain is None:
+            plan.time_grain = 'month'
+        if plan.time_grain:
+            plan.intent = 'trend'
+    if plan.intent == 'summary' and plan.dimensions:
+        plan.intent = 'compare'
+
+    if not plan.measures and plan.aggregate not in ('COUNT', 'COUNT_DISTINCT'):
+        # No measure named: use the base dataset's first numeric column that isn't an id
+        base = (plan.datasets() or index.datasets)[:1]
+        plan.measures = [ref for ref in index.columns
+                         if ref.dataset in base and ref.kind == 'numeric' and not ref.key_like][:1]
+    return plan
@@ -0,0 +1,185 @@
+"""
+Mergeable streaming sketches for column profiling
+HyperLogLog for distinct counts, one-permutation MinHash for value overlap and a KLL-style
+compactor sketch for quantiles. All are fed whole numpy arrays per chunk and merge across
+chunks or files, and round-trip through JSON-able dicts (arrays as base64).
+"""
+
+import base64
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+HLL_PRECISION = 12  # 4096 registers, ~1.6% standard error
+_LOW_BITS = 64 - HLL_PRECISION
+_LOW_MASK = np.uint64((1 << _LOW_BITS) - 1)
+
+
+def hash_values(values) -> np.ndarray:
+    """64-bit hashes of a non-null array; numbers hash by value so int and float columns agree"""
+    if isinstance(values, pd.Categorical):
+        category_hashes = hash_values(np.asarray(values.categories))
+        codes = values.codes
+        return category_hashes[codes[codes >= 0]]
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        values = values.astype(np.float64)
+    return pd.util.hash_array(values, categorize=False)
+
+
+def _encode(array: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def _decode(text: str, dtype) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(text), dtype=dtype).copy()
+
+
+# ---------- DISTINCT COUNTS ----------
+class HyperLogLog:
+    """Approximate distinct counter; update() takes 64-bit hashes from hash_values()"""
+
+    def __init__(self):
+        self.registers = np.zeros(1 << HLL_PRECISION, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        index = (hashes >> np.uint64(_LOW_BITS)).astype(np.intp)
+        # The low bits fit a float64 mantissa exactly, so frexp gives their bit length
+        low = (hashes & _LOW_MASK).astype(np.float64)
+        rank = (_LOW_BITS + 1 - np.frexp(low)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {'registers': _encode(self.registers)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, object]) -> 'HyperLogLog':
+        sketch = cls()
+        sketch.registers = _decode(state['registers'], np.uint8)
+        return sketch
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+# ---------- VALUE OVERLAP ----------
+MINHASH_BINS = 128
+_BIN_SHIFT = np.uint64(64 - (MINHASH_BINS - 1).bit_length())
+_EMPTY = np.iinfo(np.uint64).max
+
+
+class MinHash:
+    """One-permutation MinHash: the top bits pick a bin, each bin keeps its smallest hash"""
+
+    def __init__(self):
+        self.mins = np.full(MINHASH_BINS, _EMPTY, dtype=np.uint64)
+
+    def update(self, hashes: np.ndarray) -> None:
+        if len(hashes):
+            np.minimum.at(self.mins, (hashes >> _BIN_SHIFT).astype(np.intp), hashes)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {'mins': _encode(self.mins)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, object]) -> 'MinHash':
+        sketch = cls()
+        sketch.mins = _decode(state['mins'], np.uint64)
+        return sketch
+
+    def merge(self, other: 'MinHash') -> 'MinHash':
+        np.minimum(self.mins, other.mins, out=self.mins)
+        return self
+
+    def bands(self):
+        """(bin, value) for each filled bin; equal pairs are LSH collisions"""
+        filled = np.flatnonzero(self.mins != _EMPTY)
+        return zip(filled.tolist(), self.mins[filled].tolist())
+
+    def jaccard(self, other: 'MinHash') -> float:
+        # Bins empty in both sets carry no information about the overlap
+        used = (self.mins != _EMPTY) | (other.mins != _EMPTY)
+        total = int(used.sum())
+        return float(((self.mins == other.mins) & used).sum()) / total if total else 0.0
+
+
+# ---------- QUANTILES ----------
+class QuantileSketch:
+    """KLL-style sketch: level h holds items of weight 2**h; full levels are halved upward"""
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(8, int(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so the total weight is preserved exactly
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(keep)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=np.float64)])
+        self._compress()
+
+    def to_dict(self) -> Dict[str, object]:
+        return {'k': self.k, 'n': self.n, 'levels': [_encode(items.astype(np.float64)) for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, object]) -> 'QuantileSketch':
+        sketch = cls(state['k'])
+        sketch.n = state['n']
+        sketch.levels = [_decode(items, np.float64) for items in state['levels']]
+        return sketch
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        if not self.n:
+            return [float('nan')] * len(qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level, dtype=np.int64)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side='left')
+        return [float(value) for value in items[np.minimum(positions, len(items) - 1)]]
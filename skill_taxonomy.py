@@ -0,0 +1,326 @@
+"""
+Skill taxonomy for CV/job description gap matching
+Skills have synonyms and a parent (a broader skill or category). A taxonomy is compiled once
+into a flat binary index (an open-addressing hash table of normalized terms plus a node table)
+that is read through mmap, so worker processes share the OS page cache instead of each parsing
+a large source file. Documents are matched in one left-to-right pass over their tokens.
+Usage: python skill_taxonomy.py taxonomy.json -o taxonomy.idx
+"""
+
+import contextlib
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b'SKTX'
+VERSION = 1
+# magic, version, node count, slot count, longest term in tokens
+_HEADER = struct.Struct('<4sIIII')
+# term hash, node id (-1: only a prefix of longer terms), flags
+_SLOT = struct.Struct('<QiI')
+# name offset, name length, parent node id (-1: none)
+_NODE = struct.Struct('<IIi')
+_PREFIX = 1
+_TERMINAL = 2
+
+# Keeps 'c++', 'c#', 'node.js' and 'asp.net' as single tokens, and 'r&d' too so it doesn't match R
+_TOKEN = re.compile(r"\w[\w+#]*(?:[.&]\w+)*")
+
+# Built-in taxonomy: (skill, parent, synonyms), covering the generators' vocabulary
+DEFAULT_SKILLS = [
+    ('Programming', None, ('programming', 'software development', 'coding')),
+    ('Python', 'Programming', ('python3',)),
+    ('R', 'Programming', ('r', 'rstudio', 'tidyverse')),
+    ('Java', 'Programming', ()),
+    ('Scala', 'Programming', ()),
+    ('Pandas', 'Python', ()),
+    ('NumPy', 'Python', ()),
+    ('Databases', None, ('database', 'rdbms')),
+    ('SQL', 'Databases', ('t-sql', 'pl/sql', 'sql queries')),
+    ('PostgreSQL', 'Databases', ('postgres',)),
+    ('ETL', 'Data Engineering', ('elt', 'data pipelines')),
+    ('Data Engineering', None, ()),
+    ('Machine Learning', None, ('ml', 'predictive modeling', 'predictive modelling')),
+    ('Scikit-learn', 'Machine Learning', ('sklearn', 'scikit')),
+    ('Deep Learning', 'Machine Learning', ('neural networks', 'neural network')),
+    ('TensorFlow', 'Deep Learning', ('keras',)),
+    ('PyTorch', 'Deep Learning', ('torch',)),
+    ('NLP', 'Machine Learning', ('natural language processing',)),
+    ('Computer Vision', 'Machine Learning', ()),
+    ('Statistics', None, ('statistical analysis', 'hypothesis testing', 'a/b testing')),
+    ('Data Visualization', None, ('visualization', 'visualisation', 'dashboards')),
+    ('Power BI', 'Data Visualization', ('powerbi', 'dax')),
+    ('Tableau', 'Data Visualization', ()),
+    ('Looker', 'Data Visualization', ()),
+    ('Matplotlib', 'Data Visualization', ('seaborn', 'plotly')),
+    ('Cloud', None, ('cloud computing', 'cloud platforms')),
+    ('AWS', 'Cloud', ('amazon web services', 'sagemaker')),
+    ('Azure', 'Cloud', ('microsoft azure',)),
+    ('GCP', 'Cloud', ('google cloud', 'bigquery')),
+    ('Big Data', None, ('distributed computing',)),
+    ('Apache Spark', 'Big Data', ('spark', 'pyspark', 'databricks')),
+    ('Hadoop', 'Big Data', ('hdfs', 'hive')),
+    ('DevOps', None, ('mlops',)),
+    ('Docker', 'DevOps', ('containers',)),
+    ('Kubernetes', 'DevOps', ('k8s',)),
+]
+
+
+def normalize_term(term: str) -> str:
+    return " ".join(_TOKEN.findall(term.lower()))
+
+
+def _term_hash(key: str) -> int:
+    # 0 marks an empty slot
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+# ---------- COMPILING ----------
+def read_source(path: str) -> List[Tuple[str, Optional[str], Tuple[str, ...]]]:
+    """Skills from a JSON list of {name, parent, synonyms} or a CSV with name,parent,synonyms ('|'-separated)"""
+    with open(path, encoding='utf-8', newline='') as fh:
+        if path.lower().endswith('.json'):
+            import json
+            data = json.load(fh)
+            rows = data.get('skills', []) if isinstance(data, dict) else data
+            return [(row['name'], row.get('parent') or None, tuple(row.get('synonyms') or ())) for row in rows]
+        import csv
+        return [(row['name'], row.get('parent') or None,
+                 tuple(s.strip() for s in (row.get('synonyms') or '').split('|') if s.strip()))
+                for row in csv.DictReader(fh)]
+
+
+def compile_taxonomy(skills: Iterable[Tuple[str, Optional[str], Iterable[str]]]) -> bytes:
+    """Build the binary index; parents that are not listed as skills become nodes of their own"""
+    ids: Dict[str, int] = {}
+    names: List[str] = []
+    parents: List[Optional[str]] = []
+    synonyms: List[Iterable[str]] = []
+    for name, parent, aliases in skills:
+        if name in ids:
+            continue
+        ids[name] = len(names)
+        names.append(name)
+        parents.append(parent)
+        synonyms.append(aliases)
+    for parent in list(parents):
+        if parent and parent not in ids:
+            ids[parent] = len(names)
+            names.append(parent)
+            parents.append(None)
+            synonyms.append(())
+
+    # Normalized term -> node; plurals of single words map to the same node
+    terms: Dict[str, int] = {}
+    for node, name in enumerate(names):
+        for term in (name, *synonyms[node]):
+            key = normalize_term(term)
+            if key:
+                terms.setdefault(key, node)
+    for key, node in list(terms.items()):
+        last = key.rsplit(" ", 1)[-1]
+        if last.isalpha() and len(last) > 3 and not last.endswith('s'):
+            terms.setdefault(key + 's', node)
+
+    # Every proper prefix of a multi-word term gets a slot so matching knows to read on
+    slots: Dict[str, List[int]] = {key: [node, _TERMINAL] for key, node in terms.items()}
+    for key in terms:
+        words = key.split(" ")
+        for length in range(1, len(words)):
+            slots.setdefault(" ".join(words[:length]), [-1, 0])[1] |= _PREFIX
+    n_slots = 1 << max(4, (2 * len(slots) - 1).bit_length())
+    table = bytearray(_SLOT.size * n_slots)
+    mask = n_slots - 1
+    for key, (node, flags) in slots.items():
+        h = _term_hash(key)
+        slot = h & mask
+        while _SLOT.unpack_from(table, slot * _SLOT.size)[0]:
+            slot = (slot + 1) & mask
+        _SLOT.pack_into(table, slot * _SLOT.size, h, node, flags)
+
+    blob = bytearray()
+    node_table = bytearray()
+    for node, name in enumerate(names):
+        encoded = name.encode('utf-8')
+        node_table += _NODE.pack(len(blob), len(encoded), ids[parents[node]] if parents[node] else -1)
+        blob += encoded
+    max_ngram = max((key.count(" ") + 1 for key in terms), default=1)
+    return _HEADER.pack(MAGIC, VERSION, len(names), n_slots, max_ngram) + bytes(table) + bytes(node_table) + bytes(blob)
+
+
+# ---------- INDEX ----------
+class SkillTaxonomy:
+    """Read-only view over a compiled index held in bytes or an mmap"""
+
+    def __init__(self, buffer, source: str = "<memory>"):
+        magic, version, self.n_nodes, self.n_slots, self.max_ngram = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{source}: not a skill taxonomy index (version {VERSION})")
+        self.source = source
+        # Content digest, so results cached against one taxonomy are not served for another
+        self.version = hashlib.blake2b(buffer, digest_size=8).hexdigest()
+        self._buffer = buffer
+        self._slots_at = _HEADER.size
+        self._nodes_at = self._slots_at + self.n_slots * _SLOT.size
+        self._blob_at = self._nodes_at + self.n_nodes * _NODE.size
+        self._mask = self.n_slots - 1
+        # Same CV against many postings: its matches are computed once
+        self.match = lru_cache(maxsize=64)(self._match)
+
+    @classmethod
+    def open(cls, path: str) -> 'SkillTaxonomy':
+        """Map a compiled index, or compile a .json/.csv source to <source>.idx first when it is stale"""
+        if not path.endswith('.idx'):
+            index_path = path + '.idx'
+            if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(path):
+                data = compile_taxonomy(read_source(path))
+                # Write then rename, so concurrent workers never map a half-written file
+                tmp_path = f"{index_path}.{os.getpid()}.tmp"
+                try:
+                    with open(tmp_path, 'wb') as fh:
+                        fh.write(data)
+                    os.replace(tmp_path, index_path)
+                except OSError:
+                    # Read-only directory: serve the index from memory; each process compiles its own
+                    with contextlib.suppress(OSError):
+                        os.unlink(tmp_path)
+                    return cls(data, source=path)
+            path = index_path
+        with open(path, 'rb') as fh:
+            return cls(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ), source=path)
+
+    # ---------- NODES ----------
+    def _node(self, node: int) -> Tuple[int, int, int]:
+        return _NODE.unpack_from(self._buffer, self._nodes_at + node * _NODE.size)
+
+    def name(self, node: int) -> str:
+        offset, length, _ = self._node(node)
+        start = self._blob_at + offset
+        return bytes(self._buffer[start:start + length]).decode('utf-8')
+
+    def parent(self, node: int) -> int:
+        return self._node(node)[2]
+
+    def ancestors(self, node: int) -> List[int]:
+        found = []
+        parent = self.parent(node)
+        while parent >= 0 and parent not in found:
+            found.append(parent)
+            parent = self.parent(parent)
+        return found
+
+    def _lookup(self, key: str) -> Optional[Tuple[int, int]]:
+        h = _term_hash(key)
+        slot = h & self._mask
+        while True:
+            stored, node, flags = _SLOT.unpack_from(self._buffer, self._slots_at + slot * _SLOT.size)
+            if stored == h:
+                return node, flags
+            if not stored:
+                return None
+            slot = (slot + 1) & self._mask
+
+    # ---------- MATCHING ----------
+    def _match(self, text: str) -> Dict[int, Tuple[int, int]]:
+        """node -> (first token position, occurrences); longest match wins at each position"""
+        tokens = _TOKEN.findall(text.lower())
+        found: Dict[int, Tuple[int, int]] = {}
+        seen: Dict[str, Optional[Tuple[int, int]]] = {}
+        i, n = 0, len(tokens)
+        while i < n:
+            best, length, key = None, 1, tokens[i]
+            while True:
+                entry = seen[key] if key in seen else seen.setdefault(key, self._lookup(key))
+                if entry is None:
+                    break
+                node, flags = entry
+                if flags & _TERMINAL:
+                    best = (node, length)
+                if not flags & _PREFIX or i + length >= n or length >= self.max_ngram:
+                    break
+                key = f"{key} {tokens[i + length]}"
+                length += 1
+            if best is None:
+                i += 1
+                continue
+            node, length = best
+            first, count = found.get(node, (i, 0))
+            found[node] = (first, count + 1)
+            i += length
+        return found
+
+    def skills_gap(self, job_description: str, cv_text: str, limit: int = 15) -> Dict[str, object]:
+        """Weighted share of the posting's skills the CV covers, plus the missing ones ranked
+
+        A skill counts as covered when the CV names it or a narrower skill under it, and half
+        covered when the CV has something under the same parent. Weights grow with how often
+        the posting mentions the skill.
+        """
+        wanted = self.match(job_description)
+        have = self.match(cv_text)
+        covered = set(have)
+        for node in have:
+            covered.update(self.ancestors(node))
+        total = score = 0.0
+        matched, missing = [], []
+        for node, (first, count) in sorted(wanted.items(), key=lambda item: item[1][0]):
+            weight = 1.0 + math.log(count)
+            parent = self.parent(node)
+            credit = 1.0 if node in covered else 0.5 if parent >= 0 and parent in covered else 0.0
+            total += weight
+            score += weight * credit
+            if credit == 1.0:
+                matched.append(self.name(node))
+            else:
+                missing.append((-weight, first, node, credit))
+        missing.sort()
+        return {
+            'coverage': round(score / total, 3) if total else 1.0,
+            'matched': matched,
+            'missing': [{'skill': self.name(node), 'category': self.name(self.parent(node)) if self.parent(node) >= 0 else None,
+                         'weight': round(-weight, 2), 'related_in_cv': credit > 0}
+                        for weight, _, node, credit in missing[:limit]],
+        }
+
+
+_default_taxonomy: Optional[SkillTaxonomy] = None
+_default_lock = threading.Lock()
+
+
+def get_default_taxonomy() -> SkillTaxonomy:
+    """The taxonomy at CV_TAILOR_TAXONOMY (.idx, .json or .csv), or the built-in one"""
+    global _default_taxonomy
+    with _default_lock:
+        if _default_taxonomy is None:
+            path = os.environ.get('CV_TAILOR_TAXONOMY')
+            _default_taxonomy = SkillTaxonomy.open(path) if path else SkillTaxonomy(compile_taxonomy(DEFAULT_SKILLS))
+        return _default_taxonomy
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Compile a skill taxonomy into a memory-mappable index")
+    parser.add_argument("source", help="JSON list of {name, parent, synonyms} or CSV with name,parent,synonyms")
+    parser.add_argument("-o", "--output", help="index file (default: <source>.idx)")
+    args = parser.parse_args(argv)
+    try:
+        skills = read_source(args.source)
+        data = compile_taxonomy(skills)
+        with open(args.output or args.source + '.idx', 'wb') as fh:
+            fh.write(data)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Compiled {len(skills)} skills into {len(data):,} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+On-disk columnar snapshots of parsed explorer datasets
+The first load of a CSV is written out as an Arrow IPC file keyed by the upload's content
+hash, next to a small JSON file with its load report and column profile. Later sessions map
+the snapshot instead of parsing the CSV: uncompressed snapshots are read zero-copy from the
+mapping, only the columns that are touched get paged in, and DuckDB scans the mapped Arrow
+table directly. Snapshots are evicted least-recently-used once the directory exceeds its budget.
+Snapshots are opt-in and kept in a directory only the current user can write.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from profiler import DatasetProfile
+
+SNAPSHOT_VERSION = 2
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+# 'uncompressed' keeps reads zero-copy; 'lz4' or 'zstd' trade a decompression pass for disk space
+DEFAULT_COMPRESSION = os.environ.get('DATA_EXPLORER_SNAPSHOT_COMPRESSION', 'uncompressed')
+
+
+class SnapshotStore:
+    """Content-keyed Arrow IPC snapshots in one directory"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 compression: str = DEFAULT_COMPRESSION):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compression = None if compression == 'uncompressed' else compression
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_private(directory)
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        stem = os.path.join(self.directory, f"{key}.v{SNAPSHOT_VERSION}")
+        return stem + '.arrow', stem + '.meta.json'
+
+    def __contains__(self, key: str) -> bool:
+        return all(os.path.exists(path) for path in self._paths(key))
+
+    # ---------- READ ----------
+    def table(self, key: str, columns: Optional[List[str]] = None):
+        """The snapshot as an Arrow table over a memory map, optionally pruned to columns"""
+        import pyarrow as pa
+        data_path, _ = self._paths(key)
+        table = pa.ipc.open_file(pa.memory_map(data_path, 'r')).read_all()
+        return table.select(columns) if columns is not None else table
+
+    def load(self, key: str, columns: Optional[List[str]] = None) -> Optional[Tuple[pd.DataFrame, Dict]]:
+        """(frame, report) for a stored snapshot, or None"""
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as fh:
+                report = json.load(fh)
+            report['profile'] = DatasetProfile.from_dict(report['profile'])
+            table = self.table(key, columns)
+        except (OSError, ValueError, KeyError, TypeError):
+            with self._lock:
+                self._counters['misses'] += 1
+            return None
+        # Numeric columns without nulls and Arrow-backed strings stay on the mapped buffers
+        frame = table.to_pandas(split_blocks=True)
+        # Reads count as use for eviction
+        for path in (data_path, meta_path):
+            os.utime(path)
+        report = dict(report, mode='snapshot', rows=len(frame))
+        report['memory_mb'] = round(float(frame.memory_usage(deep=False).sum()) / (1024 * 1024), 1)
+        with self._lock:
+            self._counters['hits'] += 1
+        return frame, report
+
+    # ---------- WRITE ----------
+    def save(self, key: str, frame: pd.DataFrame, report: Dict) -> None:
+        """Write the frame and its report atomically; truncated loads are not stored"""
+        if report.get('truncated') or key in self:
+            return
+        import pyarrow as pa
+        data_path, meta_path = self._paths(key)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        fd, tmp_data = tempfile.mkstemp(suffix='.arrow.tmp', dir=self.directory)
+        os.close(fd)
+        fd, tmp_meta = tempfile.mkstemp(suffix='.meta.tmp', dir=self.directory)
+        try:
+            meta = {name: value for name, value in report.items() if name != 'mode'}
+            meta['profile'] = report['profile'].to_dict()
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump(meta, fh)
+            with pa.OSFile(tmp_data, 'wb') as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table, max_chunksize=256_000)
+            # Data first: a snapshot only counts as present once its report exists too
+            os.replace(tmp_data, data_path)
+            os.replace(tmp_meta, meta_path)
+        finally:
+            for path in (tmp_data, tmp_meta):
+                if os.path.exists(path):
+                    os.unlink(path)
+        with self._lock:
+            self._counters['writes'] += 1
+        self._sweep()
+
+    def _sweep(self) -> None:
+        """Remove the least recently used snapshots until the directory fits the budget"""
+        snapshots = {}
+        for name in os.listdir(self.directory):
+            # .meta.pkl: reports written by version 1, evicted like any other snapshot
+            if name.endswith(('.arrow', '.meta.json', '.meta.pkl')):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entry = snapshots.setdefault(name.split('.', 1)[0], [0, 0.0, []])
+                entry[0] += stat.st_size
+                entry[1] = max(entry[1], stat.st_mtime)
+                entry[2].append(path)
+        total = sum(entry[0] for entry in snapshots.values())
+        for size, _, paths in sorted(snapshots.values(), key=lambda entry: entry[1]):
+            if total <= self.max_bytes:
+                break
+            for path in paths:
+                os.unlink(path)
+            total -= size
+            with self._lock:
+                self._counters['evictions'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, directory=self.directory, max_bytes=self.max_bytes,
+                        compression=self.compression or 'uncompressed')
+
+
+def _check_private(directory: str) -> None:
+    """Snapshots are loaded back into the app, so no other user may be able to write them"""
+    if not hasattr(os, 'getuid'):
+        # Windows: the per-user default lives in the profile, which ACLs already keep private
+        return
+    stat = os.stat(directory)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+        raise PermissionError(f"{directory}: snapshot directory must belong to this user and not be writable by others")
+
+
+def default_snapshot_dir() -> str:
+    """Per-user cache directory: $XDG_CACHE_HOME or ~/.cache, then data_explorer/snapshots"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'data_explorer', 'snapshots')
+
+
+_default_store: Optional[SnapshotStore] = None
+_default_lock = threading.Lock()
+
+
+def get_default_snapshot_store() -> Optional[SnapshotStore]:
+    """Process-wide store, or None unless snapshots were enabled with DATA_EXPLORER_SNAPSHOTS=1
+    or a DATA_EXPLORER_SNAPSHOT_DIR; an unsafe directory disables them with a warning"""
+    global _default_store
+    with _default_lock:
+        directory = os.environ.get('DATA_EXPLORER_SNAPSHOT_DIR')
+        if not directory and os.environ.get('DATA_EXPLORER_SNAPSHOTS') != '1':
+            return None
+        if _default_store is None:
+            try:
+                _default_store = SnapshotStore(
+                    directory or default_snapshot_dir(),
+                    max_bytes=int(os.environ.get('DATA_EXPLORER_SNAPSHOT_MB', DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024,
+                )
+            except OSError as e:
+                logging.getLogger('data_explorer').warning("Snapshots disabled: %s", e)
+                return None
+        return _default_store
@@ -0,0 +1,148 @@
+"""
+Embedded SQL engine for the data explorer
+Uploaded frames are registered as tables and generated SQL runs against them with paging and
+a timeout. DuckDB is used when installed: frames are handed over as Arrow tables without
+copying, so it prunes columns and pushes filters into the scan, and joins are hash joins.
+Without DuckDB an in-memory SQLite database stands in; frames are copied in and join-key
+columns are indexed.
+"""
+
+import importlib.util
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+DEFAULT_TIMEOUT = float(os.environ.get('DATA_EXPLORER_QUERY_TIMEOUT', 30))
+DEFAULT_PAGE_SIZE = 500
+
+_TRAILING_SEMICOLONS = re.compile(r";\s*$")
+
+
+class QueryError(Exception):
+    pass
+
+
+class QueryTimeout(QueryError):
+    pass
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class SQLEngine:
+    """Tables registered by name; register() is a no-op while a table's content key is unchanged"""
+
+    def __init__(self, backend: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT):
+        if backend is None:
+            backend = 'duckdb' if importlib.util.find_spec('duckdb') else 'sqlite'
+        self.backend = backend
+        self.timeout = timeout
+        self._tables: Dict[str, str] = {}
+        # One connection per engine; queries from concurrent reruns take turns
+        self._lock = threading.Lock()
+        if backend == 'duckdb':
+            import duckdb
+            self._con = duckdb.connect(config={'enable_external_access': False})
+        else:
+            import sqlite3
+            self._con = sqlite3.connect(':memory:', check_same_thread=False)
+
+    # ---------- TABLES ----------
+    def register(self, table: str, df: pd.DataFrame, key: Optional[str] = None,
+                 index_columns: Iterable[str] = (), arrow=None) -> None:
+        """arrow: the same data as an Arrow table (e.g. a mapped snapshot) for DuckDB to scan in place,
+        or a function returning one or None, called only when the table is not registered under key yet"""
+        key = key or str(id(df))
+        with self._lock:
+            if self._tables.get(table) == key:
+                return
+            if self.backend == 'duckdb':
+                import pyarrow as pa
+                if callable(arrow):
+                    arrow = arrow()
+                self._con.register(table, arrow if arrow is not None else pa.Table.from_pandas(df, preserve_index=False))
+            else:
+                self._load_sqlite(table, df, index_columns)
+            self._tables[table] = key
+
+    def _load_sqlite(self, table: str, df: pd.DataFrame, index_columns: Iterable[str]) -> None:
+        # SQLite has no categorical or Arrow types; store plain values
+        plain = df.astype({column: object for column, dtype in df.dtypes.items()
+                           if isinstance(dtype, (pd.CategoricalDtype, pd.ArrowDtype))})
+        plain.to_sql(table, self._con, index=False, if_exists='replace', chunksize=50_000)
+        for column in index_columns:
+            self._con.execute(f"CREATE INDEX IF NOT EXISTS {_quote(table + '__' + column)} "
+                              f"ON {_quote(table)} ({_quote(column)})")
+
+    def retain(self, tables: Iterable[str]) -> None:
+        """Drop tables that are no longer uploaded so their frames can be freed"""
+        keep = set(tables)
+        with self._lock:
+            for table in [table for table in self._tables if table not in keep]:
+                if self.backend == 'duckdb':
+                    self._con.unregister(table)
+                else:
+                    self._con.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+                del self._tables[table]
+
+    def tables(self) -> Dict[str, str]:
+        return dict(self._tables)
+
+    # ---------- QUERIES ----------
+    def execute(self, sql: str, page: int = 0, page_size: int = DEFAULT_PAGE_SIZE,
+                timeout: Optional[float] = None) -> Dict[str, object]:
+        """Run one SELECT and return a page of it: {'frame', 'page', 'has_more', 'elapsed_ms', 'backend'}"""
+        statement = _TRAILING_SEMICOLONS.sub("", sql.strip())
+        paged = f"SELECT * FROM ({statement}) AS query_page LIMIT {page_size + 1} OFFSET {page * page_size}"
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        with self._lock:
+            if self.backend == 'duckdb':
+                frame = self._run_duckdb(paged, timeout)
+            else:
+                frame = self._run_sqlite(paged, timeout)
+        return {
+            'frame': frame.iloc[:page_size],
+            'page': page,
+            'has_more': len(frame) > page_size,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            'backend': self.backend,
+        }
+
+    def _run_duckdb(self, sql: str, timeout: float) -> pd.DataFrame:
+        import duckdb
+        timer = threading.Timer(timeout, self._con.interrupt)
+        timer.start()
+        try:
+            return self._con.execute(sql).df()
+        except duckdb.InterruptException:
+            raise QueryTimeout(f"Query exceeded {timeout:g}s")
+        except duckdb.Error as e:
+            raise QueryError(str(e))
+        finally:
+            timer.cancel()
+
+    def _run_sqlite(self, sql: str, timeout: float) -> pd.DataFrame:
+        import sqlite3
+        deadline = time.monotonic() + timeout
+        # A non-zero return from the progress handler aborts the running statement
+        self._con.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+        try:
+            cursor = self._con.execute(sql)
+            return pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
+        except sqlite3.OperationalError as e:
+            if time.monotonic() > deadline:
+                raise QueryTimeout(f"Query exceeded {timeout:g}s")
+            raise QueryError(str(e))
+        except sqlite3.Error as e:
+            raise QueryError(str(e))
+        finally:
+            self._con.set_progress_handler(None, 0)
+
+    def close(self) -> None:
+        self._con.close()
@@ -0,0 +1,132 @@
+"""
+Dependency-tracked tailoring pipeline
+Each artifact declares the inputs it reads (the CV, the job description, the company, the job
+title, the output format) and the resources behind it (its document template, the skill
+taxonomy). Results are memoized on the fingerprints of exactly those, so when one field changes
+or a template is edited only the artifacts that read it are regenerated; the rest are reused.
+Long texts are fingerprinted by content hash, and the parsed CV is shared by every artifact.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from cv_parser import ParsedCV, parse_cv
+from cv_tailor_core import (
+    generate_tailored_summary, generate_tailored_skills, generate_cover_letter, generate_linkedin_message,
+    skills_gap
+)
+from doc_templates import get_template
+from instrumentation import span
+
+MAX_CACHED = 512
+
+
+class TailorInputs:
+    """One set of pipeline inputs; the parsed CV is shared with the parse cache"""
+    __slots__ = ('cv_text', 'job_description', 'company', 'job_title', 'fmt', 'parsed', 'fingerprints')
+
+    def __init__(self, cv_text: str, job_description: str, company: str, job_title: str,
+                 fmt: str = 'txt', parsed: Optional[ParsedCV] = None):
+        self.cv_text = cv_text
+        self.job_description = job_description
+        self.company = company
+        self.job_title = job_title
+        self.fmt = fmt
+        self.parsed = parsed or parse_cv(cv_text)
+        self.fingerprints = {
+            'cv': self.parsed.key,
+            'job_description': hashlib.sha256(job_description.encode('utf-8', 'surrogatepass')).hexdigest(),
+            'company': company,
+            'job_title': job_title,
+            'fmt': fmt,
+        }
+
+
+def _taxonomy_version(inputs: 'TailorInputs') -> str:
+    from skill_taxonomy import get_default_taxonomy
+    return get_default_taxonomy().version
+
+
+# Resources read fresh on every run, since templates reload when edited
+RESOURCES: Dict[str, Callable[[TailorInputs], str]] = {
+    'cover_letter_template': lambda i: get_template('cover_letter', i.fmt).version,
+    'linkedin_template': lambda i: get_template('linkedin_message', i.fmt).version,
+    'taxonomy': _taxonomy_version,
+}
+
+# Artifact -> (inputs and resources it depends on, builder)
+ARTIFACTS: Dict[str, Tuple[Tuple[str, ...], Callable[[TailorInputs], object]]] = {
+    'summary': (('cv', 'job_description'),
+                lambda i: generate_tailored_summary(i.job_description, i.cv_text, i.parsed)),
+    'skills': (('cv', 'job_description'),
+               lambda i: generate_tailored_skills(i.job_description, i.cv_text, i.parsed)),
+    'cover_letter': (('cv', 'job_description', 'company', 'job_title', 'fmt', 'cover_letter_template'),
+                     lambda i: generate_cover_letter(i.job_description, i.cv_text, i.company, i.job_title,
+                                                     i.parsed, i.fmt)),
+    'linkedin_message': (('job_description', 'company', 'job_title', 'fmt', 'linkedin_template'),
+                         lambda i: generate_linkedin_message(i.job_title, i.company, i.job_description, i.fmt)),
+    'skills_gap': (('cv', 'job_description', 'taxonomy'),
+                   lambda i: skills_gap(i.job_description, i.cv_text)),
+}
+
+
+class TailorPipeline:
+    """Memoizes artifacts by their inputs and regenerates only the stale ones"""
+
+    def __init__(self, max_entries: int = MAX_CACHED):
+        self.max_entries = max_entries
+        self._results: "OrderedDict[tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'reused': 0, 'computed': 0}
+
+    def run(self, inputs: TailorInputs, artifacts: Optional[Iterable[str]] = None) -> Tuple[Dict[str, object], List[str]]:
+        """(artifact -> result, names of the artifacts that were reused rather than regenerated)"""
+        results: Dict[str, object] = {}
+        reused: List[str] = []
+        fingerprints = dict(inputs.fingerprints)
+        for name in artifacts or ARTIFACTS:
+            depends_on, build = ARTIFACTS[name]
+            for field in depends_on:
+                if field not in fingerprints:
+                    fingerprints[field] = RESOURCES[field](inputs)
+            key = (name,) + tuple(fingerprints[field] for field in depends_on)
+            with self._lock:
+                found = key in self._results
+                if found:
+                    self._results.move_to_end(key)
+                    results[name] = self._results[key]
+                    self._counters['reused'] += 1
+            if found:
+                reused.append(name)
+                continue
+            with span(f"generate.{name}"):
+                results[name] = build(inputs)
+            with self._lock:
+                self._results[key] = results[name]
+                self._counters['computed'] += 1
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        return results, reused
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, entries=len(self._results))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
+_default_pipeline: Optional[TailorPipeline] = None
+_default_lock = threading.Lock()
+
+
+def get_default_pipeline() -> TailorPipeline:
+    """Process-wide pipeline shared by batch workers and the HTTP service"""
+    global _default_pipeline
+    with _default_lock:
+        if _default_pipeline is None:
+            _default_pipeline = TailorPipeline()
+        return _default_pipeline
@@ -0,0 +1,248 @@
+"""
+HTTP tailoring service - the four CV Tailor artifacts as JSON
+Usage: python tailor_service.py [--host 127.0.0.1] [--port 8502] [--workers 4]
+
+POST /tailor  multipart/form-data with a `cv` file plus `job_title`, `company` and
+              `job_description` fields (or a JSON body with `cv_text` instead of the file)
+GET  /health  pool and cache status
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from email.parser import BytesParser
+from email.policy import HTTP
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from cv_tailor_core import NamedBuffer, extract_text_from_file, is_extraction_error
+from doc_templates import FORMATS
+from tailor_pipeline import TailorInputs, get_default_pipeline
+from text_cache import content_hash, get_default_cache
+
+MAX_UPLOAD_BYTES = int(os.environ.get('CV_TAILOR_MAX_UPLOAD_MB', 10)) * 1024 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+READ_TIMEOUT = 30.0
+REQUIRED_FIELDS = ('job_title', 'company', 'job_description')
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            408: 'Request Timeout', 413: 'Payload Too Large', 500: 'Internal Server Error',
+            503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------- WORKER SIDE ----------
+def _init_worker() -> None:
+    # Each service worker already is one of a pool; don't let long PDFs start a nested pool
+    import extractors
+    extractors.PDF_WORKERS = 1
+
+
+def _extract_in_worker(data: bytes, filename: str) -> str:
+    return extract_text_from_file(NamedBuffer(data, filename))
+
+
+# ---------- REQUEST PARSING ----------
+def parse_multipart(content_type: str, body: bytes) -> Tuple[Dict[str, str], Optional[Tuple[str, bytes]]]:
+    """Split a multipart/form-data body into text fields and the `cv` file (filename, bytes)"""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body
+    )
+    if not message.is_multipart():
+        raise HTTPError(400, "Expected a multipart/form-data body")
+    fields: Dict[str, str] = {}
+    upload = None
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        payload = part.get_payload(decode=True) or b""
+        if name == 'cv' and part.get_filename():
+            upload = (part.get_filename(), payload)
+        elif name:
+            fields[name] = payload.decode(part.get_content_charset() or 'utf-8', 'replace')
+    return fields, upload
+
+
+def parse_body(content_type: str, body: bytes) -> Tuple[Dict[str, str], Optional[Tuple[str, bytes]]]:
+    """Validated request fields plus the `cv` upload (filename, bytes), or None when `cv_text` was sent"""
+    if content_type.startswith('multipart/form-data'):
+        fields, upload = parse_multipart(content_type, body)
+        if upload is None:
+            raise HTTPError(400, "Missing `cv` file upload")
+    elif content_type.startswith('application/json'):
+        try:
+            fields = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Invalid JSON body")
+        if not isinstance(fields, dict):
+            raise HTTPError(400, "JSON body must be an object")
+        upload = None
+        if not fields.get('cv_text'):
+            raise HTTPError(400, "Missing `cv_text`")
+    else:
+        raise HTTPError(400, "Use multipart/form-data or application/json")
+
+    missing = [field for field in REQUIRED_FIELDS if not fields.get(field)]
+    if missing:
+        raise HTTPError(400, f"Missing fields: {', '.join(missing)}")
+    wrong = [field for field in REQUIRED_FIELDS + ('cv_text', 'format')
+             if fields.get(field) is not None and not isinstance(fields[field], str)]
+    if wrong:
+        raise HTTPError(400, f"Fields must be strings: {', '.join(wrong)}")
+    fmt = fields.get('format') or 'txt'
+    if fmt not in FORMATS:
+        raise HTTPError(400, f"Unknown format {fmt!r}; use one of {', '.join(FORMATS)}")
+    return fields, upload
+
+
+async def read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+    """Read one HTTP/1.1 request without blocking the loop; the body is capped at MAX_UPLOAD_BYTES"""
+    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), READ_TIMEOUT)
+    if len(head) > MAX_HEADER_BYTES:
+        raise HTTPError(400, "Request headers too large")
+    request_line, *header_lines = head.decode('latin-1').split("\r\n")
+    try:
+        method, path, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    for line in header_lines:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    length = headers.get('content-length', '0').strip() or '0'
+    if not length.isdigit():
+        raise HTTPError(400, "Content-Length must be a non-negative integer")
+    length = int(length)
+    if length > MAX_UPLOAD_BYTES:
+        raise HTTPError(413, f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+    body = await asyncio.wait_for(reader.readexactly(length), READ_TIMEOUT) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+
+# ---------- SERVICE ----------
+class TailorService:
+    """Async front end; extraction runs on a bounded process pool with backpressure"""
+
+    def __init__(self, workers: int = os.cpu_count() or 1, max_pending: Optional[int] = None):
+        self.workers = workers
+        self.max_pending = max_pending or workers * 4
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._pool = None
+
+    def start_pool(self) -> None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         mp_context=multiprocessing.get_context('spawn'))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    async def extract(self, filename: str, data: bytes) -> str:
+        """Cached extraction; misses go to the pool, and a full queue is rejected with 503"""
+        from concurrent.futures.process import BrokenProcessPool
+        cache = get_default_cache()
+        key = content_hash(data, Path(filename).suffix)
+        cv_text = cache.get(key)
+        if cv_text is not None:
+            return cv_text
+        if self._slots.locked():
+            raise HTTPError(503, "Extraction queue is full, retry shortly")
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            pool = self._pool
+            try:
+                cv_text = await loop.run_in_executor(pool, _extract_in_worker, data, filename)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); later requests get a fresh pool
+                if self._pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.start_pool()
+                raise HTTPError(500, "Extraction worker crashed on this file")
+        return cv_text if is_extraction_error(cv_text) else cache.put(key, cv_text)
+
+    async def tailor(self, headers: Dict[str, str], body: bytes) -> Dict[str, str]:
+        # Parsing and generation are CPU-bound; running them off the loop keeps other connections served
+        loop = asyncio.get_running_loop()
+        fields, upload = await loop.run_in_executor(None, parse_body, headers.get('content-type', ''), body)
+        cv_text = await self.extract(*upload) if upload is not None else fields['cv_text']
+        if is_extraction_error(cv_text):
+            raise HTTPError(400, cv_text)
+        job_desc, company, job_title = fields['job_description'], fields['company'], fields['job_title']
+        fmt = fields.get('format') or 'txt'
+        # Repeat requests reuse every artifact whose inputs (CV, description, company, title, format) are unchanged
+        artifacts, reused = await loop.run_in_executor(
+            None, lambda: get_default_pipeline().run(TailorInputs(cv_text, job_desc, company, job_title, fmt)))
+        return dict(artifacts, reused=reused)
+
+    async def route(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Dict:
+        if path == '/health':
+            return {'status': 'ok', 'workers': self.workers, 'max_pending': self.max_pending,
+                    'cache': get_default_cache().stats(), 'pipeline': get_default_pipeline().stats()}
+        if path == '/tailor':
+            if method != 'POST':
+                raise HTTPError(405, "Use POST")
+            return await self.tailor(headers, body)
+        raise HTTPError(404, f"No route for {path}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        status, payload = 200, {}
+        try:
+            method, path, headers, body = await read_request(reader)
+            payload = await self.route(method, path, headers, body)
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except asyncio.LimitOverrunError:
+            status, payload = 400, {'error': "Request headers too large"}
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            status, payload = 408, {'error': "Request not received in time"}
+        except Exception as e:
+            status, payload = 500, {'error': f"Internal error: {e}"}
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        extra = "Retry-After: 1\r\n" if status == 503 else ""
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n{extra}Connection: close\r\n\r\n".encode('latin-1') + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int, workers: int, max_pending: Optional[int] = None) -> None:
+    service = TailorService(workers, max_pending)
+    service.start_pool()
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"CV Tailor service listening on http://{host}:{port}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve CV tailoring over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="extraction processes")
+    parser.add_argument("--max-pending", type=int, help="queued extractions before 503 (default 4x workers)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_pending))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
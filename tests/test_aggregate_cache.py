@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from aggregate_cache import AggregateCache, AggregateRequest
+from sql_engine import SQLEngine
+
+pytest.importorskip('duckdb')
+
+REGIONS = ['north', 'south', 'east']
+PRODUCTS = ['a', 'b', 'c', 'd']
+
+
+@pytest.fixture(scope='module')
+def sales():
+    rows = 2000
+    return pd.DataFrame({
+        'region': [REGIONS[i % 3] for i in range(rows)],
+        'product': [PRODUCTS[i % 4] for i in range(rows)],
+        'order_date': [str(pd.Timestamp('2023-01-01') + pd.Timedelta(days=i % 700))[:10] for i in range(rows)],
+        'amount': [float((i * 37) % 101) for i in range(rows)],
+    })
+
+
+@pytest.fixture(scope='module')
+def engine(sales):
+    engine = SQLEngine(backend='duckdb')
+    engine.register('sales', sales)
+    yield engine
+    engine.close()
+
+
+def _request(dims=(), grain=None, aggregate='SUM', filters=()):
+    return AggregateRequest('sales', tuple(dims), 'order_date' if grain else None, grain, ('amount',),
+                            aggregate, frozenset(filters))
+
+
+def _sql(engine, sql, keys):
+    return engine.execute(sql, page_size=10_000)['frame'].sort_values(keys).reset_index(drop=True)
+
+
+def _same(cached, expected, keys):
+    cached = cached.sort_values(keys).reset_index(drop=True)
+    for key in keys:
+        if pd.api.types.is_datetime64_any_dtype(cached[key]):
+            cached[key] = cached[key].astype('datetime64[ns]')
+            expected[key] = pd.to_datetime(expected[key]).astype('datetime64[ns]')
+    pd.testing.assert_frame_equal(cached, expected[list(cached.columns)], check_dtype=False)
+
+
+@pytest.mark.parametrize('grain', ['quarter', 'year'])
+def test_coarser_grains_roll_up_from_months(sales, engine, grain):
+    cache = AggregateCache()
+    cache.answer(_request(['region'], 'month'), sales)
+    answer, info = cache.answer(_request(['region'], grain), sales)
+    assert info['source'] == 'rollup'
+    expected = _sql(engine, f"""
+        SELECT date_trunc('{grain}', CAST(order_date AS DATE)) AS {grain}, region, SUM(amount) AS sum_amount
+        FROM sales GROUP BY 1, 2""", [grain, 'region'])
+    _same(answer, expected, [grain, 'region'])
+
+
+def test_fewer_dimensions_roll_up_with_averages(sales, engine):
+    cache = AggregateCache()
+    cache.answer(_request(['region', 'product'], aggregate='SUM'), sales)
+    answer, info = cache.answer(_request(['region'], aggregate='AVG'), sales)
+    assert info['source'] == 'rollup'
+    expected = _sql(engine, "SELECT region, AVG(amount) AS avg_amount FROM sales GROUP BY region", ['region'])
+    _same(answer, expected, ['region'])
+
+
+def test_equality_filter_rolls_up_from_the_dimension(sales, engine):
+    cache = AggregateCache()
+    cache.answer(_request(['region', 'product'], aggregate='MAX'), sales)
+    answer, info = cache.answer(_request(['product'], aggregate='MAX', filters=[('region', '=', 'south')]), sales)
+    assert info['source'] == 'rollup'
+    expected = _sql(engine, "SELECT product, MAX(amount) AS max_amount FROM sales WHERE region = 'south' "
+                            "GROUP BY product", ['product'])
+    _same(answer, expected, ['product'])
@@ -0,0 +1,30 @@
+import json
+import zipfile
+
+from batch_tailor import load_postings, tailor_postings, write_zip
+
+CV = "Jane Doe\nSKILLS\nPython, SQL, machine learning\nEXPERIENCE\nData Scientist at Acme\n"
+POSTING = {'job_title': 'Data Scientist', 'company': 'Globex', 'job_description': 'Python and SQL'}
+
+
+def test_bad_jsonl_rows_become_error_records(tmp_path):
+    path = tmp_path / "postings.jsonl"
+    lines = [json.dumps(POSTING), json.dumps(["not", "an", "object"]), "{broken",
+             json.dumps(dict(POSTING, company=42))]
+    path.write_text("\n".join(lines) + "\n")
+    results = list(tailor_postings(CV, load_postings(str(path))))
+    assert [result['id'] for result in results] == ['1', '2', '3', '4']
+    assert 'error' not in results[0] and results[0]['cover_letter']
+    assert results[1]['error'] == "Expected a JSON object, got list"
+    assert results[2]['error'].startswith("Invalid JSON")
+    assert results[3]['error'] == "Fields must be strings: company"
+
+
+def test_zip_folders_stay_unique(tmp_path):
+    results = [{'id': 'a/b', 'error': 'first'}, {'id': 'a_b', 'error': 'second'}, {'id': 'a_b', 'error': 'third'}]
+    path = tmp_path / "results.zip"
+    assert write_zip(results, str(path)) == 3
+    with zipfile.ZipFile(path) as zipf:
+        assert zipf.read("a_b/error.txt") == b"first"
+        assert zipf.read("a_b-2/error.txt") == b"second"
+        assert zipf.read("a_b-3/error.txt") == b"third"
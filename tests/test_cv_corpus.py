@@ -0,0 +1,37 @@
+import os
+
+from cv_corpus import CorpusIndex
+
+
+def _write(path, text: str) -> None:
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(text)
+
+
+def test_changed_cv_that_fails_extraction_is_dropped(tmp_path):
+    cvs = tmp_path / "cvs"
+    cvs.mkdir()
+    _write(cvs / "alice.txt", "Python developer with SQL and machine learning experience")
+    _write(cvs / "bob.txt", "Accountant with payroll and audit experience")
+    index = CorpusIndex(str(tmp_path / "index"))
+    assert index.ingest(str(cvs), workers=1)['added'] == 2
+
+    _write(cvs / "alice.txt", "")
+    os.utime(cvs / "alice.txt", ns=(1, 1))
+    stats = index.ingest(str(cvs), workers=1)
+    assert stats['failed'] == 1 and stats['errors'][0][0] == "alice.txt"
+    assert [doc['name'] for doc in index.docs] == ["bob.txt"]
+    assert [match['name'] for match in index.search("payroll audit")] == ["bob.txt"]
+    assert index.search("python sql") == []
+
+
+def test_unreadable_file_is_reported_not_fatal(tmp_path):
+    cvs = tmp_path / "cvs"
+    cvs.mkdir()
+    _write(cvs / "alice.txt", "Python developer")
+    os.symlink(cvs / "missing.txt", cvs / "dangling.txt")
+    index = CorpusIndex(str(tmp_path / "index"))
+    stats = index.ingest(str(cvs), workers=1)
+    assert stats['added'] == 1
+    assert [name for name, _ in stats['errors']] == ["dangling.txt"]
+    assert stats['errors'][0][1].startswith("Could not read file")
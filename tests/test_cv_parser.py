@@ -0,0 +1,19 @@
+from cv_parser import parse_sections
+
+
+def test_only_heading_shaped_lines_start_sections():
+    text = "\n".join([
+        "Professional Summary",
+        "Data scientist with 5 years experience in Python",
+        "Key Skills & Competencies:",
+        "Python skills, SQL",
+        "Experience: see below",
+        "Work Experience",
+        "Analyst, Acme 2019 - present",
+    ])
+    sections = parse_sections(text)
+    assert sections == {
+        'summary': ["Data scientist with 5 years experience in Python"],
+        'skills': ["Python skills, SQL", "Experience: see below"],
+        'experience': ["Analyst, Acme 2019 - present"],
+    }
@@ -0,0 +1,22 @@
+import io
+
+from data_loader import load_csv
+
+
+def _csv(rows: int, tail: str) -> bytes:
+    return ("id,amount\n" + "".join(f"{i},{i * 2}\n" for i in range(rows)) + tail).encode()
+
+
+def test_arrow_fallback_reads_a_column_that_changes_type_as_text():
+    df, report = load_csv(io.BytesIO(_csv(300_000, "oops,7\n")), memory_limit_mb=1)
+    assert report['mode'] == 'arrow-mmap'
+    assert len(df) == 300_001
+    assert df['id'].iloc[-1] == 'oops'
+    # Only the offending column loses its numeric type
+    assert df['amount'].iloc[-1] == 7
+
+
+def test_small_file_stays_in_pandas():
+    df, report = load_csv(io.BytesIO(_csv(1_000, "")))
+    assert report['mode'] == 'pandas' and not report['truncated']
+    assert len(df) == 1_000 and report['profile'].rows == 1_000
@@ -0,0 +1,35 @@
+import pandas as pd
+
+import dataset_registry
+from data_explorer_core import detect_relationships
+from dataset_registry import DatasetEntry, DatasetRegistry
+from profiler import profile_frame
+
+
+def _entry(key: str, df: pd.DataFrame) -> DatasetEntry:
+    return DatasetEntry(key, df, {'mode': 'pandas', 'profile': profile_frame(df)})
+
+
+def test_new_dataset_only_computes_its_own_pairs(monkeypatch):
+    customers = pd.DataFrame({'customer_id': range(200), 'region': ['n', 's'] * 100})
+    orders = pd.DataFrame({'order_id': range(1000), 'customer_id': [i % 200 for i in range(1000)]})
+    payments = pd.DataFrame({'payment_id': range(500), 'order_id': [i * 2 for i in range(500)]})
+    entries = {'customers': _entry('c', customers), 'orders': _entry('o', orders)}
+    calls = []
+
+    def counting(datasets, profiles=None):
+        calls.append(tuple(datasets))
+        return detect_relationships(datasets, profiles)
+
+    monkeypatch.setattr(dataset_registry, 'detect_relationships', counting)
+    registry = DatasetRegistry()
+    first = registry.relationships(entries)
+    assert calls == [('customers', 'orders')]
+    assert ('customer_id', 'customer_id') in [candidate[:2] for candidate in first[('customers', 'orders')]]
+
+    calls.clear()
+    entries['payments'] = _entry('p', payments)
+    second = registry.relationships(entries)
+    assert sorted(calls) == [('customers', 'payments'), ('orders', 'payments')]
+    assert second[('customers', 'orders')] == first[('customers', 'orders')]
+    assert ('order_id', 'order_id') in [candidate[:2] for candidate in second[('orders', 'payments')]]
@@ -0,0 +1,38 @@
+import tracemalloc
+
+import instrumentation
+from instrumentation import PrometheusTextSink, span
+
+
+def test_disable_flushes_spans_recorded_since_the_last_rewrite(tmp_path):
+    path = tmp_path / "metrics.prom"
+    sink = PrometheusTextSink(str(path), flush_interval=3600)
+    instrumentation.add_sink(sink)
+    try:
+        with span("first"):
+            pass
+        with span("second"):
+            pass
+    finally:
+        instrumentation.disable()
+    text = path.read_text()
+    assert 'cv_tailor_stage_seconds_count{stage="first"} 1' in text
+    assert 'cv_tailor_stage_seconds_count{stage="second"} 1' in text
+
+
+def test_disable_stops_the_tracemalloc_it_started():
+    assert not tracemalloc.is_tracing()
+    instrumentation.set_allocation_tracking(True)
+    assert tracemalloc.is_tracing()
+    instrumentation.disable()
+    assert not tracemalloc.is_tracing()
+
+
+def test_disable_leaves_a_callers_tracemalloc_running():
+    tracemalloc.start()
+    try:
+        instrumentation.set_allocation_tracking(True)
+        instrumentation.disable()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,15 @@
+from cv_tailor_core import generate_tailored_skills
+from keyword_matcher import MATCHER
+
+
+def test_r_and_d_does_not_match_the_r_language():
+    assert 'r' not in MATCHER.scan("Join our R&D team")
+    assert 'r' not in MATCHER.scan("Send RS and res documents")
+    assert 'r' not in MATCHER.spans("Worked in R&D")
+    skills = generate_tailored_skills("Join our R&D team", "I worked in R&D")
+    assert "R (" not in skills
+
+
+def test_r_and_plurals_still_match():
+    assert 'r' in MATCHER.scan("Statistics in R, Python and SQL")
+    assert {'database', 'dashboard'} <= MATCHER.scan("Built databases and dashboards")
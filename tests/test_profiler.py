@@ -0,0 +1,48 @@
+import io
+
+from data_loader import load_csv
+from profiler import DatasetProfile
+
+
+def _csv(rows: int, tail: str) -> bytes:
+    lines = ["amount,label"] + [f"{i},x{i % 3}" for i in range(rows)] + [tail]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_numeric_column_with_text_in_a_later_chunk():
+    df, report = load_csv(io.BytesIO(_csv(3000, "oops,x")), chunk_rows=1000)
+    column = report['profile'].columns['amount'].summary()
+    assert len(df) == 3001
+    assert column['count'] == 3000
+    assert column['nulls'] == 1
+    assert column['min'] == 0 and column['max'] == 2999
+
+
+def test_profile_update_coerces_mixed_chunk():
+    import pandas as pd
+    profile = DatasetProfile()
+    profile.update(pd.DataFrame({'amount': [1.0, 2.0]}))
+    profile.update(pd.DataFrame({'amount': ['3', 'n/a']}))
+    column = profile.columns['amount'].summary()
+    assert column['count'] == 3 and column['nulls'] == 1
+    assert column['mean'] == 2.0
+
+
+def test_profile_round_trips_through_json():
+    import json
+    df, report = load_csv(io.BytesIO(_csv(3000, "7,x1")), chunk_rows=1000)
+    profile = report['profile']
+    restored = DatasetProfile.from_dict(json.loads(json.dumps(profile.to_dict())))
+    assert restored.to_frame().equals(profile.to_frame())
+    assert restored.columns['label'].values.jaccard(profile.columns['label'].values) == 1.0
+
+
+def test_text_column_empty_in_the_first_chunk_stays_text():
+    lines = ["id,note"] + [f"{i}," for i in range(30000)] + [f"{i},hello{i}" for i in range(30000, 60000)]
+    df, report = load_csv(io.BytesIO(("\n".join(lines) + "\n").encode()), chunk_rows=25000)
+    column = report['profile'].columns['note']
+    summary = column.summary()
+    assert summary['count'] == 30000 and summary['nulls'] == 30000
+    assert summary['distinct'] > 25000
+    assert not column.numeric
+    assert any(column.values.bands())
@@ -0,0 +1,19 @@
+import json
+
+from skill_taxonomy import DEFAULT_SKILLS, SkillTaxonomy, compile_taxonomy
+
+
+def test_r_and_d_is_not_the_r_language():
+    taxonomy = SkillTaxonomy(compile_taxonomy(DEFAULT_SKILLS))
+    names = {taxonomy.name(node) for node in taxonomy.match("Led R&D for the platform in R")}
+    assert names == {'R'}
+    assert not taxonomy.match("R&D lead")
+
+
+def test_open_falls_back_to_memory_when_index_cannot_be_written(tmp_path):
+    source = tmp_path / "skills.json"
+    # A directory where the index should go makes the write fail like a read-only location
+    (tmp_path / "skills.json.idx").mkdir()
+    source.write_text(json.dumps([{'name': 'Python', 'parent': None, 'synonyms': ['python3']}]))
+    taxonomy = SkillTaxonomy.open(str(source))
+    assert [taxonomy.name(node) for node in taxonomy.match("python3 developer")] == ['Python']
@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+from tailor_service import HTTPError, TailorService, read_request
+
+CV = "Summary\nData analyst with Python and SQL\nSkills\nPython, SQL, Tableau\n"
+
+
+def _request(body: bytes, content_type: str = 'application/json', length=None) -> bytes:
+    length = len(body) if length is None else length
+    return (f"POST /tailor HTTP/1.1\r\nContent-Type: {content_type}\r\nContent-Length: {length}\r\n\r\n"
+            .encode('latin-1') + body)
+
+
+def _serve(raw: bytes):
+    """Status and JSON payload of one request handled by a service without a process pool"""
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        written = bytearray()
+
+        class Writer:
+            def write(self, data):
+                written.extend(data)
+
+            async def drain(self):
+                pass
+
+            def close(self):
+                pass
+
+        await TailorService(workers=1).handle(reader, Writer())
+        head, _, body = bytes(written).partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(body)
+    return asyncio.run(run())
+
+
+def _json(**fields) -> bytes:
+    return json.dumps(fields).encode()
+
+
+def test_json_request_returns_artifacts():
+    status, payload = _serve(_request(_json(cv_text=CV, job_title="Analyst", company="Acme",
+                                            job_description="Python and SQL reporting")))
+    assert status == 200
+    assert "Acme" in payload['cover_letter']
+
+
+@pytest.mark.parametrize('raw, message', [
+    (_request(b"{}", length="abc"), "Content-Length"),
+    (_request(b"{}", length="-5"), "Content-Length"),
+    (_request(b"[1, 2]"), "object"),
+    (_request(b"{not json"), "Invalid JSON"),
+    (_request(_json(cv_text=CV, job_title="Analyst", company=["Acme"], job_description="SQL")), "company"),
+    (_request(_json(cv_text=CV, job_title="Analyst", company="Acme")), "job_description"),
+    (_request(_json(cv_text=CV, job_title="Analyst", company="Acme", job_description="SQL", format="pdf")), "format"),
+    (_request(b"cv", content_type='text/plain'), "multipart"),
+])
+def test_client_errors_are_400(raw, message):
+    status, payload = _serve(raw)
+    assert status == 400
+    assert message in payload['error']
+
+
+def test_read_request_rejects_oversized_body():
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(_request(b"", length=10 ** 12))
+        reader.feed_eof()
+        await read_request(reader)
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(run())
+    assert error.value.status == 413
@@ -0,0 +1,46 @@
+import os
+
+from text_cache import TextCache, content_hash
+
+
+def _extractor(calls, text):
+    def extract():
+        calls.append(text)
+        return text
+    return extract
+
+
+def test_changed_content_is_extracted_again():
+    cache = TextCache()
+    calls = []
+    first = content_hash(b"CV version 1", ".txt")
+    assert cache.get_or_extract(first, _extractor(calls, "one")) == "one"
+    assert cache.get_or_extract(content_hash(b"CV version 1", ".txt"), _extractor(calls, "stale")) == "one"
+    assert cache.get_or_extract(content_hash(b"CV version 2", ".txt"), _extractor(calls, "two")) == "two"
+    # The suffix picks the extractor, so the same bytes under another suffix are a different entry
+    assert cache.get_or_extract(content_hash(b"CV version 1", ".pdf"), _extractor(calls, "pdf")) == "pdf"
+    assert calls == ["one", "two", "pdf"]
+    assert cache.stats()['memory_hits'] == 1
+
+
+def test_errors_are_not_cached():
+    cache = TextCache()
+    calls = []
+    key = content_hash(b"broken", ".pdf")
+    for _ in range(2):
+        cache.get_or_extract(key, _extractor(calls, "Error reading file"), cacheable=lambda text: not text.startswith("Error"))
+    assert len(calls) == 2
+
+
+def test_disk_tier_survives_restart_until_ttl(tmp_path):
+    key = content_hash(b"CV", ".txt")
+    TextCache(disk_dir=str(tmp_path), ttl_seconds=60).put(key, "text\r\n")
+    fresh = TextCache(disk_dir=str(tmp_path), ttl_seconds=60)
+    assert fresh.get(key) == "text\n"
+    assert fresh.stats()['disk_hits'] == 1
+
+    path = tmp_path / f"{key}.txt"
+    os.utime(path, (0, 0))
+    expired = TextCache(disk_dir=str(tmp_path), ttl_seconds=60)
+    assert expired.get(key) is None
+    assert not path.exists()
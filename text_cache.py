@@ -0,0 +1,175 @@
+"""
+Content-hash cache for extracted CV text
+In-process LRU bounded by bytes, plus an optional on-disk tier with TTL eviction
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+_TRAILING_SPACE = re.compile(r"[ \t]+\n")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+
+def content_hash(data: bytes, suffix: str = "") -> str:
+    """Hash the uploaded bytes; the file suffix is part of the key since it selects the extractor"""
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest}-{suffix.lower().lstrip('.')}" if suffix else digest
+
+
+def normalize_text(text: str) -> str:
+    """Normalize line endings and trailing whitespace before storing text"""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _TRAILING_SPACE.sub("\n", text)
+    return _BLANK_RUNS.sub("\n\n", text)
+
+
+class TextCache:
+    """Two-tier cache of extracted text keyed by content hash"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, disk_dir: Optional[str] = None,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._counters = {
+            'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+            'evictions': 0, 'disk_evictions': 0,
+        }
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # ---------- MEMORY TIER ----------
+    def _remember(self, key: str, text: str) -> None:
+        size = len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._sizes[key]
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        self._sizes[key] = size
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(old_key)
+            self._counters['evictions'] += 1
+
+    # ---------- DISK TIER ----------
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.unlink(path)
+                self._counters['disk_evictions'] += 1
+                return None
+            with open(path, encoding='utf-8') as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, text: str) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                fh.write(text)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self._sweep_disk()
+
+    def _sweep_disk(self) -> None:
+        """Drop expired files, at most once per minute"""
+        now = time.time()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.txt'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl_seconds:
+                    os.unlink(path)
+                    self._counters['disk_evictions'] += 1
+            except OSError:
+                continue
+
+    # ---------- PUBLIC API ----------
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return self._entries[key]
+            if self.disk_dir:
+                text = self._read_disk(key)
+                if text is not None:
+                    self._counters['disk_hits'] += 1
+                    self._remember(key, text)
+                    return text
+            self._counters['misses'] += 1
+            return None
+
+    def put(self, key: str, text: str) -> str:
+        text = normalize_text(text)
+        with self._lock:
+            self._remember(key, text)
+            if self.disk_dir:
+                self._write_disk(key, text)
+        return text
+
+    def get_or_extract(self, key: str, extract: Callable[[], str],
+                       cacheable: Callable[[str], bool] = lambda text: True) -> str:
+        """Return cached text for key, or run extract() and cache the result if cacheable"""
+        text = self.get(key)
+        if text is not None:
+            return text
+        text = extract()
+        return self.put(key, text) if cacheable(text) else text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters plus current memory-tier size"""
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries), bytes=self._bytes,
+                        max_bytes=self.max_bytes)
+
+
+_default_cache: Optional[TextCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> TextCache:
+    """Process-wide cache configured from CV_TAILOR_CACHE_* environment variables"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TextCache(
+                max_bytes=int(os.environ.get('CV_TAILOR_CACHE_MB', DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024,
+                disk_dir=os.environ.get('CV_TAILOR_CACHE_DIR') or None,
+                ttl_seconds=int(os.environ.get('CV_TAILOR_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+            )
+        return _default_cache